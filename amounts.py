@@ -0,0 +1,97 @@
+import re
+
+
+# ---------------------------------------------------
+# Configuration
+# ---------------------------------------------------
+# Cells that mean "no amount" in a statement column
+PLACEHOLDERS = {"", "-", "--", "–", "—", "nil", "NIL"}
+
+# Characters OCR commonly substitutes for digits in amount columns,
+# plus whitespace that wrapped or OCR'd cells pick up
+OCR_FIXES = str.maketrans({
+    "O": "0", "o": "0", "D": "0",
+    "l": "1", "I": "1", "|": "1",
+    " ": None, "\n": None, "\t": None, "\xa0": None,
+})
+
+# Digits with optional thousands commas and up to two decimals.
+# ",dd" at the end is read as decimals: OCR often swaps the point for a comma.
+NUMBER = re.compile(r"(\d[\d,]*?)(?:\.(\d{1,2})|,(\d{2}))?")
+
+# Trailing/leading markers: "320.00+", "78.00-", "1,000.00 CR", "(45.00)"
+SUFFIX_SIGNS = (("CR", 1), ("DR", -1), ("+", 1), ("-", -1))
+
+
+# ---------------------------------------------------
+# Parsing
+# ---------------------------------------------------
+def parse_cents(text):
+    """
+    Parse a statement amount into exact integer cents.
+
+    "1,234.56" -> 123456, "320.00+" -> 32000, "78.00-" -> -7800,
+    "(45.00)" -> -4500, "-" / "" / None -> 0.
+    Returns None if text is not an amount.
+    """
+    if text is None:
+        return 0
+    if not isinstance(text, str):
+        text = str(text)
+
+    # Fast path: plain "1,234.56" as printed by the text-layer banks.
+    # float() runs in C; scaling and rounding a two-decimal value is exact
+    # for any amount below 2**53 cents.
+    s = text.replace(",", "")
+    if s[-3:-2] == ".":
+        try:
+            return round(float(s) * 100)
+        except ValueError:
+            pass
+
+    return _parse_cents_slow(text)
+
+
+def _parse_cents_slow(text):
+    s = text.strip()
+    if s in PLACEHOLDERS:
+        return 0
+
+    sign = 1
+
+    if s.startswith("(") and s.endswith(")"):
+        sign, s = -1, s[1:-1].strip()
+
+    upper = s.upper()
+    for marker, marker_sign in SUFFIX_SIGNS:
+        if upper.endswith(marker):
+            sign, s = sign * marker_sign, s[:-len(marker)].strip()
+            break
+
+    if s[:1] in ("+", "-"):
+        sign, s = sign * (-1 if s[0] == "-" else 1), s[1:].strip()
+
+    if s[:2].upper() == "RM":
+        s = s[2:]
+
+    m = NUMBER.fullmatch(s.translate(OCR_FIXES))
+    if not m:
+        return None
+
+    whole, point_decimals, comma_decimals = m.groups()
+    decimals = point_decimals or comma_decimals or ""
+    return sign * (int(whole.replace(",", "")) * 100 + int(decimals.ljust(2, "0")))
+
+
+def parse_amount(text):
+    """
+    Same as parse_cents, as a float in ringgit for the transaction dicts.
+    Converting from exact cents gives the correctly rounded value every time.
+    """
+    cents = parse_cents(text)
+    return None if cents is None else cents / 100
+
+
+def to_cents(value):
+    """Float amount from a transaction dict back to exact cents."""
+    return round(value * 100)
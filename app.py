@@ -1,16 +1,15 @@
 import streamlit as st
-import pdfplumber
-import json
-import pandas as pd
 from datetime import datetime
-from io import BytesIO
-import re
+import os
 
 # Import parsers
-from maybank import parse_transactions_maybank
-from public_bank import parse_transactions_pbb
-from rhb import parse_transactions_rhb
-from cimb import parse_transactions_cimb
+from cache import ParseCache
+from extraction import OCR_BACKENDS
+from jobs import JobWorkers, JobNotFound, FINISHED
+from ocr import DEFAULT_DPI, DEFAULT_ENGINE, OcrCache
+from transaction_store import TransactionStore
+from transaction_view import current_frames, SORT_COLUMNS, PAGE_SIZES
+from exports import ExportCache, FORMATS as EXPORT_FORMATS, available as export_available
 
 
 # ---------------------------------------------------
@@ -28,17 +27,50 @@ if "status" not in st.session_state:
     st.session_state.status = "idle"    # idle, running, stopped
 
 if "results" not in st.session_state:
-    st.session_state.results = []
+    st.session_state.results = TransactionStore()
+
+if "exports" not in st.session_state:
+    st.session_state.exports = ExportCache()
+
+if "frames" not in st.session_state:
+    st.session_state.frames = None      # ResultFrames for the current results
+
+if "job" not in st.session_state:
+    # A refresh starts a new session; the job id in the URL picks the job back up
+    st.session_state.job = st.query_params.get("job")
+    st.session_state.loaded_job = None  # job whose results are in st.session_state.results
+    st.session_state.job_log = []       # per-file results of that job, without transactions
+
+
+@st.cache_resource
+def get_parse_cache():
+    # One on-disk cache per server process, shared by all sessions
+    return ParseCache()
+
+
+parse_cache = get_parse_cache()
+
+
+@st.cache_resource
+def get_job_workers():
+    # One pool of background workers per server process; jobs outlive sessions
+    return JobWorkers()
+
+
+job_workers = get_job_workers()
+job_queue = job_workers.queue
 
 
 # ---------------------------------------------------
-# Bank Selection Dropdown (NO AUTO-DETECT)
+# Bank Selection Dropdown
 # ---------------------------------------------------
 bank_choice = st.selectbox(
     "Select Bank Format",
-    ["Maybank", "Public Bank (PBB)", "RHB Bank", "CIMB Bank"]
+    ["Auto-detect", "Maybank", "Public Bank (PBB)", "RHB Bank", "CIMB Bank", "Bank Islam"],
+    help="Auto-detect reads each file's first page, so a mixed upload is routed to the right parsers in one run."
 )
 
+# bank_hint None = detect per file
 bank_hint = None
 if bank_choice == "Maybank":
     bank_hint = "maybank"
@@ -48,6 +80,10 @@ elif bank_choice == "RHB Bank":
     bank_hint = "rhb"
 elif bank_choice == "CIMB Bank":
     bank_hint = "cimb"
+elif bank_choice == "Bank Islam":
+    bank_hint = "bank_islam"
+
+bank_name = None if bank_hint is None else bank_choice
 
 
 # ---------------------------------------------------
@@ -55,259 +91,222 @@ elif bank_choice == "CIMB Bank":
 # ---------------------------------------------------
 uploaded_files = st.file_uploader("Upload PDF files", type=["pdf"], accept_multiple_files=True)
 default_year = st.text_input("Default Year", "2025")
+workers = st.number_input(
+    "Worker Processes",
+    min_value=1,
+    max_value=os.cpu_count() or 1,
+    value=os.cpu_count() or 1,
+    help="Background processes that parse uploaded files side by side; a file on its own is "
+         "split into page ranges across all of them. They stay running for the server, "
+         "so parsers are loaded once, not per job."
+)
+job_workers.ensure(workers)
+extraction_choice = st.selectbox(
+    "Text Extraction",
+    ["Auto", "PyMuPDF", "pdfplumber", "Hybrid (text layer + OCR per page)", "OCR (scanned PDFs)"],
+    help="Auto uses PyMuPDF, the fastest text layer reader, for every supported bank. "
+         "Hybrid checks each page and only OCRs pages without a usable text layer. "
+         "OCR renders every page and runs Tesseract."
+)
+extraction_backend = {
+    "Auto": None,
+    "PyMuPDF": "pymupdf",
+    "pdfplumber": "pdfplumber",
+    "Hybrid (text layer + OCR per page)": "hybrid",
+    "OCR (scanned PDFs)": "ocr",
+}[extraction_choice]
+
+extract_options = None
+if extraction_backend in OCR_BACKENDS:
+    ocr_dpi = st.slider("OCR Resolution (DPI)", min_value=150, max_value=600, value=DEFAULT_DPI, step=50)
+    ocr_engine = st.selectbox(
+        "OCR Engine",
+        ["batch", "pytesseract"],
+        index=0 if DEFAULT_ENGINE == "batch" else 1,
+        help="batch starts one Tesseract process per group of pages; pytesseract starts one per page."
+    )
+    ocr_preprocess = st.checkbox(
+        "Crop to transaction table and clean up pages before OCR",
+        value=True,
+        help="Binarises and deskews each page and drops logos, addresses and footer text before Tesseract."
+    )
+    extract_options = {"dpi": ocr_dpi, "engine": ocr_engine, "preprocess": ocr_preprocess}
 
 # Sort uploaded files by name (assumes filenames contain dates/months)
 if uploaded_files:
     uploaded_files = sorted(uploaded_files, key=lambda x: x.name)
 
 
-# ---------------------------------------------------
-# Helper: Extract Statement Month from PDF and Filename
-# ---------------------------------------------------
-def extract_statement_month(pdf, filename):
-    """
-    Extract the statement month/year from the PDF header or filename.
-    Returns tuple: (year, month, month_name) or None
-    """
-    month_map = {
-        'jan': 1, 'january': 1,
-        'feb': 2, 'february': 2,
-        'mar': 3, 'march': 3,
-        'apr': 4, 'april': 4,
-        'may': 5,
-        'jun': 6, 'june': 6,
-        'jul': 7, 'july': 7,
-        'aug': 8, 'august': 8,
-        'sep': 9, 'sept': 9, 'september': 9,
-        'oct': 10, 'october': 10,
-        'nov': 11, 'november': 11,
-        'dec': 12, 'december': 12
-    }
-
-    month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
-                   'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-
-    try:
-        # PRIORITY 1: Extract from filename
-        filename_patterns = [
-            r'([A-Z][a-z]{2,8})\s+(\d{4})',  # "APR 2024", "JUNE 2024"
-            r'(\d{4})\s+([A-Z][a-z]{2,8})',  # "2024 APR"
-            r'[_-]([a-z]{3,9})[_-](\d{4})',  # "_apr_2024", "-june-2024"
-            r'(\d{4})[_-](\d{1,2})',         # "2024-04", "2024_4"
-        ]
-
-        for pattern in filename_patterns:
-            match = re.search(pattern, filename, re.IGNORECASE)
-            if match:
-                g1, g2 = match.groups()
-
-                if g1.isdigit() and len(g1) == 4:
-                    year = int(g1)
-                    if g2.isdigit():
-                        month = int(g2)
-                    else:
-                        month = month_map.get(g2.lower()[:3])
-                elif g2.isdigit() and len(g2) == 4:
-                    year = int(g2)
-                    if g1.isdigit():
-                        month = int(g1)
-                    else:
-                        month = month_map.get(g1.lower()[:3])
-                else:
-                    continue
-
-                if month and 1 <= month <= 12:
-                    return (year, month, month_names[month-1])
-
-        # PRIORITY 2: Extract from PDF text as fallback
-        first_page = pdf.pages[0]
-        text = first_page.extract_text() or ""
-
-        pdf_patterns = [
-            r'Statement\s+(?:Date|Period)[:\s]+(\d{1,2})\s+([A-Za-z]+)\s+(\d{4})',
-            r'Statement\s+(?:Date|Period)[:\s]+([A-Za-z]+)\s+(\d{4})',
-            r'(\d{1,2})\s+([A-Za-z]+)\s+(\d{4})\s+to\s+\d{1,2}\s+[A-Za-z]+\s+\d{4}',
-        ]
-
-        for pattern in pdf_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                groups = match.groups()
-
-                if len(groups) == 3:
-                    month_str = groups[1]
-                    year = int(groups[2])
-                elif len(groups) == 2:
-                    month_str = groups[0]
-                    year = int(groups[1])
-                else:
-                    continue
-
-                month = month_map.get(month_str.lower()[:3])
-                if month:
-                    return (year, month, month_names[month-1])
-
-    except Exception as e:
-        st.warning(f"Could not extract statement month from {filename}: {e}")
-
-    return None
-
-
 # ---------------------------------------------------
 # Start / Stop / Reset Controls
 # ---------------------------------------------------
+# Parsing runs in the background worker processes; this session only
+# submits the job, polls it, and loads the results once it finishes.
 col1, col2, col3 = st.columns(3)
 
 with col1:
-    if st.button("▶️ Start Processing"):
+    if st.button("▶️ Start Processing") and uploaded_files:
+        files = [(f.name, f.getvalue()) for f in uploaded_files]
+        job_id = job_queue.submit(files, bank_hint, bank_name, default_year,
+                                  backend=extraction_backend, extract_options=extract_options,
+                                  workers=workers)
+        st.session_state.job = job_id
+        st.query_params["job"] = job_id     # lets a browser refresh reattach
         st.session_state.status = "running"
 
 with col2:
-    if st.button("⏹️ Stop"):
+    if st.button("⏹️ Stop") and st.session_state.job:
+        # Cooperative: files still parsing stop after their current page
+        job_queue.cancel(st.session_state.job)
         st.session_state.status = "stopped"
 
 with col3:
     if st.button("🔄 Reset"):
+        if st.session_state.job:
+            job_queue.cancel(st.session_state.job)
         st.session_state.status = "idle"
-        st.session_state.results = []
+        st.session_state.results = TransactionStore()
+        st.session_state.frames = None
+        st.session_state.job = None
+        st.session_state.loaded_job = None
+        st.session_state.job_log = []
+        st.query_params.pop("job", None)
         st.rerun()
 
-st.write(f"### ⚙️ Status: **{st.session_state.status.upper()}**")
-
 
 # ---------------------------------------------------
-# MAIN PROCESSING (NO AUTO-DETECT)
+# Job Status
 # ---------------------------------------------------
-all_tx = []
-
-if uploaded_files and st.session_state.status == "running":
+job_id = st.session_state.job
+job_running = False
+just_loaded = False
 
-    if bank_hint is None:
-        st.error("Please select a bank format before processing.")
+if job_id and st.session_state.loaded_job != job_id:
+    try:
+        job = job_queue.status(job_id)
+    except JobNotFound:
+        st.warning("⚠️ That processing job has expired - upload the files and start again.")
+        st.session_state.job = None
+        st.query_params.pop("job", None)
     else:
-        bank_display_box = st.empty()  # live status
+        if job["state"] in FINISHED:
+            results = job_queue.results(job_id)
+            all_tx = TransactionStore()
+            for result in results:
+                if not result["error"]:
+                    all_tx.add_file(result["transactions"], result["source_file"], result["bank"],
+                                    result["statement_month"])
+            st.session_state.results = all_tx
+
+            # Kept for the per-file messages; the transactions now live in the store
+            st.session_state.job_log = [
+                {k: v for k, v in result.items() if k != "transactions"} | {"count": len(result["transactions"])}
+                for result in results
+            ]
+            st.session_state.loaded_job = job_id
+            st.session_state.status = "stopped" if job["state"] == "cancelled" else "idle"
+            just_loaded = True
+        else:
+            st.session_state.status = "stopped" if st.session_state.status == "stopped" else "running"
+            job_running = True
 
-        for uploaded_file in uploaded_files:
-
-            st.write(f"### 🗂 Processing File: **{uploaded_file.name}**")
-
-            try:
-                with pdfplumber.open(uploaded_file) as pdf:
-
-                    # Extract statement month for this file
-                    statement_month = extract_statement_month(pdf, uploaded_file.name)
-                    if statement_month:
-                        st.success(f"📅 Statement Period: **{statement_month[2]} {statement_month[0]}**")
-                    else:
-                        st.warning("⚠️ Could not detect statement month - will use transaction dates")
-
-                    for page_num, page in enumerate(pdf.pages, start=1):
-
-                        if st.session_state.status == "stopped":
-                            st.warning("⏹️ Processing stopped by user.")
-                            break
-
-                        text = page.extract_text() or ""
-                        tx = []
-                        detected_bank = bank_choice
-
-                        bank_display_box.info(f"📄 Processing {bank_choice} (Page {page_num})...")
-
-                        if bank_hint == "maybank":
-                            tx = parse_transactions_maybank(text, page_num, default_year)
-
-                        elif bank_hint == "pbb":
-                            tx = parse_transactions_pbb(text, page_num, default_year)
-
-                        elif bank_hint == "rhb":
-                            tx = parse_transactions_rhb(text, page_num)
-
-                        elif bank_hint == "cimb":
-                            tx = parse_transactions_cimb(page, page_num, uploaded_file.name)
-
-                        bank_display_box.success(f"🏦 Processing: **{detected_bank}** (Page {page_num})")
+st.write(f"### ⚙️ Status: **{st.session_state.status.upper()}**")
 
-                        if tx:
-                            for t in tx:
-                                t["source_file"] = uploaded_file.name
-                                t["bank"] = detected_bank
+cache_box = st.empty()  # filled in after processing so counters are current
 
-                                # Add statement month metadata if available
-                                if statement_month:
-                                    t["statement_year"] = statement_month[0]
-                                    t["statement_month"] = statement_month[1]
-                                    t["statement_period"] = f"{statement_month[0]}-{statement_month[1]:02d}"
 
-                            all_tx.extend(tx)
+@st.fragment(run_every=1.0)
+def show_job_progress(job_id):
+    """Polls the job without rerunning the page; reruns the app once it finishes."""
+    try:
+        job = job_queue.status(job_id)
+    except JobNotFound:
+        st.rerun()
+        return
 
-            except Exception as e:
-                st.error(f"Error processing {uploaded_file.name}: {e}")
+    if job["state"] in FINISHED:
+        st.rerun()
 
-        st.session_state.results = all_tx
+    if job["state"] == "queued":
+        text = f"⏳ Queued ({job['files']} files, {job['pages']} pages)..."
+    else:
+        text = (f"📄 Processing {job['files_done']}/{job['files']} files · "
+                f"{job['pages_done']}/{job['pages']} pages")
+        if job["current"]:
+            text += f" · {', '.join(job['current'])}"
+    st.progress(min(1.0, job["pages_done"] / max(job["pages"], 1)), text=text)
 
 
 # ---------------------------------------------------
-# CALCULATE MONTHLY SUMMARY
+# Helper: Per-File Outcome
 # ---------------------------------------------------
-def calculate_monthly_summary(transactions):
+def report_file_outcome(result):
     """
-    Calculate monthly summary based on statement_period (from filename/PDF header).
-    This ensures transactions are grouped by their actual statement month,
-    not by individual transaction dates.
+    Show the file's bank, statement period, warnings and errors, page
+    routing and OCR throughput, and warn when it produced no transactions
+    (typically a scanned PDF read without OCR).
     """
-    if not transactions:
-        return []
-
-    df = pd.DataFrame(transactions)
+    st.write(f"### 🗂 Processed File: **{result['source_file']}**")
 
-    has_statement_metadata = 'statement_period' in df.columns
+    if result["bank"]:
+        st.info(f"🏦 Bank: **{result['bank']}**")
 
-    if has_statement_metadata:
-        df = df.dropna(subset=['statement_period'])
+    for message in result["warnings"]:
+        st.warning(message)
 
-        if df.empty:
-            st.warning("⚠️ No valid statement periods found.")
-            return []
+    if result["error"]:
+        st.error(f"Error processing {result['source_file']}: {result['error']}")
+        return
 
-        grouping_col = 'statement_period'
+    statement_month = result["statement_month"]
+    if statement_month:
+        st.success(f"📅 Statement Period: **{statement_month[2]} {statement_month[0]}**")
     else:
-        df['date_parsed'] = pd.to_datetime(df['date'], format='%d/%m/%Y', errors='coerce')
-        df = df.dropna(subset=['date_parsed'])
+        st.warning("⚠️ Could not detect statement month - will use transaction dates")
 
-        if df.empty:
-            st.warning("⚠️ No valid transaction dates found.")
-            return []
+    if result["cancelled"]:
+        st.warning("⏹️ Processing stopped by user.")
 
-        df['statement_period'] = df['date_parsed'].dt.strftime('%Y-%m')
-        grouping_col = 'statement_period'
+    if "routes" in result:
+        st.caption(f"🧭 Page routing: {result['routes']['text']} text layer · {result['routes']['ocr']} OCR")
 
-    df['debit'] = pd.to_numeric(df['debit'], errors='coerce').fillna(0)
-    df['credit'] = pd.to_numeric(df['credit'], errors='coerce').fillna(0)
-    df['balance'] = pd.to_numeric(df['balance'], errors='coerce')
+    if result.get("cached"):
+        st.caption(f"🗄️ {result['pages']} pages, from the parse cache")
+    elif result["backend"] in OCR_BACKENDS and result["seconds"] > 0:
+        pages, seconds = result["pages"], result["seconds"]
+        st.caption(f"🔍 OCR: {pages} pages in {seconds:.1f}s ({pages / seconds:.2f} pages/s)")
 
-    monthly_summary = []
+    if not result["count"] and not result["cancelled"]:
+        if result["backend"] not in OCR_BACKENDS and result.get("text_layer") is False:
+            st.warning(f"⚠️ {result['source_file']} has no text layer (scanned?) - select **Hybrid** or **OCR** under Text Extraction.")
+        else:
+            st.warning(f"⚠️ No transactions found in {result['source_file']}.")
 
-    for period, group in df.groupby(grouping_col, sort=True):
-        ending_balance = None
-        if not group['balance'].isna().all():
-            group_sorted = group.sort_values('date')
-            last_balance = group_sorted['balance'].dropna().iloc[-1] if len(group_sorted['balance'].dropna()) > 0 else None
-            ending_balance = round(last_balance, 2) if last_balance is not None else None
 
-        summary = {
-            'month': period,
-            'total_debit': round(group['debit'].sum(), 2),
-            'total_credit': round(group['credit'].sum(), 2),
-            'net_change': round(group['credit'].sum() - group['debit'].sum(), 2),
-            'ending_balance': ending_balance,
-            'lowest_balance': round(group['balance'].min(), 2) if not group['balance'].isna().all() else None,
-            'highest_balance': round(group['balance'].max(), 2) if not group['balance'].isna().all() else None,
-            'transaction_count': len(group),
-            'source_files': ', '.join(sorted(group['source_file'].unique())) if 'source_file' in group.columns else ''
-        }
-        monthly_summary.append(summary)
-
-    return sorted(monthly_summary, key=lambda x: x['month'])
+# ---------------------------------------------------
+# MAIN PROCESSING
+# ---------------------------------------------------
+if job_running:
+    show_job_progress(job_id)
+
+if st.session_state.job_log:
+    with st.expander(f"🗂 Processed files ({len(st.session_state.job_log)})", expanded=just_loaded):
+        for result in st.session_state.job_log:
+            report_file_outcome(result)
+
+if just_loaded or "cache_stats" not in st.session_state:
+    # stats() lists the cache directory, so only after a job adds to it, not on every rerun
+    st.session_state.cache_stats = parse_cache.stats(), OcrCache().stats()
+
+cache_stats, ocr_cache_stats = st.session_state.cache_stats
+cache_hits = sum(1 for r in st.session_state.job_log if r.get("cached"))
+cache_misses = sum(1 for r in st.session_state.job_log if not r.get("cached") and not r["error"])
+cache_box.caption(
+    f"🗄️ Parse cache: {cache_hits} hits · {cache_misses} misses (last job) · "
+    f"{cache_stats['entries']} entries ({cache_stats['bytes'] / 1024 / 1024:.1f} / "
+    f"{cache_stats['max_bytes'] / 1024 / 1024:.0f} MB) · "
+    f"OCR cache: {ocr_cache_stats['entries']} pages ({ocr_cache_stats['bytes'] / 1024 / 1024:.1f} MB)"
+)
 
 
 # ---------------------------------------------------
@@ -316,97 +315,116 @@ def calculate_monthly_summary(transactions):
 if st.session_state.results:
     st.subheader("📊 Extracted Transactions")
 
-    df = pd.DataFrame(st.session_state.results)
-
-    base_cols = ["date", "description", "debit", "credit", "balance", "page", "bank", "source_file"]
-    metadata_cols = ["statement_year", "statement_month", "statement_period"]
+    # The DataFrame, summary and sort orders are rebuilt only when the
+    # results change, not on every widget interaction
+    frames = st.session_state.frames = current_frames(st.session_state.frames, st.session_state.results)
+    df_display = frames.display
+
+    # Filtering, sorting and paging run here; only the visible page goes to the browser
+    first_date, last_date = frames.date_bounds()
+    with st.expander("🔍 Filter and sort"):
+        fcol1, fcol2, fcol3, fcol4 = st.columns([2, 1, 1, 2])
+        with fcol1:
+            date_range = ()
+            if first_date:
+                date_range = st.date_input("Date range", value=(first_date, last_date),
+                                           min_value=first_date, max_value=last_date)
+        with fcol2:
+            min_amount = st.number_input("Min amount (RM)", min_value=0.0, value=None, step=10.0)
+        with fcol3:
+            max_amount = st.number_input("Max amount (RM)", min_value=0.0, value=None, step=10.0)
+        with fcol4:
+            search_text = st.text_input("Description contains")
+
+        scol1, scol2, scol3 = st.columns([2, 1, 1])
+        with scol1:
+            sort_label = st.selectbox("Sort by", list(SORT_COLUMNS))
+        with scol2:
+            descending = st.checkbox("Descending")
+        with scol3:
+            page_size = st.selectbox("Rows per page", PAGE_SIZES)
+
+    # The full range is no filter: undated rows (opening balances) stay in
+    date_from = date_to = None
+    if len(date_range) == 2 and tuple(date_range) != (first_date, last_date):
+        date_from, date_to = date_range
+
+    filters = {
+        "date_from": date_from,
+        "date_to": date_to,
+        "min_amount": min_amount,
+        "max_amount": max_amount,
+        "text": search_text.strip(),
+    }
+    rows = frames.query(filters, SORT_COLUMNS[sort_label], descending)
 
-    display_cols = [c for c in base_cols if c in df.columns]
-    display_cols.extend([c for c in metadata_cols if c in df.columns])
+    page_count = max(1, -(-len(rows) // page_size))
+    # Keyed on the query so a new filter or sort starts again from page 1
+    page_key = f"page-{hash((frames.fingerprint, tuple(filters.items()), sort_label, descending, page_size))}"
+    page_number = st.number_input(f"Page (of {page_count:,})", min_value=1, max_value=page_count,
+                                  value=1, key=page_key)
 
-    df_display = df[display_cols]
+    first_row = (page_number - 1) * page_size
+    if len(rows):
+        caption = f"Rows {first_row + 1:,}–{min(first_row + page_size, len(rows)):,} of {len(rows):,}"
+    else:
+        caption = "No transactions match the filters"
+    if len(rows) != len(df_display):
+        caption += f" (filtered from {len(df_display):,})"
+    st.caption(caption)
 
-    st.dataframe(df_display, use_container_width=True)
+    st.dataframe(frames.page(rows, page_number, page_size), use_container_width=True)
 
-    monthly_summary = calculate_monthly_summary(st.session_state.results)
+    summary = frames.summary
+    monthly_df = summary["monthly"]
+    totals = summary["totals"]
 
-    if monthly_summary:
+    if not monthly_df.empty:
         st.subheader("📅 Monthly Summary")
         st.write("*Grouped by statement period (filename/PDF header)*")
 
-        summary_df = pd.DataFrame(monthly_summary)
-
-        summary_df = summary_df[[
-            'month', 'transaction_count', 'total_debit', 'total_credit',
-            'net_change', 'ending_balance', 'lowest_balance', 'highest_balance',
-            'source_files'
-        ]]
-
-        st.dataframe(summary_df, use_container_width=True)
+        st.dataframe(monthly_df, use_container_width=True)
 
         st.markdown("---")
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Total Transactions", summary_df['transaction_count'].sum())
+            st.metric("Total Transactions", totals['total_transactions'])
         with col2:
-            st.metric("Total Debits", f"RM {summary_df['total_debit'].sum():,.2f}")
+            st.metric("Total Debits", f"RM {totals['total_debit']:,.2f}")
         with col3:
-            st.metric("Total Credits", f"RM {summary_df['total_credit'].sum():,.2f}")
+            st.metric("Total Credits", f"RM {totals['total_credit']:,.2f}")
         with col4:
-            net_total = summary_df['net_change'].sum()
+            net_total = totals['net_change']
             st.metric("Net Change", f"RM {net_total:,.2f}",
                      delta=f"{'Positive' if net_total > 0 else 'Negative'}")
     else:
         st.warning("⚠️ Could not generate monthly summary. Please check if statement months are detected correctly.")
 
     # Download Options
+    # Files are built only when a button is clicked (on Streamlit's download
+    # thread) and kept until the results change, so reruns don't pay for them
     st.subheader("⬇️ Download Options")
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        json_transactions = json.dumps(df_display.to_dict(orient="records"), indent=4)
-        st.download_button(
-            "📄 Download Transactions (JSON)",
-            json_transactions,
-            file_name="transactions.json",
-            mime="application/json"
-        )
-
-    with col2:
-        full_report = {
-            "summary": {
-                "total_transactions": len(df),
-                "date_range": f"{df['date'].min()} to {df['date'].max()}" if 'date' in df.columns else "N/A",
-                "total_files_processed": df['source_file'].nunique() if 'source_file' in df.columns else 0
-            },
-            "monthly_summary": monthly_summary,
-            "transactions": df_display.to_dict(orient="records")
-        }
-        json_full_report = json.dumps(full_report, indent=4)
-        st.download_button(
-            "📊 Download Full Report (JSON)",
-            json_full_report,
-            file_name="full_report.json",
-            mime="application/json"
-        )
-
-    with col3:
-        try:
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df_display.to_excel(writer, sheet_name='Transactions', index=False)
-                if monthly_summary:
-                    pd.DataFrame(monthly_summary).to_excel(writer, sheet_name='Monthly Summary', index=False)
-
-            excel_data = output.getvalue()
+    fingerprint = frames.fingerprint
+    downloads = [
+        ("json", "📄 Download Transactions (JSON)"),
+        ("report", "📊 Download Full Report (JSON)"),
+        ("xlsx", "📊 Download Full Report (XLSX)"),
+        ("csv", "📄 Download Transactions (CSV)"),
+        ("parquet", "📦 Download Transactions (Parquet)"),
+    ]
+
+    for col, (fmt, label) in zip(st.columns(len(downloads)), downloads):
+        file_name, mime, module = EXPORT_FORMATS[fmt]
+        with col:
+            if not export_available(fmt):
+                st.error(f"⚠️ {module} package not installed. Install with: pip install {module}")
+                continue
             st.download_button(
-                "📊 Download Full Report (XLSX)",
-                excel_data,
-                file_name="full_report.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                label,
+                st.session_state.exports.loader(fingerprint, fmt, df_display, summary),
+                file_name=file_name,
+                mime=mime
             )
-        except ImportError:
-            st.error("⚠️ xlsxwriter package not installed. Install with: pip install xlsxwriter")
 
 else:
     if uploaded_files:
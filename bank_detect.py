@@ -0,0 +1,121 @@
+import re
+
+import fitz  # PyMuPDF
+
+from maybank import PATTERN_MAYBANK_MTASB, PATTERN_MAYBANK_MBB
+from public_bank import AMOUNT_BAL
+
+
+# ---------------------------------------------------
+# Configuration
+# ---------------------------------------------------
+BANK_DISPLAY_NAMES = {
+    "maybank": "Maybank",
+    "pbb": "Public Bank (PBB)",
+    "rhb": "RHB Bank",
+    "cimb": "CIMB Bank",
+    "bank_islam": "Bank Islam",
+}
+
+# (bank, pattern, weight). Bank names weigh most; header keywords that
+# only one bank prints add to it. Each fingerprint counts once per page.
+FINGERPRINTS = [
+    ("maybank", r"MAYBANK|MALAYAN\s+BANKING", 5),
+    ("maybank", r"URUSNIAGA\s+AKAUN|ACCOUNT\s+TRANSACTIONS", 2),
+    ("maybank", r"BAKI\s+LEGAR|LEDGER\s+BALANCE", 2),
+
+    ("pbb", r"PUBLIC\s+BANK|PUBLIC\s+ISLAMIC\s+BANK", 5),
+    ("pbb", r"MUKA\s+SURAT", 1),
+    ("pbb", r"URUS\s+NIAGA", 1),
+
+    ("rhb", r"\bRHB\b", 5),
+    ("rhb", r"B/F\s+BALANCE|C/F\s+BALANCE", 2),
+    ("rhb", r"Total\s+Count", 2),
+
+    ("cimb", r"\bCIMB\b", 5),
+    ("cimb", r"OPENING\s+BALANCE", 1),
+    ("cimb", r"WITHDRAWAL", 1),
+
+    ("bank_islam", r"BANK\s+ISLAM", 6),     # outweighs "ISLAMIC" in other banks' names
+    ("bank_islam", r"EFT\s+NO", 2),
+]
+
+# One alternation with a named group per fingerprint: a single finditer
+# pass over the page scores every bank at once.
+FINGERPRINT_PATTERN = re.compile(
+    "|".join(f"(?P<f{i}>{pattern})" for i, (_, pattern, _) in enumerate(FINGERPRINTS)),
+    re.IGNORECASE,
+)
+
+# Transaction-line layouts: each matching line adds a point, up to a cap.
+# Maybank's signed "320.00+ 43,906.52" lines are distinctive; PBB's plain
+# "amount balance" ending also appears in other banks' rows, so it counts less.
+MAYBANK_LAYOUT_CAP = 5
+PBB_LAYOUT_CAP = 2
+
+# Winner needs at least this score and must beat the runner-up
+MIN_SCORE = 3
+
+# Only this much of the first page is read: header plus first rows
+HEADER_CHARS = 4000
+
+
+# ---------------------------------------------------
+# Scoring
+# ---------------------------------------------------
+def score_text(text):
+    """
+    Score page text against every bank's fingerprints.
+    Returns {bank_hint: score}.
+    """
+    scores = {bank: 0 for bank in BANK_DISPLAY_NAMES}
+    seen = set()
+
+    for m in FINGERPRINT_PATTERN.finditer(text):
+        if m.lastgroup not in seen:
+            seen.add(m.lastgroup)
+            bank, _, weight = FINGERPRINTS[int(m.lastgroup[1:])]
+            scores[bank] += weight
+
+    maybank_lines = 0
+    pbb_lines = 0
+    for line in text.splitlines():
+        if PATTERN_MAYBANK_MTASB.search(line) or PATTERN_MAYBANK_MBB.search(line):
+            maybank_lines += 1
+        elif AMOUNT_BAL.search(line.strip()):
+            pbb_lines += 1
+
+    scores["maybank"] += min(maybank_lines, MAYBANK_LAYOUT_CAP)
+    scores["pbb"] += min(pbb_lines, PBB_LAYOUT_CAP)
+
+    return scores
+
+
+def detect_bank_text(text):
+    """
+    Returns (bank_hint or None, scores).
+    None when no bank is a clear winner.
+    """
+    scores = score_text(text[:HEADER_CHARS])
+    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+
+    best_bank, best_score = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0
+
+    if best_score < MIN_SCORE or best_score == runner_up:
+        return None, scores
+
+    return best_bank, scores
+
+
+def detect_bank(pdf_bytes):
+    """
+    Detect the issuing bank from the first page's text layer.
+    Returns (bank_hint or None, scores).
+    """
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        if doc.page_count == 0:
+            return None, {}
+        text = doc[0].get_text("text")
+
+    return detect_bank_text(text)
@@ -1,71 +1,104 @@
-# bank_islam.py
 import re
 
+from amounts import parse_amount
+from page_text import MAX_CONTINUATION_LINES
+from table_grid import body_rows, find_grid, row_cells
+
+
+# ---------------------------------------------------
+# Configuration
+# ---------------------------------------------------
+DATE = re.compile(r"(\d{2})/(\d{2})/(\d{4})")
+
+# Header words naming each column of the ten-column table
+HEADER_WORDS = {
+    "no": ("NO",),
+    "date": ("DATE", "TARIKH"),
+    "eft_no": ("EFT",),
+    "code": ("CODE", "KOD"),
+    "description": ("DESCRIPTION", "KETERANGAN"),
+    "ref_no": ("REF",),
+    "branch": ("BRANCH", "CAWANGAN"),
+    "debit": ("DEBIT",),
+    "credit": ("CREDIT", "KREDIT"),
+    "balance": ("BALANCE", "BAKI"),
+}
+
+# Columns a header row must name to be taken for the table header
+REQUIRED_COLUMNS = {"date", "debit", "credit", "balance"}
+
+# Amounts are right-aligned: without ruling, a wide one can start left of
+# its header word, so it is placed by its right edge
+ANCHORS = {"debit": "right", "credit": "right", "balance": "right"}
+
+
 def clean_amount(value):
-    if not value or value == "-":
-        return 0.0
-    return float(value.replace(",", ""))
+    return parse_amount(value) or 0.0
 
 
-def parse_bank_islam(pdf):
+# ---------------------------------------------------
+# Table Grid
+# ---------------------------------------------------
+def find_grid_bank_islam(words, rules=()):
     """
-    Parses Bank Islam statements using pdfplumber table extraction.
-    Returns a list of transaction dicts.
+    The ten-column grid from a page's header row and ruling (see
+    table_grid.find_grid), or None. Found once and reused for the whole
+    statement.
     """
+    return find_grid(words, rules, HEADER_WORDS, REQUIRED_COLUMNS, DATE, ANCHORS)
+
+
+# ---------------------------------------------------
+# Main Logic
+# ---------------------------------------------------
+def parse_page_bank_islam(words, page_num, year=None, grid=None):
+    """
+    Parse one page of Bank Islam transactions from PyMuPDF words
+    (x0, y0, x1, y1, text, ...) placed in the grid from
+    find_grid_bank_islam. Pages with no date on them (summaries, notices)
+    return nothing before any row is built. A dated row is a transaction;
+    rows without a date continue its description and reference. A "Total"
+    row ends the table. Dates are printed in full, so year is unused.
+    """
+    if not any(DATE.fullmatch(w[4]) for w in words):
+        return []
+
+    if grid is None:
+        grid = find_grid_bank_islam(words)
+        if grid is None:
+            return []
+
     transactions = []
+    current = None      # last transaction, while its description may continue
+    lines = 0
 
-    for page in pdf.pages:
-        tables = page.extract_tables()
+    for row in body_rows(words, HEADER_WORDS, REQUIRED_COLUMNS):
+        cells = row_cells(row, grid)
 
-        if not tables:
+        if "TOTAL" in cells.get("no", "").upper():
+            current = None
             continue
 
-        for table in tables:
-            # Skip malformed tables
-            if not table or len(table) < 2:
-                continue
-
-            header = table[0]  # We skip header row
-
-            for row in table[1:]:
-                if len(row) < 10:
-                    continue
-
-                (
-                    no,
-                    date_raw,
-                    eft_no,
-                    code,
-                    desc,
-                    ref_no,
-                    branch,
-                    debit_raw,
-                    credit_raw,
-                    balance_raw
-                ) = row[:10]
-
-                if not date_raw or "Total" in str(no):
-                    continue
-
-                # Normalize date format
-                if re.match(r"\d{2}/\d{2}/\d{4}", date_raw):
-                    dd, mm, yyyy = date_raw.split("/")
-                    date_fmt = f"{yyyy}-{mm}-{dd}"
-                else:
-                    date_fmt = date_raw
-
-                description = " ".join(str(desc).split())
-
-                debit = clean_amount(debit_raw)
-                credit = clean_amount(credit_raw)
-                balance = clean_amount(balance_raw)
-
-                transactions.append({
-                    "date": date_fmt,
-                    "description": description,
-                    "debit": debit,
-                    "credit": credit,
-                    "balance": balance,
-                })
+        date = DATE.fullmatch(cells.get("date", ""))
+        if date:
+            dd, mm, yyyy = date.groups()
+            current = {
+                "date": f"{yyyy}-{mm}-{dd}",
+                "description": cells.get("description", ""),
+                "ref_no": cells.get("ref_no", ""),
+                "debit": clean_amount(cells.get("debit")),
+                "credit": clean_amount(cells.get("credit")),
+                "balance": clean_amount(cells.get("balance")),
+                "page": page_num,
+            }
+            lines = 1
+            transactions.append(current)
+
+        elif current is not None and lines < MAX_CONTINUATION_LINES:
+            if cells.get("description"):
+                current["description"] = f"{current['description']} {cells['description']}".strip()
+            if cells.get("ref_no"):
+                current["ref_no"] = f"{current['ref_no']} {cells['ref_no']}".strip()
+            lines += 1
 
     return transactions
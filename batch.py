@@ -0,0 +1,183 @@
+import os
+import time
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pdfplumber
+
+from pipeline import parse_statement, extract_statement_month, attach_metadata, resolve_file_bank, count_pages
+from cache import cache_key
+
+
+# ---------------------------------------------------
+# Single File Worker
+# ---------------------------------------------------
+def _empty_result(filename):
+    return {
+        "source_file": filename,
+        "bank": None,
+        "statement_month": None,
+        "transactions": [],
+        "pages": 0,
+        "seconds": 0.0,
+        "warnings": [],
+        "error": None,
+        "cancelled": False,
+    }
+
+
+def process_file(pdf_bytes, filename, bank_hint, bank_name, default_year,
+                 backend=None, extract_options=None, on_page=None, workers=1):
+    """
+    Parse one PDF end to end with parse_statement and tag its transactions.
+    Never raises: errors are returned in the result so one bad file
+    does not take down the rest of the batch.
+
+    workers > 1 splits the file's pages across that many processes.
+    on_page(page_num, page_count) is called after each page; returning
+    False stops the parse there, keeping the pages done so far, with
+    "cancelled" set in the result.
+
+    Returns dict with keys:
+        source_file, bank, statement_month, transactions, pages, seconds, warnings, error, cancelled
+    plus routes ({"text": n, "ocr": m} pages) when the hybrid backend routed them.
+    """
+    result = _empty_result(filename)
+    result["bank"] = bank_name
+    start = time.perf_counter()
+
+    def page_done(page_num, page_count):
+        if on_page is not None and on_page(page_num, page_count) is False:
+            result["cancelled"] = True
+            return False
+        return True
+
+    routes = {"text": 0, "ocr": 0}
+    try:
+        with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
+            statement_month = extract_statement_month(pdf, filename, warn=result["warnings"].append)
+            result["statement_month"] = statement_month
+        result["pages"] = count_pages(pdf_bytes)
+
+        result["transactions"] = list(parse_statement(
+            pdf_bytes, bank_hint, default_year, filename, backend, extract_options,
+            workers=workers, on_page=page_done, statement_month=statement_month, routes=routes,
+        ))
+        if any(routes.values()):
+            result["routes"] = routes
+
+    except Exception as e:
+        result["error"] = str(e)
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def result_from_cache(pdf_bytes, filename, bank_name, entry):
+    """
+    Build a process_file-style result from a ParseCache entry.
+    Only the statement month is recomputed, since it depends on the filename.
+    """
+    result = _empty_result(filename)
+    result["bank"] = bank_name
+
+    try:
+        with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
+            statement_month = extract_statement_month(pdf, filename, warn=result["warnings"].append)
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+
+    result["statement_month"] = statement_month
+    result["pages"] = entry["pages"]
+    result["transactions"] = attach_metadata(entry["transactions"], filename, bank_name, statement_month)
+    if "routes" in entry:
+        result["routes"] = entry["routes"]
+    return result
+
+
+# ---------------------------------------------------
+# Batch Scheduler
+# ---------------------------------------------------
+def process_batch(files, bank_hint, bank_name, default_year, workers=None, on_result=None, cache=None,
+                  backend=None, extract_options=None):
+    """
+    Process several PDFs at once, one file per worker process; with fewer
+files than workers, each file's pages are split across the spare ones.
+
+    files: list of (filename, pdf_bytes) in the order results should be returned.
+    With bank_hint None each file's bank is detected from its first page,
+    so a mixed upload is routed to the right parsers in one pass.
+    Files are submitted largest first so the longest job starts immediately
+    and the small ones fill in around it.
+
+    on_result(result) is called from the calling thread as each file finishes.
+    With a ParseCache, files already parsed are served from disk and only
+    the misses are sent to the pool.
+    Returns the per-file results in the original order of `files`.
+    """
+    workers = workers or os.cpu_count() or 1
+    results = [None] * len(files)
+    keys = [None] * len(files)
+    banks = [None] * len(files)
+    pending = []
+
+    for i, (name, pdf_bytes) in enumerate(files):
+        file_bank, file_bank_name, error = resolve_file_bank(pdf_bytes, bank_hint, bank_name)
+        banks[i] = (file_bank, file_bank_name)
+
+        if error:
+            results[i] = _empty_result(name)
+            results[i]["bank"] = file_bank_name
+            results[i]["error"] = error
+            if on_result:
+                on_result(results[i])
+            continue
+
+        if cache is not None:
+            keys[i] = cache_key(pdf_bytes, file_bank, default_year, backend, extract_options)
+            entry = cache.get(keys[i])
+            if entry is not None:
+                results[i] = result_from_cache(pdf_bytes, name, file_bank_name, entry)
+                if on_result:
+                    on_result(results[i])
+                continue
+        pending.append(i)
+
+    def store(i):
+        if cache is not None and not results[i]["error"]:
+            cache.put(keys[i], results[i]["transactions"], results[i]["pages"], results[i].get("routes"))
+
+    largest_first = sorted(pending, key=lambda i: len(files[i][1]), reverse=True)
+    page_workers = max(1, workers // max(len(largest_first), 1))
+
+    if workers <= 1 or len(largest_first) <= 1:
+        for i in largest_first:
+            name, pdf_bytes = files[i]
+            results[i] = process_file(pdf_bytes, name, *banks[i], default_year,
+                                      backend, extract_options, workers=page_workers)
+            store(i)
+            if on_result:
+                on_result(results[i])
+        return results
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(largest_first))) as pool:
+        futures = {
+            pool.submit(process_file, files[i][1], files[i][0], *banks[i], default_year,
+                        backend, extract_options, workers=page_workers): i
+            for i in largest_first
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                # Worker process died (e.g. out of memory) - keep the error per file
+                results[i] = _empty_result(files[i][0])
+                results[i]["bank"] = banks[i][1]
+                results[i]["error"] = str(e)
+            store(i)
+            if on_result:
+                on_result(results[i])
+
+    return results
@@ -0,0 +1,160 @@
+"""
+Parse time per page on adversarial text: does it stay linear in page size?
+
+Usage (from the repository root):
+    python -m benchmarks.adversarial                # 500 .. 8000 lines per page
+    python -m benchmarks.adversarial --sizes 1000 2000 4000 --previous
+
+Each case builds one page of text at several sizes. Every parser is timed
+on each size, and the growth exponent is fitted from the smallest and
+largest sizes timed: 1 means time grows in step with the page, 2 means
+quadratic. The
+run exits 1 if a current parser's exponent exceeds MAX_EXPONENT.
+
+--previous also times the per-line parsers from benchmarks.scanning.
+Those rebuilt wrapped lines without a bound and searched them with
+unanchored lazy patterns. A parser is dropped from the larger sizes once
+a run takes longer than SLOW_SECONDS.
+"""
+import sys
+import math
+import time
+import random
+import argparse
+
+from tabulate import tabulate
+
+from maybank import parse_transactions_maybank
+from public_bank import parse_transactions_pbb
+from transaction_patterns import parse_transactions
+from benchmarks.scanning import line_parse_maybank, line_parse_pbb
+
+
+DEFAULT_SIZES = [500, 1000, 2000, 4000, 8000]
+
+# Allowance over 1.0 for timer noise and cache effects at larger sizes
+MAX_EXPONENT = 1.3
+
+SLOW_SECONDS = 5.0
+
+# Best of this many runs per size (a run over SLOW_SECONDS is not repeated)
+REPEATS = 3
+
+WORDS = ["TRANSFER", "FR", "A/C", "TERMS", "AND", "CONDITIONS", "APPLY", "FEE", "NOTICE", "THE", "BANK"]
+
+
+# ---------------------------------------------------
+# Cases
+# ---------------------------------------------------
+# Each case: lines -> page text of about that many lines
+def footer(lines):
+    """One open transaction, then terms and conditions quoting dates and amounts."""
+    body = [f"Effective {i % 28 + 1:02d}/09 the fee of 1,{i % 1000:03d}.00 applies to A/C {i}" for i in range(lines)]
+    return "\n".join(["01/08 TRANSFER FR A/C"] + body)
+
+
+def dates_without_amounts(lines):
+    """A single line of dates and words that never reaches an amount."""
+    return " ".join(f"{i % 28 + 1:02d}/08 TRANSFER" for i in range(lines * 4))
+
+
+def digit_runs(lines):
+    """Start lines followed by long comma-grouped digit runs with no decimal point."""
+    run = ",".join(["123"] * 40)
+    return "\n".join(f"{i % 28 + 1:02d}/08 DUITNOW {run} {run}" for i in range(lines))
+
+
+def random_tokens(lines, seed=0):
+    """Random mix of the tokens the patterns key on."""
+    rng = random.Random(seed)
+    tokens = ["01/08", "01 Aug 2025", "1,234.56", "1,234.56+", "78.00-", "+", "-", "Balance", "B/F",
+              "DUITNOW", "TOTAL", "12,345", ","] + WORDS
+    out = []
+    for _ in range(lines):
+        out.append(" ".join(rng.choice(tokens) for _ in range(rng.randint(1, 12))))
+    return "\n".join(out)
+
+
+CASES = {
+    "footer": footer,
+    "dates_without_amounts": dates_without_amounts,
+    "digit_runs": digit_runs,
+    "random_tokens": random_tokens,
+}
+
+PARSERS = {
+    "maybank": lambda text: parse_transactions_maybank(text, 1, "2025"),
+    "pbb": lambda text: parse_transactions_pbb(text, 1, "2025"),
+    "transaction_patterns": lambda text: parse_transactions(text, 1, "2025"),
+}
+
+PREVIOUS_PARSERS = {
+    "maybank (per-line)": lambda text: line_parse_maybank(text, 1, "2025"),
+    "pbb (per-line)": lambda text: line_parse_pbb(text, 1, "2025"),
+}
+
+
+# ---------------------------------------------------
+# Timing
+# ---------------------------------------------------
+def time_parse(parse, text):
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        parse(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        if elapsed > SLOW_SECONDS:
+            break
+    return best
+
+
+def exponent(sizes, seconds):
+    """Growth exponent between the smallest and largest sizes timed (None if fewer than two)."""
+    timed = [(n, s) for n, s in zip(sizes, seconds) if s is not None]
+    if len(timed) < 2:
+        return None
+    (n1, s1), (n2, s2) = timed[0], timed[-1]
+    return math.log(max(s2, 1e-6) / max(s1, 1e-6)) / math.log(n2 / n1)
+
+
+def run(sizes, parsers):
+    rows = []
+    for case, build in CASES.items():
+        texts = [build(n) for n in sizes]
+        for name, parse in parsers.items():
+            seconds = []
+            for text in texts:
+                too_slow = any(s is None or s > SLOW_SECONDS for s in seconds)
+                seconds.append(None if too_slow else time_parse(parse, text))
+            rows.append({"case": case, "parser": name, "seconds": seconds, "exponent": exponent(sizes, seconds)})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check parse time stays linear on adversarial pages.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="lines per page")
+    parser.add_argument("--previous", action="store_true", help="also time the previous per-line parsers")
+    args = parser.parse_args(argv)
+
+    parsers = dict(PARSERS, **(PREVIOUS_PARSERS if args.previous else {}))
+    rows = run(args.sizes, parsers)
+
+    table = [
+        [r["case"], r["parser"]]
+        + [f"{s * 1000:.1f}" if s is not None else "-" for s in r["seconds"]]
+        + [f"{r['exponent']:.2f}" if r["exponent"] is not None else "-"]
+        for r in rows
+    ]
+    print(tabulate(table, headers=["Case", "Parser"] + [f"{n} lines ms" for n in args.sizes] + ["Exponent"]))
+
+    failing = [r for r in rows if r["parser"] in PARSERS and r["exponent"] is not None and r["exponent"] > MAX_EXPONENT]
+    for r in failing:
+        print(f"\n{r['case']} / {r['parser']}: time grows with exponent {r['exponent']:.2f} (> {MAX_EXPONENT})")
+    if not failing:
+        print(f"\nAll current parsers within exponent {MAX_EXPONENT}.")
+    return 1 if failing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
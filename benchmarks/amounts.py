@@ -0,0 +1,85 @@
+"""
+Amount parsing: shared integer-cents parser vs the per-bank float conversions.
+
+Usage (from the repository root):
+    python -m benchmarks.amounts [count]
+
+Times each approach over the same statement-style amount strings and
+shows the drift a float running total picks up against exact cents.
+"""
+import re
+import sys
+import time
+import random
+
+import numpy as np
+from tabulate import tabulate
+
+from amounts import parse_cents, parse_amount
+
+
+# ---------------------------------------------------
+# Previous per-bank conversions
+# ---------------------------------------------------
+def float_replace(value):
+    """maybank.py / public_bank.py / rhb.py"""
+    return float(value.replace(",", ""))
+
+
+def cimb_parse_float(value):
+    """cimb.py parse_float"""
+    if not value:
+        return 0.0
+    clean_val = str(value).replace("\n", "").replace(" ", "").replace(",", "")
+    if not re.match(r'^-?\d+(\.\d+)?$', clean_val):
+        return 0.0
+    return float(clean_val)
+
+
+def bank_islam_clean_amount(value):
+    """bank_islam.py clean_amount"""
+    if not value or value == "-":
+        return 0.0
+    return float(value.replace(",", ""))
+
+
+def sample(count, seed=0):
+    rng = random.Random(seed)
+    return [f"{rng.randint(1, 5_000_000) / 100:,.2f}" for _ in range(count)]
+
+
+def timed(fn, values):
+    start = time.perf_counter()
+    for v in values:
+        fn(v)
+    return time.perf_counter() - start
+
+
+def benchmark(count):
+    values = sample(count)
+    table = []
+    for name, fn in [("float(x.replace)", float_replace),
+                     ("cimb parse_float", cimb_parse_float),
+                     ("bank_islam clean_amount", bank_islam_clean_amount),
+                     ("amounts.parse_cents", parse_cents),
+                     ("amounts.parse_amount", parse_amount)]:
+        seconds = timed(fn, values)
+        table.append([name, f"{seconds:.3f}", f"{count / seconds / 1e6:.2f}", f"{seconds / count * 1e9:.0f}"])
+
+    report = [tabulate(table, headers=["Parser", "Seconds", "M values/s", "ns/value"])]
+
+    # Drift: add every amount to a running float total vs summing exact cents
+    float_total = 0.0
+    for v in values:
+        float_total += float_replace(v)
+    cents = np.fromiter((parse_cents(v) for v in values), dtype=np.int64, count=count)
+    exact = int(cents.sum())
+
+    report.append(f"\nFloat running total: {float_total!r}")
+    report.append(f"Exact (int64 cents): {exact // 100}.{exact % 100:02d}")
+    report.append(f"Drift:               {abs(float_total - exact / 100):.2e}")
+    return "\n".join(report)
+
+
+if __name__ == "__main__":
+    print(benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
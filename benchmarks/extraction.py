@@ -0,0 +1,76 @@
+"""
+Compare text-extraction backends on real statements.
+
+Usage (from the repository root):
+    python -m benchmarks.extraction maybank statement1.pdf statement2.pdf ...
+
+For each backend reports pages/second, and checks the normalised text and
+the parsed transactions against the pdfplumber reference.
+"""
+import sys
+import time
+
+from tabulate import tabulate
+
+from extraction import BACKENDS, PdfplumberBackend, open_document
+from pipeline import parse_text
+
+
+def extract_all(backend, pdf_bytes):
+    """Returns (list of page texts, seconds spent extracting)."""
+    start = time.perf_counter()
+    with open_document(backend, pdf_bytes) as doc:
+        texts = [doc.page_text(n) for n in range(1, len(doc) + 1)]
+    return texts, time.perf_counter() - start
+
+
+def compare(bank_hint, paths, default_year="2025"):
+    reference = PdfplumberBackend.name
+    totals = {name: {"pages": 0, "seconds": 0.0, "same_text": 0, "same_tx": 0} for name in BACKENDS}
+
+    for path in paths:
+        with open(path, "rb") as f:
+            pdf_bytes = f.read()
+
+        outputs = {name: extract_all(name, pdf_bytes) for name in BACKENDS}
+        ref_texts = outputs[reference][0]
+
+        for name, (texts, seconds) in outputs.items():
+            t = totals[name]
+            t["pages"] += len(texts)
+            t["seconds"] += seconds
+
+            for page_num, (text, ref_text) in enumerate(zip(texts, ref_texts), start=1):
+                if text == ref_text:
+                    t["same_text"] += 1
+                if parse_text(bank_hint, text, page_num, default_year) == \
+                        parse_text(bank_hint, ref_text, page_num, default_year):
+                    t["same_tx"] += 1
+
+    rows = []
+    ref_seconds = totals[reference]["seconds"] or 1e-9
+
+    for name, t in totals.items():
+        pages = t["pages"] or 1
+        rows.append([
+            name,
+            t["pages"],
+            f"{t['seconds']:.3f}",
+            f"{t['pages'] / (t['seconds'] or 1e-9):.1f}",
+            f"{ref_seconds / (t['seconds'] or 1e-9):.1f}x",
+            f"{100 * t['same_text'] / pages:.1f}%",
+            f"{100 * t['same_tx'] / pages:.1f}%",
+        ])
+
+    return tabulate(rows, headers=[
+        "backend", "pages", "seconds", "pages/s", "speedup",
+        "identical text", "identical transactions",
+    ])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+
+    print(compare(sys.argv[1], sys.argv[2:]))
@@ -0,0 +1,82 @@
+"""
+Memory per transaction: list of dicts vs the columnar TransactionStore.
+
+Usage (from the repository root):
+    python -m benchmarks.memory [rows]
+
+Rows come from the synthetic Maybank generator, spread over files of 250
+rows each with attach_metadata-style tags, as the app holds them after a
+multi-file run. Memory is measured with tracemalloc; the DataFrame built
+from each representation is reported too.
+"""
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+from tabulate import tabulate
+
+from pipeline import attach_metadata, parse_text
+from transaction_store import TransactionStore
+from extraction import open_document
+from benchmarks.synthetic import generate_maybank, YEAR
+
+
+ROWS_PER_FILE = 250
+
+
+def sample_rows(rows):
+    """One parsed file's worth of transactions, enough pages to cover `rows`."""
+    pdf_bytes, truth = generate_maybank(max(1, ROWS_PER_FILE // 28 + 1))
+    with open_document("pymupdf", pdf_bytes) as doc:
+        parsed = [t for n in range(1, len(doc) + 1) for t in parse_text("maybank", doc.page_text(n), n, YEAR)]
+    return parsed[:ROWS_PER_FILE]
+
+
+def measure(build):
+    """Returns (object, bytes allocated and still held, seconds)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    obj = build()
+    seconds = time.perf_counter() - start
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, held, seconds
+
+
+def benchmark(rows):
+    template = sample_rows(rows)
+    files = max(1, rows // ROWS_PER_FILE)
+
+    def as_dicts():
+        out = []
+        for f in range(files):
+            tx = [dict(t) for t in template]
+            out.extend(attach_metadata(tx, f"statement_{f:05d}.pdf", "Maybank", (2025, 1 + f % 12, "")))
+        return out
+
+    def as_store():
+        store = TransactionStore()
+        for f in range(files):
+            store.add_file(template, f"statement_{f:05d}.pdf", "Maybank", (2025, 1 + f % 12, ""))
+        return store
+
+    table = []
+    for name, build, to_frame in [("list of dicts", as_dicts, pd.DataFrame),
+                                  ("TransactionStore", as_store, lambda s: s.to_pandas())]:
+        obj, held, build_seconds = measure(build)
+        n = len(obj)
+        start = time.perf_counter()
+        df = to_frame(obj)
+        frame_seconds = time.perf_counter() - start
+        table.append([name, n, f"{held / n:.0f}", f"{held / 1024 / 1024:.1f}",
+                      f"{build_seconds:.2f}", f"{frame_seconds:.2f}",
+                      f"{df.memory_usage(deep=True).sum() / n:.0f}"])
+        del obj, df
+
+    return tabulate(table, headers=["Representation", "Rows", "Bytes/row", "MB",
+                                    "Build s", "To DataFrame s", "DataFrame bytes/row"])
+
+
+if __name__ == "__main__":
+    print(benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
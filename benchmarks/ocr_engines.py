@@ -0,0 +1,70 @@
+"""
+Compare OCR engines and page preprocessing on a scanned statement.
+
+Usage (from the repository root):
+    python -m benchmarks.ocr_engines statement.pdf [bank] [max_pages] [dpi]
+
+Pages are rendered (and preprocessed) once up front so only recognition is
+timed. Reports pages/second for each engine on raw and preprocessed pages,
+the pixels Tesseract had to read, and how many pages match the raw
+per-call pytesseract baseline.
+"""
+import sys
+import time
+
+import fitz  # PyMuPDF
+from tabulate import tabulate
+
+from ocr import DEFAULT_DPI, ENGINES, PerCallEngine, get_engine, preprocess, render_page, tesseract_config
+from extraction import normalise_text
+
+
+def benchmark(path, bank_hint=None, max_pages=20, dpi=DEFAULT_DPI):
+    with fitz.open(path) as doc:
+        raw = [render_page(doc[i], dpi) for i in range(min(max_pages, doc.page_count))]
+
+    start = time.perf_counter()
+    prepared = [preprocess(image)[0] for image in raw]
+    prep_seconds = time.perf_counter() - start
+
+    variants = {"raw": raw, "preprocessed": prepared}
+    config = tesseract_config(bank_hint)
+    outputs = {}
+    rows = []
+
+    for variant, images in variants.items():
+        megapixels = sum(im.width * im.height for im in images) / 1e6
+        for name in ENGINES:
+            engine = get_engine(name, config=config)
+            start = time.perf_counter()
+            texts = engine.recognise(images)
+            seconds = time.perf_counter() - start
+            outputs[(name, variant)] = [normalise_text(r["text"]) for r in texts]
+            rows.append([name, variant, len(images), f"{megapixels:.1f}", seconds])
+
+    baseline = outputs[(PerCallEngine.name, "raw")]
+    base_seconds = rows[0][4] or 1e-9
+
+    for row in rows:
+        texts = outputs[(row[0], row[1])]
+        seconds = row[4] or 1e-9
+        row[4] = f"{seconds:.2f}"
+        row.append(f"{row[2] / seconds:.2f}")
+        row.append(f"{base_seconds / seconds:.1f}x")
+        row.append(f"{sum(a == b for a, b in zip(texts, baseline))}/{row[2]}")
+
+    table = tabulate(rows, headers=[
+        "engine", "input", "pages", "megapixels", "seconds", "pages/s", "speedup", "same text as baseline",
+    ])
+    return f"{table}\n\npreprocessing: {prep_seconds:.2f}s for {len(raw)} pages"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    bank_hint = sys.argv[2] if len(sys.argv) > 2 else None
+    max_pages = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    dpi = int(sys.argv[4]) if len(sys.argv) > 4 else DEFAULT_DPI
+    print(benchmark(sys.argv[1], bank_hint, max_pages, dpi))
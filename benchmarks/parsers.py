@@ -0,0 +1,253 @@
+"""
+Time extraction and parsing for every bank layout on synthetic statements.
+
+Usage (from the repository root):
+    python -m benchmarks.parsers                          # 10, 100, 1000 pages
+    python -m benchmarks.parsers --pages 10 100 --layouts maybank_mtasb pbb
+    python -m benchmarks.parsers --save                   # write benchmarks/baseline.json
+    python -m benchmarks.parsers --compare                # exit 1 on a regression
+    python -m benchmarks.parsers --workers 4              # also time the page-parallel parse
+
+Extraction (PDF -> page text or word boxes) and parsing (text/words ->
+transactions) are timed separately. Parsed transactions are checked
+against the generator's ground truth on date, description, debit, credit
+and balance. With --workers, the whole-PDF parse through
+iter_pages_parallel is timed too and must give exactly the rows of the
+serial iter_page_transactions.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+from collections import Counter
+
+from tabulate import tabulate
+
+from extraction import WORD_BANKS, open_document, resolve_backend
+from pipeline import iter_word_partials, iter_page_transactions, iter_pages_parallel, parse_partial, stitch_pages
+from benchmarks.synthetic import LAYOUTS, YEAR
+
+
+DEFAULT_PAGES = [10, 100, 1000]
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# A run regresses when a stage is this much slower per page than the baseline,
+# or when accuracy drops at all
+TIME_TOLERANCE = 0.25
+
+
+# ---------------------------------------------------
+# Stand-ins for extraction backends
+# ---------------------------------------------------
+class WordDocument:
+    """Backend-like object returning words and ruling extracted earlier, for word banks."""
+
+    def __init__(self, words, rules):
+        self.words = words
+        self.rules = rules
+
+    def __len__(self):
+        return len(self.words)
+
+    def page_words(self, page_num):
+        return self.words[page_num - 1]
+
+    def page_rules(self, page_num):
+        return self.rules[page_num - 1]
+
+
+# ---------------------------------------------------
+# Stages
+# ---------------------------------------------------
+def extract(bank_hint, pdf_bytes, backend=None):
+    """
+    Page texts for text banks, a WordDocument for word banks. Word banks
+    get every page's ruling here, though the pipeline stops reading it once
+    the layout is found, so their extraction time is slightly overstated.
+    """
+    with open_document(resolve_backend(bank_hint, backend), pdf_bytes) as doc:
+        pages = range(1, len(doc) + 1)
+        if bank_hint in WORD_BANKS:
+            return WordDocument([doc.page_words(n) for n in pages], [doc.page_rules(n) for n in pages])
+        return [doc.page_text(n) for n in pages]
+
+
+def parse(bank_hint, extracted):
+    if bank_hint in WORD_BANKS:
+        return [t for _, partial in iter_word_partials(bank_hint, extracted, range(1, len(extracted) + 1), YEAR)
+                for t in partial["transactions"]]
+
+    partials = ((n, parse_partial(bank_hint, text, n, YEAR)) for n, text in enumerate(extracted, 1))
+    return [t for _, tx in stitch_pages(bank_hint, partials) for t in tx]
+
+
+def fields(t):
+    return (t.get("date"), t.get("description"),
+            round(t.get("debit") or 0.0, 2), round(t.get("credit") or 0.0, 2), round(t.get("balance") or 0.0, 2))
+
+
+def accuracy(truth, parsed):
+    """Returns (matched, expected, extra): multiset overlap on the compared fields."""
+    matched = sum((Counter(map(fields, truth)) & Counter(map(fields, parsed))).values())
+    return matched, len(truth), len(parsed) - matched
+
+
+def parallel_parity(bank_hint, pdf_bytes, workers, backend=None):
+    """
+    Returns (seconds, same): time of the page-parallel parse, and whether its
+    rows equal the serial pipeline's, in order.
+    """
+    serial = [t for _, tx in iter_page_transactions(pdf_bytes, bank_hint, YEAR, backend=backend) for t in tx]
+
+    start = time.perf_counter()
+    parallel = [t for _, tx in iter_pages_parallel(pdf_bytes, bank_hint, YEAR, workers, backend=backend)
+                for t in tx]
+    return time.perf_counter() - start, parallel == serial
+
+
+def run_case(layout, pages, backend=None, seed=0, workers=None):
+    bank_hint, generate = LAYOUTS[layout]
+    pdf_bytes, truth = generate(pages, seed)
+    row = {"layout": layout, "pages": pages, "expected": len(truth)}
+
+    try:
+        start = time.perf_counter()
+        extracted = extract(bank_hint, pdf_bytes, backend)
+        row["extract_seconds"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parsed = parse(bank_hint, extracted)
+        row["parse_seconds"] = time.perf_counter() - start
+
+        if workers:
+            row["parallel_seconds"], row["parallel_same"] = parallel_parity(bank_hint, pdf_bytes, workers, backend)
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {str(e).splitlines()[0][:80]}"
+        return row
+
+    matched, expected, extra = accuracy(truth, parsed)
+    row.update({
+        "parsed": len(parsed),
+        "matched": matched,
+        "extra": extra,
+        "accuracy": matched / expected if expected else 1.0,
+    })
+    return row
+
+
+def run(layouts, page_counts, backend=None, workers=None):
+    return [run_case(layout, pages, backend, workers=workers) for layout in layouts for pages in page_counts]
+
+
+# ---------------------------------------------------
+# Baseline
+# ---------------------------------------------------
+def case_key(row):
+    return f"{row['layout']}:{row['pages']}"
+
+
+def save_baseline(rows, path=BASELINE_PATH):
+    baseline = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "cases": {case_key(r): r for r in rows},
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+
+def compare(rows, path=BASELINE_PATH, tolerance=TIME_TOLERANCE):
+    """
+    Regressions against the saved baseline as human-readable strings.
+    Cases missing from the baseline are ignored.
+    """
+    with open(path) as f:
+        cases = json.load(f)["cases"]
+
+    problems = []
+    for row in rows:
+        base = cases.get(case_key(row))
+        if base is None:
+            continue
+
+        if "error" in row and "error" not in base:
+            problems.append(f"{case_key(row)}: now fails ({row['error']})")
+            continue
+        if "error" in row or "error" in base:
+            continue
+
+        for stage in ("extract_seconds", "parse_seconds"):
+            # Ignore sub-millisecond stages; timer noise dominates them
+            if base[stage] > 0.001 and row[stage] > base[stage] * (1 + tolerance):
+                problems.append(f"{case_key(row)}: {stage} {base[stage]:.3f}s -> {row[stage]:.3f}s")
+
+        if row.get("parallel_same") is False:
+            problems.append(f"{case_key(row)}: page-parallel rows differ from the serial parse")
+
+        if row["accuracy"] < base["accuracy"]:
+            problems.append(f"{case_key(row)}: accuracy {base['accuracy']:.1%} -> {row['accuracy']:.1%}")
+
+    return problems
+
+
+def format_rows(rows):
+    parallel = any("parallel_seconds" in r for r in rows)
+    headers = ["Layout", "Pages", "Extract s", "Pages/s", "Parse s", "Pages/s", "Accuracy"]
+    if parallel:
+        headers += ["Parallel s", "Same rows"]
+
+    table = []
+    for r in rows:
+        if "error" in r:
+            table.append([r["layout"], r["pages"], "-", "-", "-", "-", r["error"]])
+            continue
+        line = [
+            r["layout"], r["pages"],
+            f"{r['extract_seconds']:.3f}", f"{r['pages'] / max(r['extract_seconds'], 1e-9):.0f}",
+            f"{r['parse_seconds']:.3f}", f"{r['pages'] / max(r['parse_seconds'], 1e-9):.0f}",
+            f"{r['accuracy']:.1%} ({r['matched']}/{r['expected']}, {r['extra']} extra)",
+        ]
+        if parallel:
+            line += [f"{r['parallel_seconds']:.3f}", "yes" if r["parallel_same"] else "NO"]
+        table.append(line)
+    return tabulate(table, headers=headers)
+
+
+# ---------------------------------------------------
+# Entry Point
+# ---------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the bank parsers on synthetic statements.")
+    parser.add_argument("--pages", type=int, nargs="+", default=DEFAULT_PAGES)
+    parser.add_argument("--layouts", nargs="+", choices=sorted(LAYOUTS), default=list(LAYOUTS))
+    parser.add_argument("--backend", default=None, help="extraction backend for text banks (default: per bank)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="also parse each PDF page-parallel with this many processes and check its rows")
+    parser.add_argument("--save", action="store_true", help=f"write the results to {BASELINE_PATH}")
+    parser.add_argument("--compare", action="store_true", help="compare with the baseline; exit 1 on regressions")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    args = parser.parse_args(argv)
+
+    rows = run(args.layouts, args.pages, args.backend, args.workers)
+    print(format_rows(rows))
+
+    if args.save:
+        save_baseline(rows, args.baseline)
+        print(f"\nBaseline written to {args.baseline}")
+
+    if args.compare:
+        problems = compare(rows, args.baseline)
+        print("\nRegressions:" if problems else "\nNo regressions against the baseline.")
+        for p in problems:
+            print(f"  {p}")
+        return 1 if problems else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
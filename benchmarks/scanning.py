@@ -0,0 +1,216 @@
+"""
+Text parsers: whole-page regex scanning vs the previous per-line loops.
+
+Usage (from the repository root):
+    python -m benchmarks.scanning [pages]
+
+Page text comes from the synthetic generator through the bank's default
+extraction backend, as the pipeline sees it. Each parser runs over every
+page in isolation; throughput is reported in lines per second, and the
+rows are compared with the per-line parser's. Maybank MBB rows differ by
+design: the per-line reconstructor only recognised "01/08" dates, so an
+MBB page collapsed into one line and one row.
+"""
+import re
+import sys
+import time
+
+import regex
+from tabulate import tabulate
+
+from amounts import parse_amount
+from extraction import open_document, resolve_backend
+from pipeline import parse_text
+from public_bank import TX_KEYWORDS, IGNORE_PREFIXES
+from maybank import MONTH_MAP
+from benchmarks.synthetic import LAYOUTS, YEAR
+
+
+DEFAULT_PAGES = 200
+REPEATS = 3
+
+
+# ---------------------------------------------------
+# Previous per-line parsers
+# ---------------------------------------------------
+DATE_LINE = re.compile(r"^(?P<date>\d{2}/\d{2})\s+(?P<rest>.*)$")
+AMOUNT_BAL = re.compile(r"(?P<amount>\d{1,3}(?:,\d{3})*\.\d{2})\s+(?P<balance>\d{1,3}(?:,\d{3})*\.\d{2})$")
+BAL_ONLY = re.compile(r"^(?P<date>\d{2}/\d{2})\s+(Balance.*)\s+(?P<balance>\d{1,3}(?:,\d{3})*\.\d{2})$", re.IGNORECASE)
+
+
+def line_parse_pbb(text, page, year="2025"):
+    """public_bank.py parse_transactions_pbb: three regexes and two keyword scans per line."""
+    tx = []
+    current_date = None
+    prev_balance = None
+    desc_accum = ""
+    waiting_for_amount = False
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or any(line.upper().startswith(p) for p in IGNORE_PREFIXES):
+            continue
+
+        amount_match = AMOUNT_BAL.search(line)
+        date_match = DATE_LINE.match(line)
+        is_new_start = date_match or any(line.startswith(k) for k in TX_KEYWORDS)
+
+        bal_match = BAL_ONLY.match(line)
+        if bal_match:
+            current_date = bal_match.group("date")
+            prev_balance = parse_amount(bal_match.group("balance"))
+            desc_accum = ""
+            waiting_for_amount = False
+            continue
+
+        if amount_match:
+            amount = parse_amount(amount_match.group("amount"))
+            balance = parse_amount(amount_match.group("balance"))
+            if is_new_start:
+                if date_match:
+                    current_date = date_match.group("date")
+                    final_desc = date_match.group("rest")
+                else:
+                    final_desc = line.replace(amount_match.group(0), "").strip()
+            else:
+                final_desc = desc_accum + " " + line.replace(amount_match.group(0), "").strip()
+
+            debit = credit = 0.0
+            if prev_balance is not None:
+                if balance < prev_balance:
+                    debit = amount
+                elif balance > prev_balance:
+                    credit = amount
+            elif "CR" in final_desc.upper() or "DEP" in final_desc.upper():
+                credit = amount
+            else:
+                debit = amount
+
+            if current_date:
+                dd, mm = current_date.split("/")
+                iso = f"{year}-{mm}-{dd}"
+            else:
+                iso = f"{year}-01-01"
+
+            tx.append({"date": iso, "description": final_desc.strip(), "debit": debit, "credit": credit,
+                       "balance": balance, "page": page, "source_file": "test.pdf"})
+            prev_balance = balance
+            desc_accum = ""
+            waiting_for_amount = False
+        elif is_new_start:
+            desc_accum = date_match.group("rest") if date_match else line
+            if date_match:
+                current_date = date_match.group("date")
+            waiting_for_amount = True
+        elif waiting_for_amount:
+            desc_accum += " " + line
+
+    return tx
+
+
+PATTERN_MAYBANK_MTASB = regex.compile(
+    r"(\d{2}/\d{2})\s+(.+?)\s+([0-9,]+\.\d{2})\s*([+-])\s*([0-9,]+\.\d{2})"
+)
+PATTERN_MAYBANK_MBB = regex.compile(
+    r"(\d{2})\s+([A-Za-z]{3})\s+(\d{4})\s+(.+?)\s+([0-9,]+\.\d{2})\s*([+-])\s*([0-9,]+\.\d{2})"
+)
+
+
+def clean_maybank_line(line):
+    for ch in ("\u200b", "\u200e", "\u200f", "\ufeff"):
+        line = line.replace(ch, "")
+    line = line.replace("\xa0", " ")
+    return regex.sub(r"\s+", " ", line).strip()
+
+
+def line_parse_maybank(text, page_num, default_year="2024"):
+    """maybank.py parse_transactions_maybank: clean twice, rebuild lines, then MTASB and MBB per line."""
+    rebuilt = []
+    buffer_line = ""
+    for line in [clean_maybank_line(l) for l in text.splitlines()]:
+        line = clean_maybank_line(line)
+        if not line:
+            continue
+        if regex.match(r"^\d{2}/\d{2}", line):
+            if buffer_line:
+                rebuilt.append(buffer_line)
+            buffer_line = line
+        else:
+            buffer_line += " " + line
+    if buffer_line:
+        rebuilt.append(buffer_line)
+
+    tx_list = []
+    for line in rebuilt:
+        m = PATTERN_MAYBANK_MTASB.search(line)
+        if m:
+            date_raw, desc, amount_raw, sign, balance_raw = m.groups()
+            day, month = date_raw.split("/")
+            year = default_year
+        else:
+            m = PATTERN_MAYBANK_MBB.search(line)
+            if not m:
+                continue
+            day, mon_abbr, year, desc, amount_raw, sign, balance_raw = m.groups()
+            month = MONTH_MAP.get(mon_abbr.title(), "01")
+        amount = parse_amount(amount_raw)
+        tx_list.append({
+            "date": f"{day}/{month}/{year}",
+            "description": desc.strip(),
+            "debit": amount if sign == "-" else 0.0,
+            "credit": amount if sign == "+" else 0.0,
+            "balance": parse_amount(balance_raw),
+            "page": page_num,
+        })
+    return tx_list
+
+
+LINE_PARSERS = {"maybank": line_parse_maybank, "pbb": line_parse_pbb}
+
+
+# ---------------------------------------------------
+# Timing
+# ---------------------------------------------------
+def page_texts(layout, pages):
+    bank_hint, generate = LAYOUTS[layout]
+    pdf_bytes, _ = generate(pages, 0)
+    with open_document(resolve_backend(bank_hint, None), pdf_bytes) as doc:
+        return bank_hint, [doc.page_text(n) for n in range(1, len(doc) + 1)]
+
+
+def best_time(parse, texts):
+    best, rows = None, None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        rows = [t for n, text in enumerate(texts, 1) for t in parse(text, n)]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    pages = int(argv[0]) if argv else DEFAULT_PAGES
+
+    table = []
+    for layout in ("maybank_mtasb", "maybank_mbb", "pbb"):
+        bank_hint, texts = page_texts(layout, pages)
+        lines = sum(text.count("\n") + 1 for text in texts)
+
+        line_seconds, line_rows = best_time(lambda t, n: LINE_PARSERS[bank_hint](t, n, YEAR), texts)
+        scan_seconds, scan_rows = best_time(lambda t, n: parse_text(bank_hint, t, n, YEAR), texts)
+
+        table.append([
+            layout, lines,
+            f"{lines / line_seconds:,.0f}", f"{lines / scan_seconds:,.0f}",
+            f"{line_seconds / scan_seconds:.1f}x",
+            len(line_rows), len(scan_rows), "yes" if line_rows == scan_rows else "no",
+        ])
+
+    print(f"{pages} pages per layout, best of {REPEATS}\n")
+    print(tabulate(table, headers=["Layout", "Lines", "Per-line lines/s", "Scanner lines/s",
+                                   "Speedup", "Per-line rows", "Scanner rows", "Same rows"]))
+
+
+if __name__ == "__main__":
+    main()
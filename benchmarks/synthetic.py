@@ -0,0 +1,403 @@
+"""
+Synthetic statements for benchmarking, one generator per layout.
+
+Each generator returns (pdf_bytes, truth): the PDF built with PyMuPDF and
+the transactions it contains, in page order and in the shape the bank's
+parser returns them. Output is deterministic for a given seed.
+"""
+import random
+
+import fitz  # PyMuPDF
+
+
+# ---------------------------------------------------
+# Configuration
+# ---------------------------------------------------
+YEAR = "2025"
+MONTH = 8
+MONTH_ABBR = "Aug"
+
+FONT_SIZE = 8
+LINE_HEIGHT = 12
+TOP = 110
+BOTTOM_MARGIN = 50
+
+PORTRAIT = (595, 842)
+LANDSCAPE = (842, 595)
+
+NAMES = ["ALI BIN ABU", "TAN AH KOW", "SITI AMINAH", "KUMAR A/L RAJU", "LIM SDN BHD", "NUR FARAH"]
+PURPOSES = ["RENT", "SALARY", "SUPPLIES", "UTILITIES", "SCHOOL FEES", "INVOICE PAYMENT"]
+
+
+def _text(page, x, y, text, size=FONT_SIZE):
+    page.insert_text((x, y), text, fontsize=size, fontname="helv")
+
+
+def _right(page, x, y, text, size=FONT_SIZE):
+    """Right-align text on x, like the amount columns on real statements."""
+    _text(page, x - fitz.get_text_length(text, fontname="helv", fontsize=size), y, text, size)
+
+
+def _amount(value):
+    return f"{value:,.2f}"
+
+
+def _entries(rng, count, balance):
+    """
+    Random (day, amount, is_credit, balance_after) tuples with a running balance.
+    Days only move forward so every page reads like part of one month.
+    """
+    entries = []
+    for i in range(count):
+        day = 1 + (i * 28) // max(count, 1)
+        amount = round(rng.uniform(1, 5000), 2)
+        is_credit = rng.random() < 0.4 or balance - amount < 100
+        balance = round(balance + amount if is_credit else balance - amount, 2)
+        entries.append((day, amount, is_credit, balance))
+    return entries
+
+
+def _save(doc):
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+# ---------------------------------------------------
+# Maybank
+# ---------------------------------------------------
+def maybank_page_header(page, page_num):
+    _text(page, 40, 50, "MAYBANK ISLAMIC BERHAD", 11)
+    _text(page, 40, 66, f"STATEMENT DATE : 31/{MONTH:02d}/{YEAR[2:]}   PAGE {page_num}")
+    _text(page, 40, 90, "ENTRY DATE")
+    _text(page, 100, 90, "TRANSACTION DESCRIPTION")
+    _text(page, 380, 90, "TRANSACTION AMOUNT")
+    _text(page, 480, 90, "STATEMENT BALANCE")
+
+
+def generate_maybank(pages, seed=0, full_dates=False):
+    """
+    Maybank: one line per transaction with a signed amount, "320.00+ 43,906.52".
+    MTASB prints "dd/mm" dates; MBB (full_dates) prints "dd Mon yyyy".
+    Some entries carry a second description line under the first.
+    """
+    rng = random.Random(seed)
+    rows_per_page = (PORTRAIT[1] - TOP - BOTTOM_MARGIN) // (LINE_HEIGHT * 2)
+    entries = _entries(rng, pages * rows_per_page, 50000.0)
+
+    doc = fitz.open()
+    truth = []
+
+    for p in range(pages):
+        page = doc.new_page(width=PORTRAIT[0], height=PORTRAIT[1])
+        maybank_page_header(page, p + 1)
+        y = TOP
+
+        for day, amount, is_credit, balance in entries[p * rows_per_page:(p + 1) * rows_per_page]:
+            kind = "TRANSFER FR A/C" if is_credit else rng.choice(["TRANSFER TO A/C", "DEBIT ADVICE", "FPX PAYMENT"])
+            description = f"{kind} {rng.choice(NAMES)}"
+            sign = "+" if is_credit else "-"
+
+            _text(page, 40, y, f"{day:02d} {MONTH_ABBR} {YEAR}" if full_dates else f"{day:02d}/{MONTH:02d}")
+            _text(page, 100, y, description)
+
+            _right(page, 450, y, f"{_amount(amount)}{sign}")
+            _right(page, 550, y, _amount(balance))
+
+            if rng.random() < 0.5:
+                _text(page, 100, y + LINE_HEIGHT, rng.choice(PURPOSES))
+
+            truth.append({
+                "date": f"{day:02d}/{MONTH:02d}/{YEAR}",
+                "description": description,
+                "debit": 0.0 if is_credit else amount,
+                "credit": amount if is_credit else 0.0,
+                "balance": balance,
+                "page": p + 1,
+            })
+            y += LINE_HEIGHT * 2
+
+    return _save(doc), truth
+
+
+def generate_maybank_mbb(pages, seed=0):
+    return generate_maybank(pages, seed, full_dates=True)
+
+
+# ---------------------------------------------------
+# Public Bank (PBB)
+# ---------------------------------------------------
+def generate_pbb(pages, seed=0):
+    """
+    PBB: a "Balance B/F" line per page, then entries of one to three lines.
+    The date is printed only on the first entry of each day; later entries
+    that day start with their transaction keyword. Amount and balance sit
+    on the entry's last line, without a debit/credit sign.
+    """
+    rng = random.Random(seed)
+    rows_per_page = (PORTRAIT[1] - TOP - BOTTOM_MARGIN) // (LINE_HEIGHT * 3)
+    entries = _entries(rng, pages * rows_per_page, 50000.0)
+
+    doc = fitz.open()
+    truth = []
+    balance_bf = 50000.0
+
+    for p in range(pages):
+        page = doc.new_page(width=PORTRAIT[0], height=PORTRAIT[1])
+        _text(page, 40, 50, "PUBLIC BANK BERHAD", 11)
+        _text(page, 40, 66, f"MUKA SURAT / PAGE {p + 1}")
+        _text(page, 40, 90, "TARIKH / DATE")
+        _text(page, 110, 90, "URUS NIAGA / TRANSACTION")
+        _text(page, 400, 90, "DEBIT / KREDIT")
+        _text(page, 500, 90, "BAKI / BALANCE")
+
+        page_entries = entries[p * rows_per_page:(p + 1) * rows_per_page]
+        y = TOP
+        _text(page, 40, y, f"{page_entries[0][0]:02d}/{MONTH:02d}")
+        _text(page, 110, y, "Balance B/F")
+        _right(page, 560, y, _amount(balance_bf))
+        y += LINE_HEIGHT
+
+        last_day = None
+        for day, amount, is_credit, balance in page_entries:
+            keyword = "DUITNOW TRSF CR" if is_credit else rng.choice(["DUITNOW TRSF DR", "GIRO DR", "JOMPAY DR"])
+            lines = [keyword] + rng.sample([rng.choice(NAMES), rng.choice(PURPOSES)], rng.randint(0, 2))
+
+            for i, line in enumerate(lines):
+                if i == 0 and day != last_day:
+                    _text(page, 40, y, f"{day:02d}/{MONTH:02d}")
+                _text(page, 110, y, line)
+                if i == len(lines) - 1:
+                    _right(page, 460, y, _amount(amount))
+                    _right(page, 560, y, _amount(balance))
+                y += LINE_HEIGHT
+
+            truth.append({
+                "date": f"{YEAR}-{MONTH:02d}-{day:02d}",
+                "description": " ".join(lines),
+                "debit": 0.0 if is_credit else amount,
+                "credit": amount if is_credit else 0.0,
+                "balance": balance,
+                "page": p + 1,
+            })
+            last_day = day
+
+        balance_bf = page_entries[-1][3]
+
+    return _save(doc), truth
+
+
+# ---------------------------------------------------
+# RHB
+# ---------------------------------------------------
+def generate_rhb(pages, seed=0):
+    """
+    RHB: "dd Mon" dates, description, cheque/serial number, then separate
+    Debit and Credit columns and the balance, amounts right-aligned.
+    Some entries continue on a second line.
+    """
+    rng = random.Random(seed)
+    rows_per_page = (PORTRAIT[1] - TOP - BOTTOM_MARGIN) // (LINE_HEIGHT * 2) - 1
+    entries = _entries(rng, pages * rows_per_page, 50000.0)
+
+    doc = fitz.open()
+    truth = []
+    balance_bf = 50000.0
+
+    for p in range(pages):
+        page = doc.new_page(width=PORTRAIT[0], height=PORTRAIT[1])
+        _text(page, 40, 50, "RHB BANK BERHAD", 11)
+        _text(page, 40, 66, f"Statement Period 01 {MONTH_ABBR} {YEAR} to 31 {MONTH_ABBR} {YEAR}")
+        for x, heading in [(40, "Date"), (90, "Description"), (260, "Cheque / Serial No"),
+                           (360, "Debit"), (430, "Credit"), (500, "Balance")]:
+            _text(page, x, 90, heading)
+
+        page_entries = entries[p * rows_per_page:(p + 1) * rows_per_page]
+        y = TOP
+        _text(page, 40, y, f"{page_entries[0][0]:02d} {MONTH_ABBR}")
+        _text(page, 90, y, "B/F BALANCE")
+        _right(page, 560, y, _amount(balance_bf))
+        y += LINE_HEIGHT
+
+        for day, amount, is_credit, balance in page_entries:
+            description = "INWARD IBG CR" if is_credit else rng.choice(["DUITNOW TRF DR", "ATM WITHDRAWAL DR"])
+            serial = f"{rng.randint(100000, 999999)}"
+
+            _text(page, 40, y, f"{day:02d} {MONTH_ABBR}")
+            _text(page, 90, y, description)
+            _text(page, 260, y, serial)
+            _right(page, 490 if is_credit else 420, y, _amount(amount))
+            _right(page, 560, y, _amount(balance))
+
+            if rng.random() < 0.5:
+                extra = rng.choice(NAMES)
+                _text(page, 90, y + LINE_HEIGHT, extra)
+                description = f"{description} {extra}"
+
+            truth.append({
+                "date": f"{YEAR}-{MONTH:02d}-{day:02d}",
+                "description": description,
+                "debit": 0.0 if is_credit else amount,
+                "credit": amount if is_credit else 0.0,
+                "balance": balance,
+                "page": p + 1,
+            })
+            y += LINE_HEIGHT * 2
+
+        _text(page, 40, y, f"{page_entries[-1][0]:02d} {MONTH_ABBR}")
+        _text(page, 90, y, "C/F BALANCE")
+        _right(page, 560, y, _amount(page_entries[-1][3]))
+
+        balance_bf = page_entries[-1][3]
+
+    return _save(doc), truth
+
+
+# ---------------------------------------------------
+# Ruled Tables (CIMB, Bank Islam)
+# ---------------------------------------------------
+def draw_table(page, columns, rows, top, row_height, size=FONT_SIZE):
+    """
+    Draw a fully ruled table. columns are the x edges (len = cells + 1);
+    rows are lists of cell strings, where a cell may contain "\n".
+    Returns the y below the table.
+    """
+    y = top
+    edges = [y]
+    for row in rows:
+        height = row_height * max(cell.count("\n") + 1 for cell in row)
+        for cell, x in zip(row, columns):
+            for i, line in enumerate(cell.split("\n")):
+                _text(page, x + 2, y + row_height * (i + 1) - 3, line, size)
+        y += height
+        edges.append(y)
+
+    for e in edges:
+        page.draw_line((columns[0], e), (columns[-1], e), width=0.5)
+    for x in columns:
+        page.draw_line((x, top), (x, y), width=0.5)
+
+    return y
+
+
+def generate_cimb(pages, seed=0):
+    """
+    CIMB: a six-column ruled table (Date, Description, Ref, Withdrawal,
+    Deposit, Balance) with an OPENING BALANCE row on the first page.
+    Some descriptions wrap onto a second line inside their cell.
+    """
+    rng = random.Random(seed)
+    columns = [30, 90, 270, 350, 430, 500, 570]
+    row_height = LINE_HEIGHT + 2
+    rows_per_page = (PORTRAIT[1] - TOP - BOTTOM_MARGIN) // (row_height * 2) - 1
+    entries = _entries(rng, pages * rows_per_page, 50000.0)
+
+    doc = fitz.open()
+    truth = []
+
+    for p in range(pages):
+        page = doc.new_page(width=PORTRAIT[0], height=PORTRAIT[1])
+        _text(page, 30, 50, "CIMB BANK BERHAD", 11)
+        _text(page, 30, 66, f"STATEMENT OF ACCOUNT   PAGE {p + 1}")
+
+        rows = [["Date", "Description", "Cheque / Ref No", "Withdrawal", "Deposits", "Balance"]]
+
+        if p == 0:
+            rows.append(["", "OPENING BALANCE", "", "", "", _amount(50000.0)])
+            truth.append({"date": "", "description": "OPENING BALANCE", "ref_no": "",
+                          "debit": 0.0, "credit": 0.0, "balance": 50000.0, "page": 1})
+
+        for day, amount, is_credit, balance in entries[p * rows_per_page:(p + 1) * rows_per_page]:
+            date = f"{day:02d}/{MONTH:02d}/{YEAR}"
+            description = "DUITNOW TRANSFER" if is_credit else rng.choice(["IBG PAYMENT", "CARD PURCHASE"])
+            wrapped = rng.random() < 0.4
+            cell = f"{description}\n{rng.choice(NAMES)}" if wrapped else description
+            ref = f"REF{rng.randint(10000, 99999)}"
+
+            rows.append([date, cell, ref,
+                         "" if is_credit else _amount(amount),
+                         _amount(amount) if is_credit else "",
+                         _amount(balance)])
+
+            truth.append({
+                "date": date,
+                "description": cell.replace("\n", " "),
+                "ref_no": ref,
+                "debit": 0.0 if is_credit else amount,
+                "credit": amount if is_credit else 0.0,
+                "balance": balance,
+                "page": p + 1,
+            })
+
+        draw_table(page, columns, rows, TOP - 20, row_height)
+
+    return _save(doc), truth
+
+
+def generate_bank_islam(pages, seed=0):
+    """
+    Bank Islam: a ten-column ruled table on landscape pages
+    (No, Date, EFT No, Code, Description, Ref No, Branch, Debit, Credit,
+    Balance) with "-" in the unused amount column.
+    """
+    rng = random.Random(seed)
+    columns = [20, 45, 110, 170, 205, 420, 500, 560, 650, 740, 825]
+    row_height = LINE_HEIGHT
+    rows_per_page = (LANDSCAPE[1] - TOP - BOTTOM_MARGIN) // row_height - 2
+    entries = _entries(rng, pages * rows_per_page, 50000.0)
+
+    doc = fitz.open()
+    truth = []
+    number = 0
+
+    for p in range(pages):
+        page = doc.new_page(width=LANDSCAPE[0], height=LANDSCAPE[1])
+        _text(page, 20, 50, "BANK ISLAM MALAYSIA BERHAD", 11)
+        _text(page, 20, 66, f"STATEMENT OF ACCOUNT   PAGE {p + 1}")
+
+        rows = [["No", "Date", "EFT No", "Code", "Description", "Ref No", "Branch", "Debit", "Credit", "Balance"]]
+
+        for day, amount, is_credit, balance in entries[p * rows_per_page:(p + 1) * rows_per_page]:
+            number += 1
+            description = f"{'PROFIT PAID' if is_credit else 'FUND TRANSFER'} {rng.choice(NAMES)}"
+
+            rows.append([
+                str(number),
+                f"{day:02d}/{MONTH:02d}/{YEAR}",
+                f"{rng.randint(100000, 999999)}",
+                "CR" if is_credit else "DR",
+                description,
+                f"R{rng.randint(1000, 9999)}",
+                "HQ",
+                "-" if is_credit else _amount(amount),
+                _amount(amount) if is_credit else "-",
+                _amount(balance),
+            ])
+
+            truth.append({
+                "date": f"{YEAR}-{MONTH:02d}-{day:02d}",
+                "description": description,
+                "ref_no": rows[-1][5],
+                "debit": 0.0 if is_credit else amount,
+                "credit": amount if is_credit else 0.0,
+                "balance": balance,
+                "page": p + 1,
+            })
+
+        draw_table(page, columns, rows, TOP - 20, row_height, size=7)
+
+    return _save(doc), truth
+
+
+# ---------------------------------------------------
+# Registry
+# ---------------------------------------------------
+# layout name -> (bank_hint, generator)
+LAYOUTS = {
+    "maybank_mtasb": ("maybank", generate_maybank),
+    "maybank_mbb": ("maybank", generate_maybank_mbb),
+    "pbb": ("pbb", generate_pbb),
+    "rhb": ("rhb", generate_rhb),
+    "cimb": ("cimb", generate_cimb),
+    "bank_islam": ("bank_islam", generate_bank_islam),
+}
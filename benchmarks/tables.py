@@ -0,0 +1,222 @@
+"""
+Ruled tables (CIMB, Bank Islam): pdfplumber table detection on every page
+vs a grid learned once.
+
+Usage (from the repository root):
+    python -m benchmarks.tables [pages]
+
+Three paths per bank from PDF bytes to transactions, each timed end to end:
+    extract_table   the previous parser: extract_table(s)() with default
+                    settings on every page (line and intersection
+                    detection over the whole page)
+    explicit lines  grid learned once; later pages cropped to the table
+                    columns and given the grid as explicit vertical lines
+    word grid       grid learned once; PyMuPDF words bucketed into it
+                    (the pipeline's path)
+Rows are compared with the extract_table path's. Both pdfplumber paths
+spend nearly all their time building the page's characters, which no
+table setting avoids, so only the word grid changes pages per second.
+"""
+import io
+import re
+import sys
+import time
+
+import pdfplumber
+from tabulate import tabulate
+
+from amounts import parse_amount
+from cimb import find_grid_cimb
+from bank_islam import find_grid_bank_islam
+from extraction import open_document, pdfplumber_rules, pdfplumber_words
+from pipeline import iter_word_partials
+from benchmarks.synthetic import generate_cimb, generate_bank_islam
+
+
+DEFAULT_PAGES = 50
+REPEATS = 3
+
+
+# ---------------------------------------------------
+# Previous table parsers
+# ---------------------------------------------------
+def parse_float(value):
+    return parse_amount(value) or 0.0
+
+
+def clean_text(text):
+    if not text:
+        return ""
+    return text.replace("\n", " ").strip()
+
+
+def table_rows(table, page_num):
+    """cimb.py parse_transactions_cimb: six cells per row, by position."""
+    transactions = []
+    for row in table or []:
+        if not row or len(row) < 6:
+            continue
+
+        first_col = str(row[0]).lower()
+        if "date" in first_col or "tarikh" in first_col:
+            continue
+
+        if "opening balance" in str(row[1]).lower():
+            transactions.append({"date": "", "description": "OPENING BALANCE", "ref_no": "",
+                                 "debit": 0.0, "credit": 0.0, "balance": parse_float(row[5]), "page": page_num})
+            continue
+
+        if not row[5]:
+            continue
+
+        debit_val = parse_float(row[3])
+        credit_val = parse_float(row[4])
+        if debit_val == 0.0 and credit_val == 0.0:
+            continue
+
+        transactions.append({
+            "date": clean_text(row[0]),
+            "description": clean_text(row[1]),
+            "ref_no": clean_text(row[2]),
+            "debit": debit_val,
+            "credit": credit_val,
+            "balance": parse_float(row[5]),
+            "page": page_num,
+        })
+    return transactions
+
+
+def bank_islam_rows(tables):
+    """bank_islam.py parse_bank_islam, for one page's tables: ten cells per row, by position."""
+    transactions = []
+    for table in tables or []:
+        if not table or len(table) < 2:
+            continue
+
+        for row in table[1:]:
+            if len(row) < 10:
+                continue
+
+            no, date_raw, _, _, desc, _, _, debit_raw, credit_raw, balance_raw = row[:10]
+            if not date_raw or "Total" in str(no):
+                continue
+
+            if re.match(r"\d{2}/\d{2}/\d{4}", date_raw):
+                dd, mm, yyyy = date_raw.split("/")
+                date_raw = f"{yyyy}-{mm}-{dd}"
+
+            transactions.append({
+                "date": date_raw,
+                "description": " ".join(str(desc).split()),
+                "debit": parse_float(debit_raw),
+                "credit": parse_float(credit_raw),
+                "balance": parse_float(balance_raw),
+            })
+    return transactions
+
+
+# ---------------------------------------------------
+# Paths
+# ---------------------------------------------------
+def cimb_extract_table(page, n):
+    return table_rows(page.extract_table(), n)
+
+
+def bank_islam_extract_tables(page, n):
+    return bank_islam_rows(page.extract_tables())
+
+
+def pdfplumber_path(pdf_bytes, parse_page):
+    out = []
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        for n, page in enumerate(pdf.pages, 1):
+            out.extend(parse_page(page, n))
+            page.close()
+    return out
+
+
+def explicit_lines_path(pdf_bytes, find_grid, parse_rows):
+    """Grid from the first page; every page cropped to its columns, tables found on explicit lines."""
+    out = []
+    settings = None
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        for n, page in enumerate(pdf.pages, 1):
+            if settings is None:
+                edges = find_grid(pdfplumber_words(page), pdfplumber_rules(page))["edges"]
+                settings = {"vertical_strategy": "explicit", "explicit_vertical_lines": edges,
+                            "horizontal_strategy": "lines"}
+            body = page.crop((edges[0] - 1, 0, edges[-1] + 1, page.height))
+            out.extend(parse_rows(body, n, settings))
+            page.close()
+    return out
+
+
+def word_grid_path(pdf_bytes, bank_hint):
+    with open_document("pymupdf", pdf_bytes) as doc:
+        return [t for _, partial in iter_word_partials(bank_hint, doc, range(1, len(doc) + 1), "2025")
+                for t in partial["transactions"]]
+
+
+def cimb_fields(t):
+    return (t["date"], t["description"], t["ref_no"], t["debit"], t["credit"], t["balance"], t["page"])
+
+
+def bank_islam_fields(t):
+    return (t["date"], t["description"], t["debit"], t["credit"], t["balance"])
+
+
+# bank -> (generator, compared fields, [(path name, pdf_bytes -> rows)])
+BANKS = {
+    "cimb": (generate_cimb, cimb_fields, [
+        ("extract_table", lambda pdf: pdfplumber_path(pdf, cimb_extract_table)),
+        ("explicit lines", lambda pdf: explicit_lines_path(
+            pdf, find_grid_cimb, lambda body, n, settings: table_rows(body.extract_table(settings), n))),
+        ("word grid", lambda pdf: word_grid_path(pdf, "cimb")),
+    ]),
+    "bank_islam": (generate_bank_islam, bank_islam_fields, [
+        ("extract_tables", lambda pdf: pdfplumber_path(pdf, bank_islam_extract_tables)),
+        ("explicit lines", lambda pdf: explicit_lines_path(
+            pdf, find_grid_bank_islam, lambda body, n, settings: bank_islam_rows(body.extract_tables(settings)))),
+        ("word grid", lambda pdf: word_grid_path(pdf, "bank_islam")),
+    ]),
+}
+
+
+def best_time(fn, *args):
+    best, result = None, None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+# ---------------------------------------------------
+# Entry Point
+# ---------------------------------------------------
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    pages = int(argv[0]) if argv else DEFAULT_PAGES
+
+    table = []
+    for bank, (generate, fields, paths) in BANKS.items():
+        pdf_bytes, _ = generate(pages)
+        reference = None
+        base_seconds = None
+        for name, path in paths:
+            seconds, rows = best_time(path, pdf_bytes)
+            if reference is None:
+                reference, base_seconds = list(map(fields, rows)), seconds
+            table.append([
+                bank, name, len(rows), f"{seconds:.3f}", f"{pages / seconds:.0f}",
+                f"{base_seconds / seconds:.1f}x", "yes" if list(map(fields, rows)) == reference else "NO",
+            ])
+
+    print(f"{pages} pages, best of {REPEATS}")
+    print(tabulate(table, headers=["Bank", "Path", "Rows", "Seconds", "Pages/s", "Speedup", "Same rows"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import os
+import json
+import hashlib
+from functools import lru_cache
+
+from disk_cache import DiskCache
+from pipeline import METADATA_KEYS
+from extraction import resolve_backend
+
+
+# ---------------------------------------------------
+# Configuration
+# ---------------------------------------------------
+# Source files whose contents decide what a parse returns.
+# Editing any of them invalidates every cached entry.
+PARSER_MODULES = [
+    "maybank.py", "public_bank.py", "rhb.py", "cimb.py", "bank_islam.py", "amounts.py",
+    "pipeline.py", "extraction.py", "page_text.py", "table_grid.py", "ocr.py",
+]
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "PARSE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "bank-statement-parser")
+)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+# ---------------------------------------------------
+# Cache Keys
+# ---------------------------------------------------
+@lru_cache(maxsize=1)
+def parser_fingerprint():
+    """
+    SHA-256 over the parser source files, computed once per process.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+
+    for name in PARSER_MODULES:
+        digest.update(name.encode())
+        try:
+            with open(os.path.join(here, name), "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(b"<missing>")
+
+    return digest.hexdigest()
+
+
+def cache_key(pdf_bytes, bank_hint, default_year, backend=None, extract_options=None):
+    """
+    Content-addressed key: PDF bytes + bank + default year + extraction
+    backend and its options + parser version.
+    The filename is deliberately not part of the key.
+    """
+    parts = [
+        hashlib.sha256(pdf_bytes).hexdigest(),
+        str(bank_hint),
+        str(default_year),
+        resolve_backend(bank_hint, backend),
+        json.dumps(extract_options or {}, sort_keys=True),
+        parser_fingerprint(),
+    ]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+# ---------------------------------------------------
+# Parse Result Cache
+# ---------------------------------------------------
+class ParseCache(DiskCache):
+    """
+    Parsed transaction lists, one JSON file per PDF/bank/year/parser version.
+    Entries are {"pages": int, "transactions": [...]}, plus "routes" for
+    the hybrid backend; cached transactions carry no file/bank/statement
+    metadata.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(directory, max_bytes)
+
+    def put(self, key, transactions, pages, routes=None):
+        # Metadata depends on the filename, not the PDF contents
+        stripped = [
+            {k: v for k, v in t.items() if k not in METADATA_KEYS}
+            for t in transactions
+        ]
+        entry = {"pages": pages, "transactions": stripped}
+        if routes:
+            entry["routes"] = routes
+        super().put(key, entry)
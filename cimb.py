@@ -1,79 +1,116 @@
 import re
 
-def parse_float(value):
-    """Converts string '1,234.56' to float 1234.56. Returns 0.0 if empty."""
-    if not value:
-        return 0.0
-    clean_val = str(value).replace("\n", "").replace(" ", "").replace(",", "")
-    if not re.match(r'^-?\d+(\.\d+)?$', clean_val):
-        return 0.0
-    return float(clean_val)
-
-def clean_text(text):
-    """Removes excess newlines from descriptions."""
-    if not text:
-        return ""
-    return text.replace("\n", " ").strip()
-
-def parse_transactions_cimb(page_obj, page_num, source_file):
+from amounts import parse_amount
+from page_text import MAX_CONTINUATION_LINES
+from table_grid import body_rows, find_grid, row_cells
+
+
+# ---------------------------------------------------
+# Configuration
+# ---------------------------------------------------
+DATE = re.compile(r"\d{2}/\d{2}/\d{4}")
+
+# Header words naming each column of the six-column table
+HEADER_WORDS = {
+    "date": ("DATE", "TARIKH"),
+    "description": ("DESCRIPTION", "DISKRIPSI"),
+    "ref_no": ("CHEQUE", "REF"),
+    "debit": ("WITHDRAWAL", "WITHDRAWALS"),
+    "credit": ("DEPOSIT", "DEPOSITS"),
+    "balance": ("BALANCE", "BAKI"),
+}
+
+# Columns a header row must name to be taken for the table header
+REQUIRED_COLUMNS = {"date", "debit", "credit", "balance"}
+
+# Amounts are right-aligned: without ruling, a wide one can start left of
+# its header word, so it is placed by its right edge
+ANCHORS = {"debit": "right", "credit": "right", "balance": "right"}
+
+# Rows that close the table; nothing after them continues a description
+SECTION_END = ("CLOSING BALANCE", "BAKI PENUTUP", "TOTAL WITHDRAWAL", "TOTAL DEPOSIT", "END OF STATEMENT")
+
+
+# ---------------------------------------------------
+# Table Grid
+# ---------------------------------------------------
+def find_grid_cimb(words, rules=()):
+    """
+    The six-column grid from a page's header row and ruling (see
+    table_grid.find_grid), or None. CIMB prints the same table on every
+    page, so the grid is found once and reused for the whole statement.
     """
-    Parses a single pdfplumber page object to extract CIMB transactions.
-    Requires 'page_obj' (not just text string) to use extract_table().
+    return find_grid(words, rules, HEADER_WORDS, REQUIRED_COLUMNS, DATE, ANCHORS)
+
+
+# ---------------------------------------------------
+# Main Logic
+# ---------------------------------------------------
+def parse_page_cimb(words, page_num, year=None, grid=None):
     """
+    Parse one page of CIMB transactions from PyMuPDF words
+    (x0, y0, x1, y1, text, ...) placed in the grid from find_grid_cimb.
+    Rows above the page's header row are skipped. A dated row with an
+    amount starts a transaction; rows without a date continue its
+    description and reference. Dates are printed in full, so year is unused.
+    """
+    if grid is None:
+        grid = find_grid_cimb(words)
+        if grid is None:
+            return []
+
     transactions = []
-    
-    # extract_table uses the grid lines to identify columns
-    table = page_obj.extract_table()
-    
-    if not table:
-        return []
-
-    for row in table:
-        # CIMB Structure: [Date, Desc, Ref, Withdrawal, Deposit, Balance]
-        if not row or len(row) < 6:
-            continue
-        
-        # Skip headers
-        first_col = str(row[0]).lower()
-        if "date" in first_col or "tarikh" in first_col:
+    current = None      # last transaction, while its description may continue
+    lines = 0
+
+    for row in body_rows(words, HEADER_WORDS, REQUIRED_COLUMNS):
+        cells = row_cells(row, grid)
+        description = cells.get("description", "")
+
+        if any(end in description.upper() for end in SECTION_END):
+            current = None
             continue
 
-        # Handle Opening Balance
-        if "opening balance" in str(row[1]).lower():
+        if "OPENING BALANCE" in description.upper():
             transactions.append({
                 "date": "",
                 "description": "OPENING BALANCE",
                 "ref_no": "",
                 "debit": 0.0,
                 "credit": 0.0,
-                "balance": parse_float(row[5]),
+                "balance": parse_amount(cells.get("balance")) or 0.0,
                 "page": page_num,
-                "source_file": source_file
             })
+            current = None
             continue
 
-        # Ensure valid balance exists
-        if not row[5]:
-            continue
+        if DATE.fullmatch(cells.get("date", "")):
+            debit = parse_amount(cells.get("debit")) or 0.0
+            credit = parse_amount(cells.get("credit")) or 0.0
 
-        # Strict Column Mapping
-        debit_val = parse_float(row[3])   # Col 3 is Withdrawal
-        credit_val = parse_float(row[4])  # Col 4 is Deposit
-        
-        # Skip empty rows (sometimes descriptions spill over without money)
-        if debit_val == 0.0 and credit_val == 0.0:
-            continue
+            # A dated row with no balance or no money in it is not a transaction
+            if not cells.get("balance") or (debit == 0.0 and credit == 0.0):
+                current = None
+                continue
 
-        tx = {
-            "date": clean_text(row[0]),
-            "description": clean_text(row[1]),
-            "ref_no": clean_text(row[2]),
-            "debit": debit_val,
-            "credit": credit_val,
-            "balance": parse_float(row[5]),
-            "page": page_num,
-            "source_file": source_file
-        }
-        transactions.append(tx)
+            current = {
+                "date": cells["date"],
+                "description": description,
+                "ref_no": cells.get("ref_no", ""),
+                "debit": debit,
+                "credit": credit,
+                "balance": parse_amount(cells["balance"]) or 0.0,
+                "page": page_num,
+            }
+            lines = 1
+            transactions.append(current)
+
+        elif current is not None and lines < MAX_CONTINUATION_LINES:
+            if description:
+                current["description"] = f"{current['description']} {description}".strip()
+            if cells.get("ref_no"):
+                current["ref_no"] = f"{current['ref_no']} {cells['ref_no']}".strip()
+            lines += 1
 
     return transactions
+
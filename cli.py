@@ -0,0 +1,299 @@
+"""
+Parse a directory tree of statement PDFs without the web UI.
+
+Usage (from the repository root):
+    python cli.py statements/ -o transactions.jsonl
+    python cli.py statements/ -o transactions/ --format parquet --bank maybank --workers 8
+    python cli.py statements/ -o transactions.jsonl --resume
+
+Files are parsed with a worker pool, largest first, and written chunk by
+chunk, so memory stays flat however many files there are. A manifest next
+to the output (<output>.files.jsonl) records every finished file; --resume
+skips the files it lists and retries failed ones. Rows of files missing from
+the manifest (a run stopped between writing them and the manifest) are
+dropped from the output first, so those files are not written twice.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+from batch import process_batch
+from cache import ParseCache
+from extraction import BACKENDS
+from pipeline import SUPPORTED_BANKS
+
+
+# ---------------------------------------------------
+# Configuration
+# ---------------------------------------------------
+# Files read into memory per worker at a time
+FILES_PER_WORKER = 4
+
+MANIFEST_SUFFIX = ".files.jsonl"
+
+# Column order for Parquet output; keys a parser does not produce are null
+PARQUET_COLUMNS = [
+    ("date", "string"),
+    ("description", "string"),
+    ("ref_no", "string"),
+    ("debit", "float64"),
+    ("credit", "float64"),
+    ("balance", "float64"),
+    ("page", "int64"),
+    ("source_file", "string"),
+    ("bank", "string"),
+    ("statement_year", "int64"),
+    ("statement_month", "int64"),
+    ("statement_period", "string"),
+]
+
+
+# ---------------------------------------------------
+# Input Discovery
+# ---------------------------------------------------
+def find_pdfs(root):
+    """
+    All PDFs under root as paths relative to it (forward slashes),
+    largest first so the longest files start while the pool is fresh.
+    """
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.lower().endswith(".pdf"):
+                path = os.path.join(dirpath, name)
+                found.append((os.path.getsize(path), os.path.relpath(path, root).replace(os.sep, "/")))
+
+    found.sort(key=lambda f: (-f[0], f[1]))
+    return [rel for _, rel in found]
+
+
+# ---------------------------------------------------
+# Output Writers
+# ---------------------------------------------------
+class JsonlWriter:
+    """One transaction per line, appended."""
+
+    def __init__(self, path):
+        self.path = path
+        self.buffer = []
+
+    def write(self, transactions):
+        self.buffer.extend(transactions)
+
+    def flush(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for t in self.buffer:
+                f.write(json.dumps(t, ensure_ascii=False) + "\n")
+        self.buffer = []
+
+    def keep_files(self, files):
+        """Drop rows whose source_file is not in files; returns how many went."""
+        if not os.path.exists(self.path):
+            return 0
+
+        dropped = 0
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for row in read_jsonl(self.path):
+                if row.get("source_file") in files:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                else:
+                    dropped += 1
+
+        if dropped:
+            os.replace(tmp_path, self.path)
+        else:
+            os.remove(tmp_path)
+        return dropped
+
+
+class ParquetWriter:
+    """A directory of part-NNNNN.parquet files, one per flushed chunk."""
+
+    def __init__(self, path):
+        self.path = path
+        self.buffer = []
+        os.makedirs(path, exist_ok=True)
+
+    def _parts(self):
+        return sorted(n for n in os.listdir(self.path) if n.startswith("part-") and n.endswith(".parquet"))
+
+    def write(self, transactions):
+        self.buffer.extend(transactions)
+
+    def flush(self):
+        if not self.buffer:
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([(name, pa.type_for_alias(kind)) for name, kind in PARQUET_COLUMNS])
+        columns = {name: [t.get(name) for t in self.buffer] for name, _ in PARQUET_COLUMNS}
+        table = pa.Table.from_pydict(columns, schema=schema)
+
+        part = os.path.join(self.path, f"part-{len(self._parts()):05d}.parquet")
+        pq.write_table(table, part + ".tmp")
+        os.replace(part + ".tmp", part)
+        self.buffer = []
+
+    def keep_files(self, files):
+        """
+        Drop rows whose source_file is not in files; returns how many went.
+        Emptied parts stay as empty files so part numbers keep counting up.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        dropped = 0
+        for name in self._parts():
+            part = os.path.join(self.path, name)
+            table = pq.read_table(part)
+            keep = pc.is_in(table.column("source_file"), value_set=pa.array(sorted(files), pa.string()))
+            kept = table.filter(keep)
+            if kept.num_rows == table.num_rows:
+                continue
+
+            pq.write_table(kept, part + ".tmp")
+            os.replace(part + ".tmp", part)
+            dropped += table.num_rows - kept.num_rows
+        return dropped
+
+
+WRITERS = {"jsonl": JsonlWriter, "parquet": ParquetWriter}
+
+
+def read_jsonl(path):
+    """Rows of a JSONL file; a torn last line from an interrupted run is skipped."""
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+# ---------------------------------------------------
+# Batch Run
+# ---------------------------------------------------
+def run(root, output, fmt="jsonl", bank_hint=None, default_year=None, workers=None,
+        resume=False, backend=None, use_cache=True, log=print):
+    """
+    Parse every PDF under root into output. Returns totals:
+    files, skipped, errors, pages, transactions, seconds.
+    """
+    workers = workers or os.cpu_count() or 1
+    manifest = output.rstrip("/\\") + MANIFEST_SUFFIX
+
+    if not resume and (os.path.exists(output) or os.path.exists(manifest)):
+        raise FileExistsError(f"{output} already exists - pass --resume to continue it, or remove it.")
+
+    writer = WRITERS[fmt](output)
+    cache = ParseCache() if use_cache else None
+
+    paths = find_pdfs(root)
+    done = set()
+    if resume:
+        # The manifest is the record of finished files; rows are only trusted for those
+        done = {row["source_file"] for row in read_jsonl(manifest) if not row.get("error")}
+        dropped = writer.keep_files(done)
+        if dropped:
+            log(f"Dropped {dropped} rows of files not in {manifest}; they will be parsed again")
+
+    todo = [p for p in paths if p not in done]
+    totals = {"files": 0, "skipped": len(paths) - len(todo), "errors": 0,
+              "pages": 0, "transactions": 0, "seconds": 0.0}
+
+    start = time.perf_counter()
+    chunk_size = workers * FILES_PER_WORKER
+
+    for first in range(0, len(todo), chunk_size):
+        files = []
+        for rel in todo[first:first + chunk_size]:
+            with open(os.path.join(root, rel), "rb") as f:
+                files.append((rel, f.read()))
+
+        def on_result(result):
+            totals["files"] += 1
+            if result["error"]:
+                totals["errors"] += 1
+                log(f"[{totals['files']}/{len(todo)}] {result['source_file']}: ERROR {result['error']}")
+                return
+            totals["pages"] += result["pages"]
+            totals["transactions"] += len(result["transactions"])
+            writer.write(result["transactions"])
+            log(f"[{totals['files']}/{len(todo)}] {result['source_file']}: "
+                f"{result['bank']}, {result['pages']} pages, {len(result['transactions'])} transactions")
+
+        results = process_batch(files, bank_hint, None, default_year, workers=workers,
+                                on_result=on_result, cache=cache, backend=backend)
+
+        # Rows first, then the manifest: a file is only marked done once its rows are on disk
+        writer.flush()
+        with open(manifest, "a", encoding="utf-8") as f:
+            for r in results:
+                f.write(json.dumps({
+                    "source_file": r["source_file"],
+                    "bank": r["bank"],
+                    "pages": r["pages"],
+                    "transactions": len(r["transactions"]),
+                    "seconds": round(r["seconds"], 3),
+                    "error": r["error"],
+                }) + "\n")
+
+    totals["seconds"] = time.perf_counter() - start
+    return totals
+
+
+def format_summary(totals):
+    seconds = totals["seconds"] or 1e-9
+    return "\n".join([
+        f"Files:        {totals['files']} parsed, {totals['skipped']} skipped, {totals['errors']} failed",
+        f"Pages:        {totals['pages']}",
+        f"Transactions: {totals['transactions']}",
+        f"Elapsed:      {totals['seconds']:.1f}s",
+        f"Throughput:   {totals['files'] / seconds:.2f} files/s · "
+        f"{totals['pages'] / seconds:.1f} pages/s · {totals['transactions'] / seconds:.0f} transactions/s",
+    ])
+
+
+# ---------------------------------------------------
+# Entry Point
+# ---------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse a directory of bank statement PDFs.")
+    parser.add_argument("root", help="directory to search for PDFs (recursively)")
+    parser.add_argument("-o", "--output", required=True,
+                        help="JSONL file, or directory of Parquet parts with --format parquet")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="jsonl")
+    parser.add_argument("--bank", choices=SUPPORTED_BANKS, default=None,
+                        help="bank of every file (default: detect per file)")
+    parser.add_argument("--year", default=None, help="year for dates printed without one (default: each statement's own year)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=None,
+                        help="text extraction backend (default: fastest per bank)")
+    parser.add_argument("--resume", action="store_true", help="skip files already in the output")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the parse cache")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        parser.error(f"{args.root} is not a directory")
+
+    try:
+        totals = run(args.root, args.output, args.format, args.bank, args.year, args.workers,
+                     args.resume, args.backend, not args.no_cache,
+                     log=lambda message: print(message, file=sys.stderr))
+    except FileExistsError as e:
+        parser.error(str(e))
+
+    print(format_summary(totals))
+    return 1 if totals["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
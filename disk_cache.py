@@ -0,0 +1,124 @@
+import os
+import json
+import threading
+
+
+# ---------------------------------------------------
+# On-Disk LRU Cache
+# ---------------------------------------------------
+class DiskCache:
+    """
+    JSON entries stored as one file per key.
+    File mtime is the LRU clock: a hit touches the file, and when the
+    directory grows past max_bytes the least recently used entries go first.
+    Safe to share between processes: writes are atomic renames.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._size = None  # running estimate, so puts don't rescan the directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """
+        Returns the stored entry, or None on a miss.
+        """
+        path = self._path(key)
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # mark as recently used
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, separators=(",", ":"))
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+
+        if self._size is None or self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache fits in max_bytes.
+        """
+        entries = []
+        total = 0
+
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+            total += st.st_size
+
+        entries.sort()
+
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+
+        with self._lock:
+            self._size = total
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+        with self._lock:
+            self._size = 0
+
+    def stats(self):
+        entries = 0
+        size = 0
+
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                try:
+                    size += os.path.getsize(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries += 1
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,163 @@
+import io
+import json
+import threading
+import importlib.util
+
+from report import records
+
+
+# ---------------------------------------------------
+# Configuration
+# ---------------------------------------------------
+# Rows converted and written per step; bounds the memory a writer holds
+# beyond the output itself
+CHUNK_ROWS = 50_000
+
+# format -> (file name, MIME type, module the writer needs)
+FORMATS = {
+    "json": ("transactions.json", "application/json", None),
+    "report": ("full_report.json", "application/json", None),
+    "csv": ("transactions.csv", "text/csv", None),
+    "xlsx": ("full_report.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsxwriter"),
+    "parquet": ("transactions.parquet", "application/vnd.apache.parquet", "pyarrow"),
+}
+
+
+def available(fmt):
+    """True if the package the format's writer needs is installed."""
+    module = FORMATS[fmt][2]
+    return module is None or importlib.util.find_spec(module) is not None
+
+
+def chunks(df, size=CHUNK_ROWS):
+    for start in range(0, len(df), size):
+        yield df.iloc[start:start + size]
+
+
+# ---------------------------------------------------
+# Writers
+# ---------------------------------------------------
+# Each writer streams a DataFrame to a binary file object chunk by chunk
+def write_json_list(df, fh, depth=0):
+    """
+    A JSON array of row objects, laid out as json.dumps(rows, indent=4)
+    would lay it out `depth` levels deep, without building the whole list.
+    """
+    pad = "\n" + " " * 4 * depth
+    fh.write(b"[")
+    sep = "\n"
+    for chunk in chunks(df):
+        rows = records(chunk)
+        if not rows:
+            continue
+        # Encode the chunk as an array and keep what's between its brackets
+        body = json.dumps(rows, indent=4)[2:-2]
+        fh.write((sep + body).replace("\n", pad).encode())
+        sep = ",\n"
+    fh.write(b"]" if sep == "\n" else (pad + "]").encode())
+
+
+def write_json(df, fh):
+    write_json_list(df, fh)
+
+
+def write_report(df, summary, fh):
+    """Same document as json.dumps(build_report(df, summary), indent=4)."""
+    head = json.dumps({"summary": summary["totals"], "monthly_summary": records(summary["monthly"])}, indent=4)
+    fh.write((head[:-2] + ',\n    "transactions": ').encode())
+    write_json_list(df, fh, depth=1)
+    fh.write(b"\n}")
+
+
+def write_csv(df, fh):
+    text = io.TextIOWrapper(fh, encoding="utf-8", newline="", write_through=True)
+    for i, chunk in enumerate(chunks(df)):
+        chunk.to_csv(text, index=False, header=(i == 0))
+    text.detach()
+
+
+def write_parquet(df, fh):
+    """One row group per chunk, so only a chunk is ever held as Arrow data."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    with pq.ParquetWriter(fh, schema) as writer:
+        for chunk in chunks(df):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def write_xlsx(df, monthly, fh):
+    """
+    Transactions and Monthly Summary sheets in xlsxwriter's constant_memory
+    mode: rows are flushed to a temp file as they are written, so memory
+    stays flat however many rows there are. That mode needs rows written in
+    order, which pandas' to_excel (column by column) doesn't do.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(fh, {
+        "constant_memory": True,
+        "strings_to_formulas": False,   # descriptions like "=TRANSFER" stay text
+        "strings_to_urls": False,
+    })
+    bold = workbook.add_format({"bold": True})
+
+    for name, frame in (("Transactions", df), ("Monthly Summary", monthly)):
+        if name == "Monthly Summary" and frame.empty:
+            continue
+        sheet = workbook.add_worksheet(name)
+        sheet.write_row(0, 0, [str(c) for c in frame.columns], bold)
+        row = 1
+        for chunk in chunks(frame):
+            for values in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False):
+                sheet.write_row(row, 0, values)
+                row += 1
+
+    workbook.close()
+
+
+def export(fmt, df, summary):
+    """Bytes for one download format."""
+    out = io.BytesIO()
+    if fmt == "json":
+        write_json(df, out)
+    elif fmt == "report":
+        write_report(df, summary, out)
+    elif fmt == "csv":
+        write_csv(df, out)
+    elif fmt == "xlsx":
+        write_xlsx(df, summary["monthly"], out)
+    elif fmt == "parquet":
+        write_parquet(df, out)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return out.getvalue()
+
+
+# ---------------------------------------------------
+# On-Demand Exports
+# ---------------------------------------------------
+class ExportCache:
+    """
+    Exports built on first request and kept for the result set they came
+    from. Only one result set is kept: a new fingerprint drops the exports
+    of the previous one.
+    """
+
+    def __init__(self):
+        self.fingerprint = None
+        self.files = {}
+        self.lock = threading.Lock()    # downloads run on their own thread
+
+    def get(self, fingerprint, fmt, build):
+        with self.lock:
+            if fingerprint != self.fingerprint:
+                self.fingerprint, self.files = fingerprint, {}
+            if fmt not in self.files:
+                self.files[fmt] = build()
+            return self.files[fmt]
+
+    def loader(self, fingerprint, fmt, df, summary):
+        """A no-argument callable for st.download_button(data=...)."""
+        return lambda: self.get(fingerprint, fmt, lambda: export(fmt, df, summary))
@@ -0,0 +1,375 @@
+import re
+from io import BytesIO
+
+import fitz  # PyMuPDF
+import pdfplumber
+
+from page_text import LINE_TOLERANCE, normalise_text, word_rows
+from ocr import (
+    DEFAULT_DPI, DEFAULT_LANG, DEFAULT_ENGINE, DEFAULT_BATCH_SIZE, OcrCache,
+    get_engine, render_page, preprocess, page_positions, tesseract_config, ocr_cache_key,
+)
+
+
+# ---------------------------------------------------
+# Configuration
+# ---------------------------------------------------
+# Banks parsed from word positions (page_words, page_rules) rather than page text
+WORD_BANKS = {"rhb", "cimb", "bank_islam"}
+
+# Fastest backend that produces equivalent text for each bank
+DEFAULT_BACKENDS = {
+    "maybank": "pymupdf",
+    "pbb": "pymupdf",
+    "rhb": "pymupdf",
+    "cimb": "pymupdf",
+    "bank_islam": "pymupdf",
+}
+
+# Hybrid routing: a page needs this many text-layer characters and a
+# transaction date to count as digital; otherwise, if images cover at least
+# this share of the page, it is treated as scanned and sent to OCR.
+MIN_TEXT_CHARS = 50
+MIN_IMAGE_COVERAGE = 0.5
+
+# "05/06", "01/08", "01 Apr", "1 Jan" - dates as every supported bank prints them
+DATE_HIT = re.compile(r"\b\d{1,2}(?:/\d{2}|\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec))\b", re.IGNORECASE)
+
+
+# ---------------------------------------------------
+# Text Normalisation
+# ---------------------------------------------------
+def words_to_lines(words, tolerance=LINE_TOLERANCE):
+    """
+    Rebuild visual lines from PyMuPDF words (x0, y0, x1, y1, text, ...).
+    PyMuPDF emits one line per text span, so a description and its amount
+    columns come out as separate lines; pdfplumber joins anything sharing a
+    baseline. Clustering on the top edge reproduces pdfplumber's lines.
+    """
+    return [" ".join(w[4] for w in row) for row in word_rows(words, tolerance)]
+
+
+def pdfplumber_words(page):
+    """A pdfplumber page's words as PyMuPDF-style (x0, y0, x1, y1, text) boxes."""
+    return [(w["x0"], w["top"], w["x1"], w["bottom"], w["text"]) for w in page.extract_words()]
+
+
+# ---------------------------------------------------
+# Ruling Lines
+# ---------------------------------------------------
+def pymupdf_rules(page):
+    """
+    Straight ruling on a fitz.Page as (x0, y0, x1, y1) segments: drawn
+    lines and the four edges of drawn rectangles. Curves are skipped.
+    """
+    rules = []
+    for path in page.get_drawings():
+        for item in path["items"]:
+            if item[0] == "l":
+                (ax, ay), (bx, by) = item[1], item[2]
+                rules.append((min(ax, bx), min(ay, by), max(ax, bx), max(ay, by)))
+            elif item[0] == "re":
+                x0, y0, x1, y1 = item[1]
+                rules += [(x0, y0, x1, y0), (x0, y1, x1, y1), (x0, y0, x0, y1), (x1, y0, x1, y1)]
+    return rules
+
+
+def pdfplumber_rules(page):
+    """pdfplumber's line and rectangle edges as (x0, y0, x1, y1) segments."""
+    return [(e["x0"], e["top"], e["x1"], e["bottom"]) for e in page.edges]
+
+
+# ---------------------------------------------------
+# Page Classification (text layer vs OCR)
+# ---------------------------------------------------
+def image_coverage(page):
+    """
+    Share of a fitz.Page covered by placed images (0.0 - 1.0).
+    Uses image placement info only; no pixels are decoded.
+    """
+    page_rect = page.rect
+    page_area = page_rect.width * page_rect.height
+    if page_area <= 0:
+        return 0.0
+
+    covered = 0.0
+    for info in page.get_image_info():
+        bbox = fitz.Rect(info["bbox"]) & page_rect
+        if not bbox.is_empty:
+            covered += bbox.width * bbox.height
+
+    return min(1.0, covered / page_area)
+
+
+def classify_page(page):
+    """
+    Route a fitz.Page to "text" or "ocr" without rendering it.
+
+    Pages with enough text and a transaction date use the text layer.
+    Pages without that but mostly covered by images are scans and go to OCR.
+    Anything else (blank pages, terms and conditions) stays on the text
+    layer, since OCR would find nothing to parse either.
+    """
+    text = page.get_text("text")
+    chars = len("".join(text.split()))
+
+    if chars >= MIN_TEXT_CHARS and DATE_HIT.search(text):
+        return "text"
+
+    if image_coverage(page) >= MIN_IMAGE_COVERAGE:
+        return "ocr"
+
+    return "text"
+
+
+# ---------------------------------------------------
+# Backends
+# ---------------------------------------------------
+class PdfplumberBackend:
+    """Reference backend: pdfplumber's extract_text()."""
+
+    name = "pdfplumber"
+
+    def __init__(self, pdf_bytes):
+        self.pdf = pdfplumber.open(BytesIO(pdf_bytes))
+
+    def __len__(self):
+        return len(self.pdf.pages)
+
+    def page_text(self, page_num):
+        page = self.pdf.pages[page_num - 1]
+        text = page.extract_text() or ""
+        page.close()
+        return normalise_text(text)
+
+    def page_words(self, page_num):
+        page = self.pdf.pages[page_num - 1]
+        words = pdfplumber_words(page)
+        page.close()
+        return words
+
+    def page_rules(self, page_num):
+        page = self.pdf.pages[page_num - 1]
+        rules = pdfplumber_rules(page)
+        page.close()
+        return rules
+
+    def close(self):
+        self.pdf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PyMuPDFBackend:
+    """Fast path: PyMuPDF words regrouped into pdfplumber-style lines."""
+
+    name = "pymupdf"
+
+    def __init__(self, pdf_bytes):
+        self.doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+
+    def __len__(self):
+        return self.doc.page_count
+
+    def page_text(self, page_num):
+        words = self.doc[page_num - 1].get_text("words")
+        return normalise_text("\n".join(words_to_lines(words)))
+
+    def page_words(self, page_num):
+        return self.doc[page_num - 1].get_text("words")
+
+    def page_rules(self, page_num):
+        return pymupdf_rules(self.doc[page_num - 1])
+
+    def close(self):
+        self.doc.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class OcrBackend:
+    """
+    Scanned statements: render each page with PyMuPDF and run Tesseract.
+    Pages are recognised in batches of batch_size as they are first asked
+    for, so the batch engine starts one tesseract process per batch.
+    With preprocess, each page is binarised, deskewed and cropped to its
+    transaction table first; bank_hint selects the Tesseract PSM and
+    character whitelist. With ocr_cache, pages already recognised with the
+    same pixels and settings are read back from the OCR cache.
+    """
+
+    name = "ocr"
+
+    def __init__(self, pdf_bytes, dpi=DEFAULT_DPI, lang=DEFAULT_LANG,
+                 engine=DEFAULT_ENGINE, batch_size=DEFAULT_BATCH_SIZE,
+                 preprocess=True, bank_hint=None, ocr_cache=True):
+        self.doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        self.dpi = dpi
+        self.lang = lang
+        self.config = tesseract_config(bank_hint)
+        self.engine = get_engine(engine, lang=lang, config=self.config)
+        self.batch_size = max(1, batch_size)
+        self.preprocess = preprocess
+        self.cache = OcrCache() if ocr_cache else None
+        self._ocr_results = {}
+
+    def __len__(self):
+        return self.doc.page_count
+
+    def needs_ocr(self, page_num):
+        return True
+
+    def _recognise(self, page_num):
+        """
+        OCR page_num together with the next pages that also need OCR.
+        Cached pages are filled in directly; only the misses reach Tesseract.
+        """
+        last = min(len(self), page_num + self.batch_size - 1)
+        batch = [n for n in range(page_num, last + 1)
+                 if n == page_num or (n not in self._ocr_results and self.needs_ocr(n))]
+
+        pending = []
+        for n in batch:
+            image = render_page(self.doc[n - 1], self.dpi)
+            key = None
+
+            if self.cache is not None:
+                key = ocr_cache_key(image, self.dpi, self.lang, self.config, self.preprocess)
+                entry = self.cache.get(key)
+                if entry is not None:
+                    self._ocr_results[n] = entry
+                    continue
+
+            image, offset = preprocess(image) if self.preprocess else (image, (0, 0))
+            pending.append((n, key, image, offset))
+
+        results = self.engine.recognise(image for _, _, image, _ in pending)
+
+        for (n, key, _, offset), result in zip(pending, results):
+            result["words"] = page_positions(result["words"], offset)
+            self._ocr_results[n] = result
+            if key is not None:
+                self.cache.put(key, result)
+
+    def _result(self, page_num):
+        if page_num not in self._ocr_results:
+            self._recognise(page_num)
+        return self._ocr_results.pop(page_num)
+
+    def page_text(self, page_num):
+        return normalise_text(self._result(page_num)["text"])
+
+    def page_words(self, page_num):
+        """
+        OCR words as (x0, y0, x1, y1, text) in page points, as the text
+        layer gives them (a cropped page's words are moved back by
+        page_positions), so one column layout fits every page.
+        """
+        scale = 72 / self.dpi
+        return [(left * scale, top * scale, (left + width) * scale, (top + height) * scale, text)
+                for left, top, width, height, _, text in self._result(page_num)["words"]]
+
+    def page_rules(self, page_num):
+        """OCR finds no ruling; word parsers fall back to header positions."""
+        return []
+
+    def close(self):
+        self.doc.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HybridBackend(OcrBackend):
+    """
+    Mixed digital/scanned documents: each page is classified first and only
+    pages without a usable text layer are rendered and OCR'd (batched with
+    the next scanned pages). Text-layer pages take the PyMuPDF fast path.
+    """
+
+    name = "hybrid"
+
+    def __init__(self, pdf_bytes, **options):
+        super().__init__(pdf_bytes, **options)
+        self._routes = {}
+
+    def needs_ocr(self, page_num):
+        if page_num not in self._routes:
+            self._routes[page_num] = classify_page(self.doc[page_num - 1])
+        return self._routes[page_num] == "ocr"
+
+    def page_route(self, page_num):
+        """"text" or "ocr": the path a page is read by."""
+        return "ocr" if self.needs_ocr(page_num) else "text"
+
+    def page_text(self, page_num):
+        if self.needs_ocr(page_num):
+            return super().page_text(page_num)
+
+        words = self.doc[page_num - 1].get_text("words")
+        return normalise_text("\n".join(words_to_lines(words)))
+
+    def page_words(self, page_num):
+        if self.needs_ocr(page_num):
+            return super().page_words(page_num)
+        return self.doc[page_num - 1].get_text("words")
+
+    def page_rules(self, page_num):
+        if self.needs_ocr(page_num):
+            return super().page_rules(page_num)
+        return pymupdf_rules(self.doc[page_num - 1])
+
+
+BACKENDS = {
+    PdfplumberBackend.name: PdfplumberBackend,
+    PyMuPDFBackend.name: PyMuPDFBackend,
+    OcrBackend.name: OcrBackend,
+    HybridBackend.name: HybridBackend,
+}
+
+# Backends that accept OCR options (dpi, lang)
+OCR_BACKENDS = {OcrBackend.name, HybridBackend.name}
+
+
+def resolve_backend(bank_hint, requested=None):
+    """
+    Pick the extraction backend for a bank.
+    requested may be None/"auto" or a key of BACKENDS.
+    """
+    if requested in BACKENDS:
+        return requested
+
+    return DEFAULT_BACKENDS.get(bank_hint, PdfplumberBackend.name)
+
+
+def open_document(backend, pdf_bytes, options=None, bank_hint=None):
+    """
+    Open pdf_bytes with a backend. options are backend keyword arguments,
+    e.g. {"dpi": 200} for OCR; backends that take none ignore them.
+    bank_hint tunes OCR for the bank's layout.
+    """
+    if backend in OCR_BACKENDS:
+        return BACKENDS[backend](pdf_bytes, bank_hint=bank_hint, **(options or {}))
+    return BACKENDS[backend](pdf_bytes)
+
+
+def has_text_layer(pdf_bytes, max_pages=3):
+    """
+    Cheap check for scanned PDFs: any extractable text in the first pages.
+    """
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        for i in range(min(max_pages, doc.page_count)):
+            if doc[i].get_text("text").strip():
+                return True
+    return False
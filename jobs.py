@@ -0,0 +1,369 @@
+import os
+import sys
+import json
+import time
+import uuid
+import atexit
+import sqlite3
+import argparse
+import threading
+import subprocess
+from contextlib import contextmanager
+
+from batch import process_file, result_from_cache, _empty_result
+from cache import ParseCache, cache_key, DEFAULT_CACHE_DIR
+from extraction import has_text_layer
+from pipeline import resolve_file_bank, count_pages
+
+
+# ---------------------------------------------------
+# Configuration
+# ---------------------------------------------------
+DEFAULT_JOBS_DB = os.environ.get("JOBS_DB", os.path.join(DEFAULT_CACHE_DIR, "jobs", "jobs.sqlite3"))
+
+# How often an idle worker looks for queued files
+POLL_SECONDS = 0.5
+
+# Finished jobs (and their PDFs) are deleted after this long
+JOB_RETENTION_SECONDS = 24 * 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    options TEXT NOT NULL,              -- JSON: bank_hint, bank_name, default_year, backend, extract_options, workers
+    cancel_requested INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS job_files (
+    job_id TEXT NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    idx INTEGER NOT NULL,               -- upload order, the order results are returned in
+    name TEXT NOT NULL,
+    pdf BLOB,                           -- dropped once the file is finished
+    size INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',  -- queued, running, done, cancelled
+    pages INTEGER NOT NULL,
+    done_pages INTEGER NOT NULL DEFAULT 0,
+    worker_pid INTEGER,
+    finished REAL,
+    result TEXT,                        -- JSON process_file result
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+FINISHED = ("done", "cancelled")
+
+
+class JobNotFound(KeyError):
+    pass
+
+
+# ---------------------------------------------------
+# SQLite Queue
+# ---------------------------------------------------
+class JobQueue:
+    """
+    Jobs and their files in one SQLite database, shared by the app and the
+    worker processes. A job is a list of PDFs plus parse options; workers
+    claim queued files one at a time (largest first within the oldest job),
+    so the files of one job are parsed in parallel, and a file with the
+    queue to itself is split into page slices across the job's workers.
+
+    Cancelling is cooperative: queued files are dropped at once, and files
+    being parsed stop after their current page (or, split into slices,
+    after the slices already started).
+    """
+
+    def __init__(self, path=DEFAULT_JOBS_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self.connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")   # readers don't block the workers' writes
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def connect(self):
+        """Autocommit connection; multi-statement writes use BEGIN IMMEDIATE ... COMMIT."""
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA foreign_keys=ON")
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # -- app side --------------------------------------
+    def submit(self, files, bank_hint=None, bank_name=None, default_year=None,
+               backend=None, extract_options=None, workers=1):
+        """
+        Queue a job. files: list of (filename, pdf_bytes). workers is the
+        number of processes the job's files may share (see page_workers).
+        Returns the job id.
+        """
+        job_id = uuid.uuid4().hex
+        options = {"bank_hint": bank_hint, "bank_name": bank_name, "default_year": default_year,
+                   "backend": backend, "extract_options": extract_options, "workers": workers}
+
+        pages = []
+        for _, pdf_bytes in files:
+            try:
+                pages.append(count_pages(pdf_bytes))
+            except Exception:
+                pages.append(0)  # unreadable: the worker reports the error
+
+        with self.connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("INSERT INTO jobs (id, created, options) VALUES (?, ?, ?)",
+                       (job_id, time.time(), json.dumps(options)))
+            db.executemany(
+                "INSERT INTO job_files (job_id, idx, name, pdf, size, pages) VALUES (?, ?, ?, ?, ?, ?)",
+                [(job_id, i, name, pdf_bytes, len(pdf_bytes), pages[i])
+                 for i, (name, pdf_bytes) in enumerate(files)]
+            )
+            db.execute("COMMIT")
+
+        self.purge()
+        return job_id
+
+    def cancel(self, job_id):
+        with self.connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+            db.execute("UPDATE job_files SET status = 'cancelled', pdf = NULL, finished = ? "
+                       "WHERE job_id = ? AND status = 'queued'", (time.time(), job_id))
+            db.execute("COMMIT")
+
+    def status(self, job_id):
+        """
+        {"state": "queued" | "running" | "done" | "cancelled",
+         "files": n, "files_done": n, "pages": n, "pages_done": n,
+         "current": [names of files being parsed]}
+        Raises JobNotFound for unknown or purged jobs.
+        """
+        with self.connect() as db:
+            job = db.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                raise JobNotFound(job_id)
+            files = db.execute("SELECT name, status, pages, done_pages FROM job_files "
+                               "WHERE job_id = ? ORDER BY idx", (job_id,)).fetchall()
+
+        statuses = [f["status"] for f in files]
+        if all(s in FINISHED for s in statuses):
+            state = "cancelled" if job["cancel_requested"] else "done"
+        elif "running" in statuses or any(s in FINISHED for s in statuses):
+            state = "running"
+        else:
+            state = "queued"
+
+        return {
+            "state": state,
+            "files": len(files),
+            "files_done": sum(s in FINISHED for s in statuses),
+            "pages": sum(f["pages"] for f in files),
+            "pages_done": sum(f["pages"] if f["status"] == "done" else f["done_pages"] for f in files),
+            "current": [f["name"] for f in files if f["status"] == "running"],
+        }
+
+    def results(self, job_id):
+        """process_file-style results of the finished files, in upload order."""
+        with self.connect() as db:
+            rows = db.execute("SELECT result FROM job_files WHERE job_id = ? AND result IS NOT NULL "
+                              "ORDER BY idx", (job_id,)).fetchall()
+        return [json.loads(r["result"]) for r in rows]
+
+    def purge(self, max_age=JOB_RETENTION_SECONDS):
+        """Delete jobs whose files all finished more than max_age seconds ago."""
+        cutoff = time.time() - max_age
+        with self.connect() as db:
+            db.execute(
+                "DELETE FROM jobs WHERE id NOT IN ("
+                "  SELECT job_id FROM job_files WHERE status NOT IN ('done', 'cancelled') OR finished > ?)",
+                (cutoff,)
+            )
+
+    def requeue_orphans(self):
+        """Put files claimed by workers that no longer exist back in the queue."""
+        with self.connect() as db:
+            rows = db.execute("SELECT DISTINCT worker_pid FROM job_files WHERE status = 'running'").fetchall()
+            dead = [r["worker_pid"] for r in rows if not pid_alive(r["worker_pid"])]
+            db.executemany("UPDATE job_files SET status = 'queued', done_pages = 0, worker_pid = NULL "
+                           "WHERE status = 'running' AND worker_pid = ?", [(pid,) for pid in dead])
+            # ...unless their job was cancelled meanwhile: nothing would claim them
+            db.execute("UPDATE job_files SET status = 'cancelled', pdf = NULL, finished = ? "
+                       "WHERE status = 'queued' AND job_id IN (SELECT id FROM jobs WHERE cancel_requested = 1)",
+                       (time.time(),))
+
+    # -- worker side -----------------------------------
+    def claim(self, worker_pid):
+        """Take the next queued file, or None. One statement, so two workers never get the same file."""
+        with self.connect() as db:
+            row = db.execute(
+                "UPDATE job_files SET status = 'running', worker_pid = ? "
+                "WHERE rowid = ("
+                "  SELECT f.rowid FROM job_files f JOIN jobs j ON j.id = f.job_id "
+                "  WHERE f.status = 'queued' AND j.cancel_requested = 0 "
+                "  ORDER BY j.created, f.size DESC LIMIT 1) "
+                "RETURNING job_id, idx, name, pdf",
+                (worker_pid,)
+            ).fetchone()
+            if row is None:
+                return None
+            options = db.execute("SELECT options FROM jobs WHERE id = ?", (row["job_id"],)).fetchone()
+        return dict(row) | {"options": json.loads(options["options"])}
+
+    def page_workers(self, workers):
+        """
+        Processes for one claimed file to parse its pages with: the job's
+        workers shared between the files queued or being parsed, so a
+        single large file uses all of them and a batch keeps one file per
+        worker.
+        """
+        with self.connect() as db:
+            active = db.execute("SELECT COUNT(*) FROM job_files "
+                                "WHERE status IN ('queued', 'running')").fetchone()[0]
+        return max(1, workers // max(active, 1))
+
+    def page_done(self, job_id, idx, done_pages):
+        """Record progress; returns False once the job has been cancelled."""
+        with self.connect() as db:
+            db.execute("UPDATE job_files SET done_pages = ? WHERE job_id = ? AND idx = ?",
+                       (done_pages, job_id, idx))
+            job = db.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return job is not None and not job["cancel_requested"]
+
+    def file_done(self, job_id, idx, result):
+        status = "cancelled" if result["cancelled"] else "done"
+        with self.connect() as db:
+            db.execute("UPDATE job_files SET status = ?, result = ?, pdf = NULL, finished = ? "
+                       "WHERE job_id = ? AND idx = ?",
+                       (status, json.dumps(result), time.time(), job_id, idx))
+
+
+def pid_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# ---------------------------------------------------
+# Worker Processes
+# ---------------------------------------------------
+def run_file(queue, cache, task):
+    """Parse one claimed file and store its result."""
+    options = task["options"]
+    name, pdf_bytes = task["name"], task["pdf"]
+    backend = options["backend"]
+
+    bank_hint, bank_name, error = resolve_file_bank(pdf_bytes, options["bank_hint"], options["bank_name"])
+    if error:
+        result = _empty_result(name)
+        result["bank"] = bank_name
+        result["error"] = error
+        result["backend"] = backend
+        queue.file_done(task["job_id"], task["idx"], result)
+        return
+
+    key = cache_key(pdf_bytes, bank_hint, options["default_year"], backend, options["extract_options"])
+    entry = cache.get(key)
+
+    if entry is not None:
+        result = result_from_cache(pdf_bytes, name, bank_name, entry)
+        result["cached"] = True
+    else:
+        def on_page(page_num, page_count):
+            return queue.page_done(task["job_id"], task["idx"], page_num)
+
+        result = process_file(pdf_bytes, name, bank_hint, bank_name, options["default_year"],
+                              backend, options["extract_options"], on_page=on_page,
+                              workers=queue.page_workers(options.get("workers", 1)))
+        # Only complete parses go in the cache
+        if not result["error"] and not result["cancelled"]:
+            cache.put(key, result["transactions"], result["pages"], result.get("routes"))
+
+    # What the app shows per file, worked out here while the PDF is at hand
+    result["backend"] = backend
+    if not result["transactions"]:
+        result["text_layer"] = has_text_layer(pdf_bytes)
+
+    queue.file_done(task["job_id"], task["idx"], result)
+
+
+def worker_main(path, parent_pid=None):
+    """
+    Worker process loop. Parsers, the parse cache and (for OCR) Tesseract
+    setup are loaded once when the process starts and reused for every
+    file it picks up. With parent_pid, exits when that process goes away.
+    """
+    queue = JobQueue(path)
+    cache = ParseCache()
+
+    while parent_pid is None or os.getppid() == parent_pid:
+        task = queue.claim(os.getpid())
+        if task is None:
+            time.sleep(POLL_SECONDS)
+            continue
+        try:
+            run_file(queue, cache, task)
+        except Exception as e:
+            result = _empty_result(task["name"])
+            result["error"] = str(e)
+            result["backend"] = task["options"]["backend"]
+            queue.file_done(task["job_id"], task["idx"], result)
+
+
+class JobWorkers:
+    """
+    A pool of long-lived worker processes draining a JobQueue. Start one per
+    app server (e.g. behind st.cache_resource); it outlives sessions and
+    browser refreshes, and jobs outlive it: files a dead worker had claimed
+    are queued again when the next pool starts.
+
+    Workers are separate `python -m jobs` processes rather than
+    multiprocessing children: Streamlit runs the app script as __main__,
+    which multiprocessing's spawn would re-run in every child.
+    """
+
+    def __init__(self, path=DEFAULT_JOBS_DB):
+        self.path = path
+        self.queue = JobQueue(path)
+        self.processes = []
+        self.lock = threading.Lock()
+        self.queue.requeue_orphans()
+        self.queue.purge()
+        atexit.register(self.stop)
+
+    def ensure(self, count):
+        """Start processes until `count` are alive. The pool never shrinks."""
+        here = os.path.dirname(os.path.abspath(__file__))
+        with self.lock:
+            self.processes = [p for p in self.processes if p.poll() is None]
+            while len(self.processes) < count:
+                self.processes.append(subprocess.Popen(
+                    [sys.executable, "-m", "jobs", "--db", self.path, "--parent", str(os.getpid())],
+                    cwd=here,
+                ))
+        return self
+
+    def stop(self):
+        with self.lock:
+            for process in self.processes:
+                process.terminate()
+            self.processes = []
+
+
+# ---------------------------------------------------
+# CLI
+# ---------------------------------------------------
+if __name__ == "__main__":
+    # Also runnable by hand, e.g. more workers on a bigger machine:
+    #   python -m jobs --db ~/.cache/bank-statement-parser/jobs/jobs.sqlite3
+    parser = argparse.ArgumentParser(description="Run a background parse worker.")
+    parser.add_argument("--db", default=DEFAULT_JOBS_DB, help="Job queue database")
+    parser.add_argument("--parent", type=int, help="Exit when this process is gone")
+    args = parser.parse_args()
+    worker_main(args.db, args.parent)
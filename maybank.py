@@ -1,74 +1,28 @@
 import regex as re
 
-# ============================================================
-# UNIVERSAL CLEANER FOR MAYBANK TEXT
-# ============================================================
-
-def clean_maybank_line(line: str) -> str:
-    if not line:
-        return ""
-
-    # Remove invisible unicode junk
-    line = line.replace("\u200b", "")   # zero-width space
-    line = line.replace("\u200e", "")   # LTR mark
-    line = line.replace("\u200f", "")   # RTL mark
-    line = line.replace("\ufeff", "")   # BOM
-    line = line.replace("\xa0", " ")    # non-breaking space
-
-    # Collapse multiple spaces
-    line = re.sub(r"\s+", " ", line)
-
-    # Trim
-    return line.strip()
-
+from amounts import parse_amount
+from page_text import MAX_CONTINUATION_LINES, MAX_DESCRIPTION_CHARS, ensure_normalised
 
 # ============================================================
-# MAYBANK MTASB PATTERN (NO YEAR FORMAT)
+# SINGLE-LINE PATTERNS (bank detection)
+# Possessive amounts and a bounded description (MAX_DESCRIPTION_CHARS)
+# keep a search over one long line linear.
 # ============================================================
 
+# MTASB (no year): "01/08 TRANSFER TO A/C 320.00+ 43,906.52"
 PATTERN_MAYBANK_MTASB = re.compile(
-    r"(\d{2}/\d{2})\s+"                 # Date: 01/08
-    r"(.+?)\s+"                         # Description
-    r"([0-9,]+\.\d{2})\s*([+-])\s*"     # Amount + Sign (tolerant spacing)
-    r"([0-9,]+\.\d{2})"                 # Balance
+    r"(\d{2}/\d{2})\s++"                                # Date: 01/08
+    rf"(.{{1,{MAX_DESCRIPTION_CHARS}}}?)\s++"           # Description
+    r"([0-9,]++\.\d{2})\s*+([+-])\s*+"                  # Amount + Sign (tolerant spacing)
+    r"([0-9,]++\.\d{2})"                                # Balance
 )
 
-def parse_line_maybank_mtasb(line, page_num, default_year="2024"):
-    m = PATTERN_MAYBANK_MTASB.search(line)
-    if not m:
-        return None
-
-    date_raw, desc, amount_raw, sign, balance_raw = m.groups()
-    day, month = date_raw.split("/")
-    year = default_year
-
-    amount = float(amount_raw.replace(",", ""))
-    balance = float(balance_raw.replace(",", ""))
-
-    credit = amount if sign == "+" else 0.0
-    debit  = amount if sign == "-" else 0.0
-
-    full_date = f"{day}/{month}/{year}"
-
-    return {
-        "date": full_date,
-        "description": desc.strip(),
-        "debit": debit,
-        "credit": credit,
-        "balance": balance,
-        "page": page_num,
-    }
-
-
-# ============================================================
-# MAYBANK MBB PATTERN (FULL DATE FORMAT)
-# ============================================================
-
+# MBB (full date): "01 Apr 2025 CMS - DR CORP CHG 78.00- 71,229.76"
 PATTERN_MAYBANK_MBB = re.compile(
-    r"(\d{2})\s+([A-Za-z]{3})\s+(\d{4})\s+"
-    r"(.+?)\s+"
-    r"([0-9,]+\.\d{2})\s*([+-])\s*"
-    r"([0-9,]+\.\d{2})"
+    r"(\d{2})\s++([A-Za-z]{3})\s++(\d{4})\s++"
+    rf"(.{{1,{MAX_DESCRIPTION_CHARS}}}?)\s++"
+    r"([0-9,]++\.\d{2})\s*+([+-])\s*+"
+    r"([0-9,]++\.\d{2})"
 )
 
 MONTH_MAP = {
@@ -77,89 +31,154 @@ MONTH_MAP = {
     "Sep": "09", "Oct": "10", "Nov": "11", "Dec": "12",
 }
 
-def parse_line_maybank_mbb(line, page_num):
-    m = PATTERN_MAYBANK_MBB.search(line)
-    if not m:
-        return None
+# ============================================================
+# PAGE SCANNER
+# One pattern run over the whole page instead of a loop over lines.
+# Page text is normalised (see page_text), so lines are stripped and
+# single-spaced; separators are [^\S\n] so no match leaves its line.
+# ============================================================
+
+# A transaction line starts with a date in either layout: "01/08" or "01 Aug 2025"
+DATE_START = r"\d{2}/\d{2}|\d{2} [A-Za-z]{3} \d{4}"
+
+DATED_LINE = re.compile(rf"(?:{DATE_START})")
 
-    day, mon_abbr, year, desc, amount_raw, sign, balance_raw = m.groups()
-    month = MONTH_MAP.get(mon_abbr.title(), "01")
+# Lines that close the transaction list: totals, closing balance, notices.
+# Nothing from them on is joined onto a transaction.
+SECTION_END = (
+    r"(?i:ENDING BALANCE|LEDGER BALANCE|CLOSING BALANCE|TOTAL DEBIT|TOTAL CREDIT"
+    r"|BAKI AKHIR|BAKI LEGAR|JUMLAH DEBIT|JUMLAH KREDIT|PERHATIAN|IMPORTANT NOTICE|END OF STATEMENT)"
+)
 
-    amount = float(amount_raw.replace(",", ""))
-    balance = float(balance_raw.replace(",", ""))
+# A dated line plus the lines continuing it (or, at the top of the page,
+# the text before the first dated line, unless the page opens with a
+# section end). Stops at the next dated line, a section end, or
+# MAX_CONTINUATION_LINES; lines past that join nothing.
+TRANSACTION_BLOCK = re.compile(
+    rf"(?:\A(?!{SECTION_END})|^(?={DATE_START}))[^\n]*+"
+    rf"(?:\n(?!{DATE_START}|{SECTION_END})[^\n]*+){{0,{MAX_CONTINUATION_LINES}}}",
+    re.MULTILINE,
+)
 
-    credit = amount if sign == "+" else 0.0
-    debit  = amount if sign == "-" else 0.0
+# Per joined line: an MTASB transaction at the start of the line, else an
+# MBB one. Anchoring and possessive amounts keep the scan linear in the
+# line's length; the lazy description is the only backtracking left.
+TRANSACTION_SCAN = re.compile(
+    r"^(?:"
+    r"(?P<date>\d{2}/\d{2})[^\S\n]++"                               # MTASB: 01/08
+    r"(?P<desc>.+?)[^\S\n]++"
+    r"(?P<amount>[0-9,]++\.\d{2})[^\S\n]*+(?P<sign>[+-])[^\S\n]*+"
+    r"(?P<balance>[0-9,]++\.\d{2})"
+    r"|"
+    r"(?P<day>\d{2})[^\S\n]++(?P<mon>[A-Za-z]{3})[^\S\n]++(?P<year>\d{4})[^\S\n]++"  # MBB: 01 Aug 2025
+    r"(?P<desc>.+?)[^\S\n]++"
+    r"(?P<amount>[0-9,]++\.\d{2})[^\S\n]*+(?P<sign>[+-])[^\S\n]*+"
+    r"(?P<balance>[0-9,]++\.\d{2})"
+    r")",
+    re.MULTILINE,
+)
 
-    full_date = f"{day}/{month}/{year}"
+
+def transaction_blocks(text):
+    """
+    Normalised page text as one line per transaction block, wrapped lines
+    joined. Also returns whether the last block runs to the end of the page
+    (so it may continue on the next).
+    """
+    blocks = list(TRANSACTION_BLOCK.finditer(text))
+    last_open = bool(blocks) and blocks[-1].end() == len(text)
+    return "\n".join(m.group().replace("\n", " ") for m in blocks), last_open
+
+
+def transaction_from_match(m, page_num, default_year="2024"):
+    date, day, mon, year, desc, amount, sign, balance = m.group(
+        "date", "day", "mon", "year", "desc", "amount", "sign", "balance")
+    if date:
+        day, month = date.split("/")
+        year = default_year
+    else:
+        month = MONTH_MAP.get(mon.title(), "01")
+
+    amount = parse_amount(amount)
 
     return {
-        "date": full_date,
+        "date": f"{day}/{month}/{year}",
         "description": desc.strip(),
-        "debit": debit,
-        "credit": credit,
-        "balance": balance,
+        "debit": amount if sign == "-" else 0.0,
+        "credit": amount if sign == "+" else 0.0,
+        "balance": parse_amount(balance),
         "page": page_num,
     }
 
 
 # ============================================================
-# ADVANCED LINE RECONSTRUCTOR
-# Fixes broken DUITNOW / long descriptions
+# MAIN PARSER ENTRY POINT
 # ============================================================
 
-def reconstruct_broken_lines(lines):
-    rebuilt = []
-    buffer_line = ""
+def parse_joined_text(joined, page_num, default_year="2024"):
+    """Transactions in joined text, one per line at most, with each match's start offset."""
+    return [(m.start(), transaction_from_match(m, page_num, default_year))
+            for m in TRANSACTION_SCAN.finditer(joined)]
 
-    for line in lines:
-        line = clean_maybank_line(line)
 
-        if not line:
-            continue
+def parse_page_maybank(text, page_num, default_year="2024"):
+    """
+    Parse one page on its own, as a partial result for stitch_maybank.
 
-        # If line begins with date, flush buffer
-        if re.match(r"^\d{2}/\d{2}", line):
-            if buffer_line:
-                rebuilt.append(buffer_line)
-                buffer_line = ""
-            buffer_line = line
-        else:
-            # Continuation of previous description
-            buffer_line += " " + line
+    Besides the transactions, keeps the page's open edges:
+        leading:    text before the page's first dated line; it continues
+                    the last line of the previous page
+        open:       the page's last dated line if it didn't parse and runs
+                    to the end of the page (its amounts may be at the top
+                    of the next page)
+        dated:      the page has any dated line
+    """
+    joined, last_open = transaction_blocks(ensure_normalised(text))
+    found = parse_joined_text(joined, page_num, default_year)
 
-    if buffer_line:
-        rebuilt.append(buffer_line)
+    first_end = joined.find("\n")
+    if first_end < 0:
+        first_end = len(joined)
+    last_start = joined.rfind("\n") + 1
 
-    return rebuilt
+    leading = None
+    if joined and not DATED_LINE.match(joined):
+        leading = joined[:first_end]
 
+    open_line = None
+    if last_open and (last_start or leading is None) and not (found and found[-1][0] >= last_start):
+        open_line = joined[last_start:]
 
-# ============================================================
-# MAIN PARSER ENTRY POINT
-# ============================================================
-
-def parse_transactions_maybank(text, page_num, default_year="2024"):
-
-    raw_lines = text.splitlines()
-    cleaned_lines = [clean_maybank_line(l) for l in raw_lines]
-
-    # Reconstruct broken lines
-    lines = reconstruct_broken_lines(cleaned_lines)
+    return {
+        "transactions": [tx for _, tx in found],
+        "page": page_num,
+        "year": default_year,
+        "leading": leading,
+        "open": open_line,
+        "dated": bool(joined) and (leading is None or last_start > 0),
+    }
 
-    tx_list = []
 
-    for line in lines:
+def stitch_maybank(carry, partial):
+    """
+    Join a line broken by the page break: the previous page's unparsed last
+    line plus this page's leading text is parsed as one line, as it would be
+    if the statement were a single page. The row is placed on this page,
+    where its amounts are.
 
-        # Try MTASB format
-        tx = parse_line_maybank_mtasb(line, page_num, default_year)
-        if tx:
-            tx_list.append(tx)
-            continue
+    Returns (transactions, state for the next page).
+    """
+    tx = partial["transactions"]
+    open_line = partial["open"]
+    if carry and carry["open"] and partial["leading"] is not None:
+        line = carry["open"] + " " + partial["leading"]
+        joined = [t for _, t in parse_joined_text(line, partial["page"], partial["year"])]
+        tx = joined + tx
+        if not joined and not partial["dated"]:
+            # Nothing dated on this page: the line stays open
+            open_line = line
+    return tx, {"open": open_line}
 
-        # Try MBB format
-        tx = parse_line_maybank_mbb(line, page_num)
-        if tx:
-            tx_list.append(tx)
-            continue
 
-    return tx_list
+def parse_transactions_maybank(text, page_num, default_year="2024"):
+    return parse_page_maybank(text, page_num, default_year)["transactions"]
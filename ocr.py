@@ -0,0 +1,390 @@
+import os
+import shlex
+import hashlib
+import subprocess
+import tempfile
+from functools import lru_cache
+
+import fitz  # PyMuPDF
+import numpy as np
+import pytesseract
+from PIL import Image
+
+from disk_cache import DiskCache
+
+
+# ---------------------------------------------------
+# Configuration
+# ---------------------------------------------------
+DEFAULT_DPI = int(os.environ.get("OCR_DPI", "300"))
+DEFAULT_LANG = os.environ.get("OCR_LANG", "eng")
+
+# Assume a single uniform block of text: statement tables read line by line
+DEFAULT_TESSERACT_CONFIG = "--psm 6"
+
+# "batch" runs one tesseract process per group of pages; "pytesseract" one per page
+DEFAULT_ENGINE = os.environ.get("OCR_ENGINE", "batch")
+DEFAULT_BATCH_SIZE = int(os.environ.get("OCR_BATCH_SIZE", "16"))
+
+DEFAULT_OCR_CACHE_DIR = os.environ.get(
+    "OCR_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "bank-statement-parser", "ocr")
+)
+DEFAULT_OCR_CACHE_BYTES = 1024 * 1024 * 1024
+
+# Characters that can appear on a statement line. Anything else (|, ~, ©,
+# table rules read as glyphs) is OCR noise, mostly around amount columns.
+BASE_WHITELIST = (
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+    "0123456789./,-:&()@#*"
+)
+
+# Per-bank Tesseract settings: page segmentation mode and extra characters
+BANK_OCR_CONFIG = {
+    "maybank": {"psm": 6, "whitelist": BASE_WHITELIST + "+"},   # signed amounts "320.00+"
+    "pbb": {"psm": 6, "whitelist": BASE_WHITELIST},
+    "rhb": {"psm": 4, "whitelist": BASE_WHITELIST},             # columns of varying width
+    "cimb": {"psm": 4, "whitelist": BASE_WHITELIST},
+    "bank_islam": {"psm": 4, "whitelist": BASE_WHITELIST},
+}
+
+# Deskew search range and step, in degrees
+MAX_SKEW = 3.0
+SKEW_STEP = 0.25
+
+# Table detection: a transaction line spans at least this share of the
+# width and has a blank gap (between description and amounts) of at least
+# GAP_RATIO. Crops smaller than MIN_CROP_RATIO of the page are ignored.
+SPAN_RATIO = 0.5
+GAP_RATIO = 0.08
+MIN_CROP_RATIO = 0.2
+CROP_PADDING = 12
+
+
+# ---------------------------------------------------
+# Rendering
+# ---------------------------------------------------
+def render_page(page, dpi=DEFAULT_DPI):
+    """
+    Render a fitz.Page to a greyscale PIL image at the given DPI.
+    Greyscale is a third of the pixels of RGB and Tesseract binarises anyway.
+    """
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+    return Image.frombytes("L", (pix.width, pix.height), pix.samples)
+
+
+def tesseract_config(bank_hint=None):
+    """
+    Tesseract command-line config for a bank, e.g.
+    "--psm 6 -c tessedit_char_whitelist=ABC...".
+    """
+    settings = BANK_OCR_CONFIG.get(bank_hint)
+    if not settings:
+        return DEFAULT_TESSERACT_CONFIG
+    return f"--psm {settings['psm']} -c tessedit_char_whitelist={settings['whitelist']}"
+
+
+# ---------------------------------------------------
+# Preprocessing (vectorised with numpy)
+# ---------------------------------------------------
+def binarise(gray):
+    """
+    Otsu threshold of a uint8 greyscale array. Returns a bool array,
+    True where there is ink.
+    """
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+
+    weight_bg = np.cumsum(hist)
+    weight_fg = weight_bg[-1] - weight_bg
+    sum_bg = np.cumsum(hist * levels)
+    mean_bg = sum_bg / np.maximum(weight_bg, 1)
+    mean_fg = (sum_bg[-1] - sum_bg) / np.maximum(weight_fg, 1)
+
+    between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    threshold = int(np.argmax(between))
+
+    return gray <= threshold
+
+
+def estimate_skew(ink, max_angle=MAX_SKEW, step=SKEW_STEP, samples=200_000):
+    """
+    Projection-profile skew estimate in degrees.
+    Shears the ink coordinates for each candidate angle and picks the one
+    whose row histogram is sharpest (text lines line up with pixel rows).
+    """
+    ys, xs = np.nonzero(ink)
+    if len(ys) == 0:
+        return 0.0
+
+    if len(ys) > samples:
+        pick = np.random.default_rng(0).choice(len(ys), samples, replace=False)
+        ys, xs = ys[pick], xs[pick]
+
+    angles = np.arange(-max_angle, max_angle + step / 2, step)
+    best_angle, best_score = 0.0, -1.0
+
+    for angle in angles:
+        rows = (ys - xs * np.tan(np.radians(angle))).astype(np.int64)
+        rows -= rows.min()
+        counts = np.bincount(rows)
+        score = float(np.dot(counts, counts))
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+
+    return best_angle
+
+
+def find_table_region(ink):
+    """
+    Bounding box (left, top, right, bottom) of the transaction table, or None.
+
+    Text lines are found from the row profile. A line counts as a table row
+    when it spans most of the page and has a wide blank gap in it, which
+    separates description from amounts. Logos, address blocks and
+    terms-and-conditions paragraphs fail one test or the other.
+    """
+    height, width = ink.shape
+
+    row_ink = ink.any(axis=1)
+    edges = np.diff(np.concatenate(([0], row_ink.view(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    if len(starts) == 0:
+        return None
+
+    # Column profile of every text line in one pass (blank rows add nothing)
+    line_cols = np.add.reduceat(ink, starts, axis=0) > 0
+
+    table_lines = []
+    last_index = None
+    for i, (top, bottom, line) in enumerate(zip(starts, ends, line_cols)):
+        cols = np.flatnonzero(line)
+        if len(cols) < 2:
+            continue
+        span = cols[-1] - cols[0]
+        gap = np.diff(cols).max()
+        if span >= SPAN_RATIO * width and gap >= GAP_RATIO * width:
+            table_lines.append((top, bottom, cols[0], cols[-1]))
+            last_index = i
+
+    if not table_lines:
+        return None
+
+    # Keep description lines that wrap below the last table row: follow on
+    # while the spacing stays within the table's own line pitch.
+    pitch = np.median(np.diff([l[0] for l in table_lines])) if len(table_lines) > 1 else 0
+    bottom = table_lines[-1][1]
+    for top, end in zip(starts[last_index + 1:], ends[last_index + 1:]):
+        if top - bottom > 1.5 * pitch:
+            break
+        bottom = end
+
+    top = max(0, table_lines[0][0] - CROP_PADDING)
+    bottom = min(height, bottom + CROP_PADDING)
+    left = max(0, min(l[2] for l in table_lines) - CROP_PADDING)
+    right = min(width, max(l[3] for l in table_lines) + CROP_PADDING)
+
+    if (bottom - top) * (right - left) < MIN_CROP_RATIO * height * width:
+        return None
+
+    return (int(left), int(top), int(right), int(bottom))
+
+
+def preprocess(image):
+    """
+    Binarise, deskew and crop a rendered page to its transaction table.
+    Returns (image, offset): a greyscale PIL image of black text on white,
+    and the (left, top) of the crop in the rendered page's pixels, for
+    page_positions.
+    """
+    ink = binarise(np.asarray(image))
+
+    angle = estimate_skew(ink)
+    if abs(angle) >= SKEW_STEP:
+        binary = Image.fromarray(np.where(ink, 0, 255).astype(np.uint8))
+        # PIL rotates counter-clockwise, which undoes a positive estimate
+        binary = binary.rotate(angle, resample=Image.NEAREST, fillcolor=255)
+        ink = np.asarray(binary) < 128
+
+    left = top = 0
+    box = find_table_region(ink)
+    if box:
+        left, top, right, bottom = box
+        ink = ink[top:bottom, left:right]
+
+    return Image.fromarray(np.where(ink, 0, 255).astype(np.uint8)), (left, top)
+
+
+def page_positions(words, offset):
+    """
+    Move Tesseract words [left, top, width, height, conf, text] from a
+    preprocessed image back to where they sit on the page, so word parsers
+    can apply a column layout learned on any page of the document. Only
+    the crop is undone: deskewing turns the page about its centre without
+    resizing it, so the deskewed page is the page as printed, and turning
+    it back would only put the scan's skew back into the rows.
+    """
+    left, top = offset
+    if not (left or top):
+        return words
+    return [[x + left, y + top, width, height, conf, text] for x, y, width, height, conf, text in words]
+
+
+# ---------------------------------------------------
+# Recognition Results
+# ---------------------------------------------------
+def parse_tsv(tsv):
+    """
+    Split Tesseract TSV output into per-page results.
+
+    Returns {page_num: {"text": str, "words": [[left, top, width, height, conf, text], ...]}}.
+    Text is rebuilt line by line from the words, so the two always agree.
+    """
+    pages = {}
+
+    for row in tsv.splitlines()[1:]:
+        cols = row.split("\t")
+        if len(cols) < 12 or cols[0] != "5":  # level 5 = word
+            continue
+
+        word = cols[11].strip()
+        if not word:
+            continue
+
+        page = pages.setdefault(int(cols[1]), {"lines": {}, "words": []})
+        page["words"].append([int(cols[6]), int(cols[7]), int(cols[8]), int(cols[9]), float(cols[10]), word])
+        page["lines"].setdefault((cols[2], cols[3], cols[4]), []).append(word)
+
+    return {
+        page_num: {
+            "text": "\n".join(" ".join(words) for words in page["lines"].values()),
+            "words": page["words"],
+        }
+        for page_num, page in pages.items()
+    }
+
+
+def empty_result():
+    return {"text": "", "words": []}
+
+
+# ---------------------------------------------------
+# Engines
+# ---------------------------------------------------
+class PerCallEngine:
+    """
+    Baseline: one pytesseract call, and so one tesseract process with a
+    fresh model load, per page.
+    """
+
+    name = "pytesseract"
+
+    def __init__(self, lang=DEFAULT_LANG, config=DEFAULT_TESSERACT_CONFIG):
+        self.lang = lang
+        self.config = config
+
+    def recognise(self, images):
+        """
+        Returns one {"text", "words"} result per image, in order.
+        """
+        results = []
+        for image in images:
+            tsv = pytesseract.image_to_data(image, lang=self.lang, config=self.config)
+            results.append(parse_tsv(tsv).get(1, empty_result()))
+        return results
+
+
+class BatchEngine:
+    """
+    One tesseract process per batch of pages. Images are written to a temp
+    directory and passed as an image list file, so process start-up and
+    model loading are paid once per batch instead of once per page.
+    """
+
+    name = "batch"
+
+    def __init__(self, lang=DEFAULT_LANG, config=DEFAULT_TESSERACT_CONFIG):
+        self.lang = lang
+        self.config = config
+
+    def recognise(self, images):
+        """
+        images: iterable of PIL images (a generator keeps only one rendered
+        page in memory at a time). Returns one {"text", "words"} result per
+        image, in order.
+        """
+        with tempfile.TemporaryDirectory(prefix="ocr-batch-") as tmp:
+            paths = []
+            for i, image in enumerate(images):
+                path = os.path.join(tmp, f"page-{i:05d}.png")
+                image.save(path, compress_level=1)
+                paths.append(path)
+
+            if not paths:
+                return []
+
+            list_path = os.path.join(tmp, "pages.txt")
+            with open(list_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(paths) + "\n")
+
+            # TSV output numbers pages 1..n in list order
+            cmd = [
+                pytesseract.pytesseract.tesseract_cmd, list_path, "stdout",
+                "-l", self.lang,
+                *shlex.split(self.config),
+                "tsv",
+            ]
+            proc = subprocess.run(cmd, capture_output=True)
+
+        if proc.returncode != 0:
+            raise RuntimeError(f"tesseract failed: {proc.stderr.decode('utf-8', errors='replace').strip()}")
+
+        by_page = parse_tsv(proc.stdout.decode("utf-8", errors="replace"))
+        return [by_page.get(i, empty_result()) for i in range(1, len(paths) + 1)]
+
+
+ENGINES = {
+    PerCallEngine.name: PerCallEngine,
+    BatchEngine.name: BatchEngine,
+}
+
+
+def get_engine(name=DEFAULT_ENGINE, lang=DEFAULT_LANG, config=DEFAULT_TESSERACT_CONFIG):
+    return ENGINES[name](lang=lang, config=config)
+
+
+# ---------------------------------------------------
+# OCR Result Cache
+# ---------------------------------------------------
+@lru_cache(maxsize=1)
+def ocr_fingerprint():
+    """
+    SHA-256 of this module: rendering and preprocessing changes invalidate
+    cached OCR, parser changes elsewhere do not.
+    """
+    with open(os.path.abspath(__file__), "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def ocr_cache_key(image, dpi, lang, config, preprocessed):
+    """
+    Key on the rendered page pixels plus everything that changes what
+    Tesseract returns for them.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{image.mode}|{image.width}x{image.height}|".encode())
+    digest.update(image.tobytes())
+    digest.update(f"|{dpi}|{lang}|{config}|{bool(preprocessed)}|{ocr_fingerprint()}".encode())
+    return digest.hexdigest()
+
+
+class OcrCache(DiskCache):
+    """
+    Recognised text and word boxes per rendered page, so re-running the
+    parsers over a scanned archive skips Tesseract entirely.
+    """
+
+    def __init__(self, directory=DEFAULT_OCR_CACHE_DIR, max_bytes=DEFAULT_OCR_CACHE_BYTES):
+        super().__init__(directory, max_bytes)
@@ -0,0 +1,98 @@
+import re
+
+
+# ---------------------------------------------------
+# Text Normalisation
+# ---------------------------------------------------
+INVISIBLE_CHARS = {
+    "\u200b": "",   # zero-width space
+    "\u200e": "",   # LTR mark
+    "\u200f": "",   # RTL mark
+    "\ufeff": "",   # BOM
+    "\xa0": " ",    # non-breaking space
+}
+INVISIBLE_TABLE = str.maketrans(INVISIBLE_CHARS)
+
+# Anything normalise_text would change: blank or padded lines, runs of
+# whitespace, whitespace other than " " and "\n", invisible characters
+NOT_NORMALISED = re.compile(
+    r"\A\n|\n\Z|\n\n|^ | $|  |[^\S \n]|[" + "".join(INVISIBLE_CHARS) + "]",
+    re.MULTILINE,
+)
+
+
+def normalise_text(text):
+    """
+    Bring backend output to one shape so the bank regexes see the same lines:
+    no invisible characters, single spaces, no blank lines.
+    """
+    if not text:
+        return ""
+
+    lines = []
+    for line in text.translate(INVISIBLE_TABLE).splitlines():
+        line = " ".join(line.split())
+        if line:
+            lines.append(line)
+
+    return "\n".join(lines)
+
+
+def ensure_normalised(text):
+    """
+    normalise_text(text), skipped when text is already normalised, as all
+    extraction backends return it. The check is one regex search, so page
+    scanners can rely on clean lines without a per-line pass.
+    """
+    if text and NOT_NORMALISED.search(text):
+        return normalise_text(text)
+    return text or ""
+
+
+# ---------------------------------------------------
+# Word Rows
+# ---------------------------------------------------
+# Same vertical tolerance pdfplumber uses to group characters into lines
+LINE_TOLERANCE = 3
+
+
+def word_rows(words, tolerance=LINE_TOLERANCE):
+    """
+    Group word boxes (x0, y0, x1, y1, text, ...) into visual rows, top to
+    bottom, each row's words left to right. Words whose top edge is within
+    tolerance of the previous word's share its row.
+    """
+    if not words:
+        return []
+
+    words = sorted(words, key=lambda w: (w[1], w[0]))
+
+    rows = []
+    current = [words[0]]
+    current_top = words[0][1]
+
+    for w in words[1:]:
+        if w[1] - current_top <= tolerance:
+            current.append(w)
+        else:
+            rows.append(current)
+            current = [w]
+        current_top = w[1]
+
+    rows.append(current)
+
+    return [sorted(row, key=lambda w: w[0]) for row in rows]
+
+
+# ---------------------------------------------------
+# Descriptions
+# ---------------------------------------------------
+# Long DUITNOW descriptions and the like wrap onto a few lines; more than
+# this and the rest is page furniture (footers, terms and conditions), so
+# every parser stops continuing a description there
+MAX_CONTINUATION_LINES = 8
+
+# Longest description a single-line pattern will match. The bound keeps a
+# search over a long line linear: a lazy description can't run to the end
+# of the line from every date it meets
+MAX_DESCRIPTION_CHARS = 250
@@ -0,0 +1,490 @@
+import os
+import re
+from datetime import date
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import fitz  # PyMuPDF
+import pdfplumber
+
+# Import parsers
+from maybank import parse_transactions_maybank, parse_page_maybank, stitch_maybank
+from public_bank import parse_transactions_pbb, parse_page_pbb, stitch_pbb
+from rhb import find_columns_rhb, parse_page_rhb
+from cimb import find_grid_cimb, parse_page_cimb
+from bank_islam import find_grid_bank_islam, parse_page_bank_islam
+
+from extraction import OCR_BACKENDS, WORD_BANKS, resolve_backend, open_document
+from bank_detect import BANK_DISPLAY_NAMES, detect_bank
+
+
+# ---------------------------------------------------
+# Bank Dispatch
+# ---------------------------------------------------
+# Banks with a parser wired into parse_text / WORD_PARSERS
+SUPPORTED_BANKS = ("maybank", "pbb", "rhb", "cimb", "bank_islam")
+
+# Parsers whose state runs across page breaks: (page -> partial result,
+# stitch(carry, partial) -> (transactions, carry))
+PAGE_STITCHERS = {
+    "maybank": (parse_page_maybank, stitch_maybank),
+    "pbb": (parse_page_pbb, stitch_pbb),
+}
+
+# Parsers that read word positions (WORD_BANKS): ((words, ruling lines) ->
+# column layout or None, parse(words, page_num, year, layout) -> transactions)
+WORD_PARSERS = {
+    "rhb": (find_columns_rhb, parse_page_rhb),
+    "cimb": (find_grid_cimb, parse_page_cimb),
+    "bank_islam": (find_grid_bank_islam, parse_page_bank_islam),
+}
+
+
+def parse_text(bank_hint, text, page_num, default_year):
+    """
+    Run a text-based bank parser over one page of extracted text.
+    """
+    if bank_hint == "maybank":
+        return parse_transactions_maybank(text, page_num, default_year)
+
+    if bank_hint == "pbb":
+        return parse_transactions_pbb(text, page_num, default_year)
+
+    return []
+
+
+def parse_partial(bank_hint, text, page_num, default_year):
+    """
+    Like parse_text, but returns the page as a partial result:
+    {"transactions": [...]} plus, for PAGE_STITCHERS banks, the parser
+    state left open at the page's edges. Pages parsed this way are
+    independent of each other; stitch_pages joins them up.
+    """
+    if bank_hint in PAGE_STITCHERS:
+        return PAGE_STITCHERS[bank_hint][0](text, page_num, default_year)
+    return {"transactions": parse_text(bank_hint, text, page_num, default_year)}
+
+
+def find_word_layout(bank_hint, doc, page_nums):
+    """
+    (page_num, layout) for the first of page_nums with a header row the
+    bank's WORD_PARSERS entry recognises, or (None, None).
+    """
+    find_layout = WORD_PARSERS[bank_hint][0]
+    for page_num in page_nums:
+        layout = find_layout(doc.page_words(page_num), doc.page_rules(page_num))
+        if layout:
+            return page_num, layout
+    return None, None
+
+
+def iter_word_partials(bank_hint, doc, page_nums, default_year, header=None):
+    """
+    Yield (page_num, partial result) for a WORD_PARSERS bank, reading each
+    page's words from doc (an extraction backend). The column layout is
+    learned from the first page with a header row and reused for every
+    page after it; ruling lines are only read until then.
+
+    header is (page_num, layout) from find_word_layout when the layout was
+    found for the whole document beforehand, so a slice of pages without a
+    header row of its own still parses; pages before the header page yield
+    nothing, as they would have had the layout been learned on the way.
+    """
+    find_layout, parse_words = WORD_PARSERS[bank_hint]
+    header_page, layout = header or (None, None)
+    for page_num in page_nums:
+        if header_page is not None and page_num < header_page:
+            yield page_num, {"transactions": []}
+            continue
+        words = doc.page_words(page_num)
+        if layout is None:
+            layout = find_layout(words, doc.page_rules(page_num))
+        transactions = parse_words(words, page_num, default_year, layout) if layout else []
+        yield page_num, {"transactions": transactions}
+
+
+def stitch_pages(bank_hint, partials):
+    """
+    Yield (page_num, transactions) from (page_num, partial) pairs given in
+    page order, resolving each page's edges against the pages before it
+    (a balance to tell debit from credit, a description cut by the page
+    break). One cheap sequential pass after the pages are parsed.
+    """
+    stitch = PAGE_STITCHERS[bank_hint][1] if bank_hint in PAGE_STITCHERS else None
+    carry = None
+    for page_num, partial in partials:
+        if stitch is None:
+            yield page_num, partial["transactions"]
+        else:
+            tx, carry = stitch(carry, partial)
+            yield page_num, tx
+
+
+def iter_page_partials(pdf_bytes, bank_hint, default_year,
+                       backend=None, first_page=1, last_page=None, extract_options=None, header=None):
+    """
+    Yield (page_num, partial result) for pages first_page..last_page.
+    Pages are read through the chosen extraction backend, opened once for
+    all the pages (extract_options are passed to it, e.g. OCR dpi): page
+    text, or word positions for WORD_BANKS (header: see iter_word_partials).
+    Backends that route pages (hybrid) tag each partial with its "route".
+    """
+    with open_document(resolve_backend(bank_hint, backend), pdf_bytes, extract_options, bank_hint) as doc:
+        pages = range(first_page, (last_page or len(doc)) + 1)
+        if bank_hint in WORD_BANKS:
+            partials = iter_word_partials(bank_hint, doc, pages, default_year, header)
+        else:
+            partials = ((n, parse_partial(bank_hint, doc.page_text(n), n, default_year)) for n in pages)
+
+        for page_num, partial in partials:
+            if hasattr(doc, "page_route"):
+                partial["route"] = doc.page_route(page_num)
+            yield page_num, partial
+
+
+def count_routes(partials, routes=None):
+    """
+    Pass (page_num, partial) pairs through, adding each page's route to
+    routes ({"text": n, "ocr": m}) when given.
+    """
+    for page_num, partial in partials:
+        if routes is not None and "route" in partial:
+            routes[partial["route"]] += 1
+        yield page_num, partial
+
+
+def iter_page_transactions(pdf_bytes, bank_hint, default_year,
+                           backend=None, first_page=1, last_page=None, extract_options=None, routes=None):
+    """
+    Yield (page_num, transactions) for pages first_page..last_page,
+    stitched across page breaks as they go. routes: see count_routes.
+    """
+    yield from stitch_pages(bank_hint, count_routes(iter_page_partials(
+        pdf_bytes, bank_hint, default_year,
+        backend=backend, first_page=first_page, last_page=last_page, extract_options=extract_options), routes))
+
+
+# ---------------------------------------------------
+# Helper: Extract Statement Month from PDF and Filename
+# ---------------------------------------------------
+def extract_statement_month(pdf, filename, warn=None):
+    """
+    Extract the statement month/year from the PDF header or filename.
+    Returns tuple: (year, month, month_name) or None
+
+    warn(message) is called if the PDF header could not be read.
+    """
+    month_map = {
+        'jan': 1, 'january': 1,
+        'feb': 2, 'february': 2,
+        'mar': 3, 'march': 3,
+        'apr': 4, 'april': 4,
+        'may': 5,
+        'jun': 6, 'june': 6,
+        'jul': 7, 'july': 7,
+        'aug': 8, 'august': 8,
+        'sep': 9, 'sept': 9, 'september': 9,
+        'oct': 10, 'october': 10,
+        'nov': 11, 'november': 11,
+        'dec': 12, 'december': 12
+    }
+
+    month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                   'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+    try:
+        # PRIORITY 1: Extract from filename
+        filename_patterns = [
+            r'([A-Z][a-z]{2,8})\s+(\d{4})',  # "APR 2024", "JUNE 2024"
+            r'(\d{4})\s+([A-Z][a-z]{2,8})',  # "2024 APR"
+            r'[_-]([a-z]{3,9})[_-](\d{4})',  # "_apr_2024", "-june-2024"
+            r'(\d{4})[_-](\d{1,2})',         # "2024-04", "2024_4"
+        ]
+
+        for pattern in filename_patterns:
+            match = re.search(pattern, filename, re.IGNORECASE)
+            if match:
+                g1, g2 = match.groups()
+
+                if g1.isdigit() and len(g1) == 4:
+                    year = int(g1)
+                    if g2.isdigit():
+                        month = int(g2)
+                    else:
+                        month = month_map.get(g2.lower()[:3])
+                elif g2.isdigit() and len(g2) == 4:
+                    year = int(g2)
+                    if g1.isdigit():
+                        month = int(g1)
+                    else:
+                        month = month_map.get(g1.lower()[:3])
+                else:
+                    continue
+
+                if month and 1 <= month <= 12:
+                    return (year, month, month_names[month-1])
+
+        # PRIORITY 2: Extract from PDF text as fallback
+        first_page = pdf.pages[0]
+        text = first_page.extract_text() or ""
+
+        pdf_patterns = [
+            r'Statement\s+(?:Date|Period)[:\s]+(\d{1,2})\s+([A-Za-z]+)\s+(\d{4})',
+            r'Statement\s+(?:Date|Period)[:\s]+([A-Za-z]+)\s+(\d{4})',
+            r'(\d{1,2})\s+([A-Za-z]+)\s+(\d{4})\s+to\s+\d{1,2}\s+[A-Za-z]+\s+\d{4}',
+        ]
+
+        for pattern in pdf_patterns:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                groups = match.groups()
+
+                if len(groups) == 3:
+                    month_str = groups[1]
+                    year = int(groups[2])
+                elif len(groups) == 2:
+                    month_str = groups[0]
+                    year = int(groups[1])
+                else:
+                    continue
+
+                month = month_map.get(month_str.lower()[:3])
+                if month:
+                    return (year, month, month_names[month-1])
+
+    except Exception as e:
+        if warn:
+            warn(f"Could not extract statement month from {filename}: {e}")
+
+    return None
+
+
+# Keys added per file by attach_metadata (not produced by the bank parsers)
+METADATA_KEYS = ("source_file", "bank", "statement_year", "statement_month", "statement_period")
+
+
+def attach_metadata(transactions, source_file, bank, statement_month):
+    """
+    Tag each transaction with its source file, bank and statement period.
+    """
+    for t in transactions:
+        t["source_file"] = source_file
+        t["bank"] = bank
+
+        # Add statement month metadata if available
+        if statement_month:
+            t["statement_year"] = statement_month[0]
+            t["statement_month"] = statement_month[1]
+            t["statement_period"] = f"{statement_month[0]}-{statement_month[1]:02d}"
+
+    return transactions
+
+
+def resolve_file_bank(pdf_bytes, bank_hint=None, bank_name=None):
+    """
+    Bank for one file: the given bank_hint, or auto-detected from the first
+    page when bank_hint is None. Returns (bank_hint, bank_name, error).
+    """
+    if bank_hint is None:
+        try:
+            bank_hint, _ = detect_bank(pdf_bytes)
+        except Exception as e:
+            return None, None, f"Could not read first page for bank detection: {e}"
+
+        if bank_hint is None:
+            return None, None, "Could not detect the bank - select it manually."
+
+        bank_name = BANK_DISPLAY_NAMES[bank_hint]
+
+    if bank_hint not in SUPPORTED_BANKS:
+        return bank_hint, bank_name, f"{bank_name} statements are not supported yet."
+
+    return bank_hint, bank_name or BANK_DISPLAY_NAMES.get(bank_hint, bank_hint), None
+
+
+# ---------------------------------------------------
+# Library API
+# ---------------------------------------------------
+def read_source(source):
+    """
+    Accept a path, raw bytes or a binary file object.
+    Returns (pdf_bytes, filename); filename is None for bytes.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source), None
+
+    if hasattr(source, "read"):
+        return source.read(), getattr(source, "name", None)
+
+    with open(source, "rb") as f:
+        return f.read(), os.path.basename(os.fspath(source))
+
+
+def parse_statement(source, bank=None, default_year=None, source_file=None,
+                    backend=None, extract_options=None, workers=1, on_page=None,
+                    statement_month=None, routes=None):
+    """
+    Parse one statement and yield its transactions as each page is parsed.
+
+    source: path, bytes or binary file object.
+    bank: bank_hint ("maybank", "pbb", ...) or None to detect it from the
+    first page. default_year fills in dates printed without a year; it
+    defaults to the statement year, else the current year.
+    Each transaction carries the same metadata as in the app
+    (source_file, bank, statement period).
+
+    workers > 1 parses slices of pages in a process pool (see
+    iter_pages_parallel); rows still come in page order.
+    on_page(page_num, page_count) is called after each page's rows;
+    returning False stops the parse there. statement_month is
+    (year, month, month_name) if the caller has already read it.
+    routes, a {"text": 0, "ocr": 0} dict, counts the hybrid backend's
+    route for each page parsed.
+
+    Raises ValueError if the bank cannot be detected or has no parser.
+    """
+    pdf_bytes, filename = read_source(source)
+    source_file = source_file or filename or "statement.pdf"
+
+    bank_hint, bank_name, error = resolve_file_bank(pdf_bytes, bank)
+    if error:
+        raise ValueError(f"{source_file}: {error}")
+
+    page_count = count_pages(pdf_bytes)
+    if statement_month is None:
+        with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
+            statement_month = extract_statement_month(pdf, source_file)
+
+    if default_year is None:
+        default_year = str(statement_month[0] if statement_month else date.today().year)
+
+    pages = iter_pages_parallel(pdf_bytes, bank_hint, default_year, workers=workers, page_count=page_count,
+                                backend=backend, extract_options=extract_options, routes=routes)
+    try:
+        for page_num, tx in pages:
+            yield from attach_metadata(tx, source_file, bank_name, statement_month)
+            if on_page is not None and on_page(page_num, page_count) is False:
+                return
+    finally:
+        # Stops the pool's remaining slices when the parse ends early
+        pages.close()
+
+
+# ---------------------------------------------------
+# Page Slicing
+# ---------------------------------------------------
+def split_pages(page_count, workers, chunks_per_worker=4):
+    """
+    Split pages 1..page_count into contiguous (first, last) slices.
+    A few slices per worker keeps the pool busy when some pages are
+    much denser than others.
+    """
+    if page_count <= 0:
+        return []
+
+    n_slices = max(1, min(page_count, workers * chunks_per_worker))
+    size, extra = divmod(page_count, n_slices)
+
+    slices = []
+    first = 1
+    for i in range(n_slices):
+        last = first + size - 1 + (1 if i < extra else 0)
+        slices.append((first, last))
+        first = last + 1
+
+    return slices
+
+
+def _parse_page_range(pdf_bytes, bank_hint, first_page, last_page, default_year,
+                      backend=None, extract_options=None, header=None):
+    """
+    Worker entry point: open the PDF independently and parse one slice of pages.
+    Returns a list of (page_num, partial result) tuples, not yet stitched.
+    """
+    return list(iter_page_partials(pdf_bytes, bank_hint, default_year,
+                                   backend=backend, first_page=first_page, last_page=last_page,
+                                   extract_options=extract_options, header=header))
+
+
+def find_document_header(pdf_bytes, bank_hint, page_count, backend=None, extract_options=None):
+    """
+    For WORD_BANKS, (page_num, layout) of the document's first header row,
+    found once before the pages are split so every slice parses with it
+    (a slice starting past the header page has no header row of its own).
+    None for other banks.
+    """
+    if bank_hint not in WORD_BANKS:
+        return None
+    # One page at a time: OCR batches would recognise pages the workers parse anyway
+    options = dict(extract_options or {}, batch_size=1)
+    with open_document(resolve_backend(bank_hint, backend), pdf_bytes, options, bank_hint) as doc:
+        return find_word_layout(bank_hint, doc, range(1, page_count + 1))
+
+
+# ---------------------------------------------------
+# Page-Parallel Extraction
+# ---------------------------------------------------
+def count_pages(pdf_bytes):
+    """Page count from PyMuPDF; pdfplumber builds every page object to count them."""
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return doc.page_count
+
+
+# Below this many pages a process pool costs more to start than it saves,
+# unless pages may go through OCR (seconds a page)
+MIN_PARALLEL_PAGES = 20
+
+
+def iter_pages_parallel(pdf_bytes, bank_hint, default_year, workers=None, page_count=None,
+                        backend=None, extract_options=None, routes=None):
+    """
+    Yield (page_num, transactions) for the whole PDF, like
+    iter_page_transactions, with slices of pages parsed by a process pool.
+    Each worker opens the PDF itself and parses its pages independently;
+    a WORD_BANKS column layout is found here first and handed to every
+    worker. Pages are stitched and yielded in page order as soon as the
+    pages before them are back, so a caller can report progress and stop
+    early; closing the generator drops the slices not yet started.
+    Small PDFs and workers <= 1 are parsed in-process. routes: see
+    count_routes; the workers' partials carry each page's route back.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    if page_count is None:
+        page_count = count_pages(pdf_bytes)
+
+    slices = split_pages(page_count, workers)
+    min_pages = 1 if resolve_backend(bank_hint, backend) in OCR_BACKENDS else MIN_PARALLEL_PAGES
+
+    if workers <= 1 or len(slices) <= 1 or page_count < min_pages:
+        yield from iter_page_transactions(pdf_bytes, bank_hint, default_year,
+                                          backend=backend, extract_options=extract_options, routes=routes)
+        return
+
+    header = find_document_header(pdf_bytes, bank_hint, page_count, backend, extract_options)
+    if header == (None, None):
+        # No page has a header row, so no page has a table to parse
+        for page_num in range(1, page_count + 1):
+            yield page_num, []
+        return
+
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(slices)))
+    try:
+        futures = [
+            pool.submit(_parse_page_range, pdf_bytes, bank_hint, first, last,
+                        default_year, backend, extract_options, header)
+            for first, last in slices
+        ]
+
+        def in_page_order():
+            done = as_completed(futures)
+            by_page = {}
+            for page_num in range(1, page_count + 1):
+                while page_num not in by_page:
+                    by_page.update(next(done).result())
+                yield page_num, by_page.pop(page_num)
+
+        yield from stitch_pages(bank_hint, count_routes(in_page_order(), routes))
+    finally:
+        pool.shutdown(cancel_futures=True)
+
@@ -1,16 +1,17 @@
-import re
+import regex as re
+
+from amounts import parse_amount
+from page_text import MAX_CONTINUATION_LINES, ensure_normalised
 
 # ---------------------------------------------------------
 # Regex Patterns
 # ---------------------------------------------------------
-# Matches date at start of line: "05/06 ..."
-DATE_LINE = re.compile(r"^(?P<date>\d{2}/\d{2})\s+(?P<rest>.*)$")
+# An amount starts a number (never read from the middle of a digit run),
+# and its comma groups are possessive: a scan stays linear over long runs
+AMOUNT = r"(?<![\d,])\d{1,3}(?:,\d{3})*+\.\d{2}"
 
 # Matches amount + balance at end of line: "1,200.00 45,000.00"
-AMOUNT_BAL = re.compile(r"(?P<amount>\d{1,3}(?:,\d{3})*\.\d{2})\s+(?P<balance>\d{1,3}(?:,\d{3})*\.\d{2})$")
-
-# Matches "Balance B/F" lines (updates tracking, but does not create a transaction row)
-BAL_ONLY = re.compile(r"^(?P<date>\d{2}/\d{2})\s+(Balance.*)\s+(?P<balance>\d{1,3}(?:,\d{3})*\.\d{2})$", re.IGNORECASE)
+AMOUNT_BAL = re.compile(rf"(?P<amount>{AMOUNT})\s+(?P<balance>{AMOUNT})$")
 
 # ---------------------------------------------------------
 # Configuration
@@ -29,72 +30,129 @@ IGNORE_PREFIXES = [
     "DATE", "NO.", "URUS NIAGA"
 ]
 
+# Lines that close the transaction list; a description still open there is dropped
+SECTION_END = [
+    "CLOSING BALANCE", "BAKI PENUTUP", "TOTAL DEBIT", "TOTAL CREDIT",
+    "JUMLAH DEBIT", "JUMLAH KREDIT", "END OF STATEMENT",
+]
+
+# ---------------------------------------------------------
+# Page Scanner
+# ---------------------------------------------------------
+# One match per line of normalised page text (stripped, single-spaced),
+# found with finditer over the whole page; header lines give no match.
+# The groups a match sets make it a token:
+#   bf_balance        "05/06 Balance B/F 1,000.00": tracking only, no row
+#   section_end       "TOTAL DEBIT ...": closes any open description
+#   amounts           the line ends with amount + balance, closing a row
+#   date / keyword    the line starts a transaction ("05/06 ...", "DUITNOW ...")
+#   none of these     continuation text
+LINE_SCAN = re.compile(
+    r"^(?!(?i:" + "|".join(map(re.escape, IGNORE_PREFIXES)) + r"))"
+    r"(?:"
+    r"(?P<section_end>(?i:" + "|".join(map(re.escape, SECTION_END)) + r"))[^\n]*+"
+    r"|"
+    rf"(?P<bf_date>\d{{2}}/\d{{2}}) (?i:Balance)[^\n]* (?P<bf_balance>{AMOUNT})"
+    r"|"
+    r"(?P<line>"
+    r"(?:(?P<date>\d{2}/\d{2}) |(?P<keyword>(?=" + "|".join(map(re.escape, TX_KEYWORDS)) + r")))?"
+    rf"(?P<rest>[^\n]*?(?P<amounts>(?P<amount>{AMOUNT}) (?P<balance>{AMOUNT}))?)"
+    r")"
+    r")$",
+    re.MULTILINE,
+)
+
 # ---------------------------------------------------------
 # Main Logic
 # ---------------------------------------------------------
-def parse_transactions_pbb(text, page, year="2025"):
+def iso_date(current_date, year):
+    if current_date:
+        dd, mm = current_date.split("/")
+        return f"{year}-{mm}-{dd}"
+    return f"{year}-01-01"
+
+
+def guess_direction(amount, description):
+    """(debit, credit) from keywords, for a row with no earlier balance to compare against."""
+    if "CR" in description.upper() or "DEP" in description.upper():
+        return 0.0, amount
+    return amount, 0.0
+
+
+def parse_page_pbb(text, page, year="2025"):
+    """
+    Parse one page on its own, as a partial result for stitch_pbb.
+
+    Returns {"transactions": [...], plus the page's open state}:
+        first_guessed: the first row's debit/credit came from keywords,
+                       because no balance was seen before it on this page
+        undated:       rows before the first date on the page
+        continues:     the first row had no date/keyword of its own, so it
+                       finishes a description begun on an earlier page
+        leading:       text before the page's first transaction line
+        anchored:      the page had any transaction or balance line
+        last_balance, last_date, pending: state at the end of the page
+                       (pending is a description still waiting for its amount)
+    """
     tx = []
     current_date = None
     prev_balance = None
     
     # State holders
     desc_accum = ""
+    desc_lines = 0
     waiting_for_amount = False
-    
-    def is_ignored(line):
-        return any(line.upper().startswith(p) for p in IGNORE_PREFIXES)
 
-    def is_tx_start(line):
-        return any(line.startswith(k) for k in TX_KEYWORDS)
+    # Page-edge state for stitch_pbb
+    first_guessed = False
+    undated = 0
+    continues = False
+    leading = []
+    anchored = False
 
-    lines = text.splitlines()
-    
-    for line in lines:
-        line = line.strip()
-        if not line or is_ignored(line):
+    for m in LINE_SCAN.finditer(ensure_normalised(text)):
+        section_end, bf_date, bf_balance, line, date, keyword, rest, amounts, amount, balance = m.groups()
+
+        if section_end is not None:
+            desc_accum = ""
+            waiting_for_amount = False
+            anchored = True
             continue
 
-        # 1. Check for Amounts FIRST
-        amount_match = AMOUNT_BAL.search(line)
-        has_amount = bool(amount_match)
-        
-        # 2. Check for Start of New Transaction (Date or Keyword)
-        date_match = DATE_LINE.match(line)
-        keyword_match = is_tx_start(line)
-        is_new_start = date_match or keyword_match
-        
-        # 3. SPECIAL CASE: Balance B/F (Update tracking only)
-        bal_match = BAL_ONLY.match(line)
-        if bal_match:
-            current_date = bal_match.group("date")
-            prev_balance = float(bal_match.group("balance").replace(",", ""))
+        # SPECIAL CASE: Balance B/F (Update tracking only)
+        if bf_balance:
+            current_date = bf_date
+            prev_balance = parse_amount(bf_balance)
             desc_accum = ""
             waiting_for_amount = False 
+            anchored = True
             continue
 
+        is_new_start = date or keyword is not None
+
         # -------------------------------------------------------
         # LOGIC BRANCHING
         # -------------------------------------------------------
         
         # CASE A: Line HAS amounts
-        if has_amount:
+        if amounts:
             # Extract numbers
-            amount = float(amount_match.group("amount").replace(",", ""))
-            balance = float(amount_match.group("balance").replace(",", ""))
+            amount = parse_amount(amount)
+            balance = parse_amount(balance)
             
             # Identify if this is a NEW single-line transaction or Continuation
             if is_new_start:
-                if date_match:
-                    current_date = date_match.group("date")
-                    line_desc = date_match.group("rest")
+                if date:
+                    current_date = date
+                    final_desc = rest
                 else:
                     # Remove amount from line to get clean description
-                    line_desc = line.replace(amount_match.group(0), "").strip()
-                
-                final_desc = line_desc
+                    final_desc = line.replace(amounts, "").strip()
             else:
                 # Merge with accumulated description
-                final_desc = desc_accum + " " + line.replace(amount_match.group(0), "").strip()
+                final_desc = desc_accum + " " + line.replace(amounts, "").strip()
+                if not anchored:
+                    continues = True
 
             # Determine Debit vs Credit
             debit = 0.0
@@ -106,22 +164,17 @@ def parse_transactions_pbb(text, page, year="2025"):
                 elif balance > prev_balance:
                     credit = amount
             else:
-                # Fallback if first item on page
-                if "CR" in final_desc.upper() or "DEP" in final_desc.upper():
-                    credit = amount
-                else:
-                    debit = amount
+                # First item on page: the stitch pass replaces this guess
+                # with the previous page's closing balance
+                debit, credit = guess_direction(amount, final_desc)
+                first_guessed = True
 
-            # Date Formatting
-            if current_date:
-                dd, mm = current_date.split("/")
-                iso = f"{year}-{mm}-{dd}"
-            else:
-                iso = f"{year}-01-01"
+            if current_date is None:
+                undated += 1
 
             # APPEND TO LIST IMMEDIATELY (Preserves Order)
             tx.append({
-                "date": iso,
+                "date": iso_date(current_date, year),
                 "description": final_desc.strip(),
                 "debit": debit,
                 "credit": credit,
@@ -134,21 +187,86 @@ def parse_transactions_pbb(text, page, year="2025"):
             prev_balance = balance
             desc_accum = ""
             waiting_for_amount = False
+            anchored = True
 
         # CASE B: No amounts, but STARTS a new transaction
         elif is_new_start:
-            if date_match:
-                current_date = date_match.group("date")
-                desc_accum = date_match.group("rest")
+            if date:
+                current_date = date
+                desc_accum = rest
             else:
                 desc_accum = line
             
+            desc_lines = 1
             waiting_for_amount = True
+            anchored = True
 
         # CASE C: Continuation text
         elif waiting_for_amount:
-            desc_accum += " " + line
+            if desc_lines < MAX_CONTINUATION_LINES:
+                desc_accum += " " + line
+                desc_lines += 1
+
+        elif not anchored and len(leading) < MAX_CONTINUATION_LINES:
+            leading.append(line)
 
     # No sorting is applied. 
     # The list 'tx' is returned exactly in the order the lines were processed.
-    return tx
+    return {
+        "transactions": tx,
+        "year": year,
+        "first_guessed": first_guessed,
+        "undated": undated,
+        "continues": continues,
+        "leading": " ".join(leading),
+        "anchored": anchored,
+        "last_balance": prev_balance,
+        "last_date": current_date,
+        "pending": desc_accum if waiting_for_amount else None,
+    }
+
+
+def stitch_pbb(carry, partial):
+    """
+    Resolve a page's edges against the state carried from the pages before it.
+
+    carry is the previous call's returned state (None for the first page).
+    Returns (transactions, state for the next page). Stitching pages in order
+    gives the same rows as parsing the whole statement as one text.
+    """
+    tx = partial["transactions"]
+    if carry and tx:
+        first = tx[0]
+        if partial["continues"] and carry["pending"] is not None:
+            parts = (carry["pending"], partial["leading"], first["description"])
+            first["description"] = " ".join(p for p in parts if p).strip()
+        if partial["first_guessed"]:
+            amount = first["debit"] + first["credit"]
+            if carry["last_balance"] is not None:
+                first["debit"] = amount if first["balance"] < carry["last_balance"] else 0.0
+                first["credit"] = amount if first["balance"] > carry["last_balance"] else 0.0
+            else:
+                first["debit"], first["credit"] = guess_direction(amount, first["description"])
+        if carry["last_date"]:
+            for t in tx[:partial["undated"]]:
+                t["date"] = iso_date(carry["last_date"], partial["year"])
+
+    carry = carry or {"last_balance": None, "last_date": None, "pending": None}
+    if partial["anchored"]:
+        pending = partial["pending"]
+    elif carry["pending"] is not None:
+        # A page of nothing but continuation text keeps the description open
+        pending = " ".join(p for p in (carry["pending"], partial["leading"]) if p)
+    else:
+        pending = None
+
+    return tx, {
+        "last_balance": carry["last_balance"] if partial["last_balance"] is None else partial["last_balance"],
+        "last_date": partial["last_date"] or carry["last_date"],
+        "pending": pending,
+    }
+
+
+def parse_transactions_pbb(text, page, year="2025"):
+    """One page on its own: the first row's direction is guessed from keywords."""
+    return parse_page_pbb(text, page, year)["transactions"]
@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+
+
+# ---------------------------------------------------
+# Configuration
+# ---------------------------------------------------
+# Date formats the parsers emit: Maybank/CIMB "dd/mm/yyyy", PBB/RHB/Bank Islam "yyyy-mm-dd"
+DATE_FORMATS = ["%d/%m/%Y", "%Y-%m-%d"]
+
+SUMMARY_COLUMNS = [
+    "month", "transaction_count", "total_debit", "total_credit",
+    "net_change", "ending_balance", "lowest_balance", "highest_balance",
+    "source_files",
+]
+
+
+# ---------------------------------------------------
+# Dates and Periods
+# ---------------------------------------------------
+def factorize(column):
+    """(int codes, distinct values) for a column; -1 for missing. Categoricals are used as-is."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.codes.to_numpy(dtype=np.int64), np.asarray(column.cat.categories, dtype=object)
+    codes, uniques = pd.factorize(column)
+    return codes.astype(np.int64), np.asarray(uniques, dtype=object)
+
+
+def parse_dates(uniques):
+    """
+    Parse distinct date strings, trying each of DATE_FORMATS.
+    Returns (datetime64 array, "YYYY-MM" object array); NaT/None where unparseable.
+    A statement has a few hundred distinct dates however many rows it has,
+    so parsing only the distinct values keeps this cheap.
+    """
+    index = pd.Index(uniques, dtype=object)
+    parsed = pd.Series(pd.NaT, index=range(len(index)), dtype="datetime64[ns]")
+    for fmt in DATE_FORMATS:
+        missing = parsed.isna().to_numpy()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(index[missing], format=fmt, errors="coerce")
+
+    months = np.where(parsed.isna(), None, parsed.dt.strftime("%Y-%m").to_numpy(dtype=object))
+    return parsed.to_numpy(), months
+
+
+def date_column(df):
+    """(row codes, parsed distinct dates, their "YYYY-MM") for df["date"]."""
+    if "date" not in df.columns:
+        return np.full(len(df), -1), np.empty(0, dtype="datetime64[ns]"), np.empty(0, dtype=object)
+    date_codes, date_values = factorize(df["date"])
+    parsed, months = parse_dates(date_values)
+    return date_codes, parsed, months
+
+
+def expand_dates(date_codes, parsed):
+    """Parsed distinct dates back out to one datetime64 per row (NaT for code -1)."""
+    return np.append(parsed, np.datetime64("NaT")).astype("datetime64[ns]")[date_codes]
+
+
+def row_dates(df):
+    """df["date"] parsed to datetime64, one value per row."""
+    date_codes, parsed, _ = date_column(df)
+    return expand_dates(date_codes, parsed)
+
+
+def amount_cents(df, col):
+    """Exact int64 cents for an amount column; the store provides them precomputed."""
+    if f"{col}_cents" in df.columns:
+        return df[f"{col}_cents"].to_numpy(dtype=np.int64)
+    return (pd.to_numeric(df[col], errors="coerce").fillna(0) * 100).round().to_numpy(dtype=np.int64)
+
+
+def remap(codes, values, categories):
+    """Codes into `values` -> codes into `categories` (-1 stays -1, as do values not in it)."""
+    lookup = np.append(categories.get_indexer(values), -1)
+    return lookup[codes]
+
+
+# ---------------------------------------------------
+# Monthly Summary
+# ---------------------------------------------------
+def summarise(df):
+    """
+    Per-period totals and the overall totals built from them, in one pass.
+
+    Rows are grouped by statement_period (from the filename/PDF header),
+    falling back to the transaction date's month for files without one.
+    Ending balance is the last balance in date order, ties kept in page
+    and line order. Debit/credit totals are summed as int64 cents.
+    Everything runs on integer codes, so the cost is a few array passes
+    however many rows there are.
+
+    Returns {"monthly": DataFrame[SUMMARY_COLUMNS], "totals": dict}.
+    """
+    n = len(df)
+    date_codes, parsed, months = date_column(df)
+
+    if "statement_period" in df.columns:
+        period_codes, period_values = factorize(df["statement_period"])
+    else:
+        period_codes, period_values = np.full(n, -1), np.empty(0, dtype=object)
+
+    # One set of period labels for statement periods and date months together
+    periods = pd.Index(sorted({p for p in period_values if p} | {m for m in months if m}), dtype=object)
+    row_period = np.where(period_codes >= 0,
+                          remap(period_codes, period_values, periods),
+                          remap(date_codes, months, periods))
+
+    row_dates = expand_dates(date_codes, parsed).view(np.int64)
+
+    keep = np.flatnonzero(row_period >= 0)
+    # Stable: period, then date (undated rows first), then original page/line order
+    order = keep[np.lexsort((row_dates[keep], row_period[keep]))]
+
+    work = pd.DataFrame({
+        "period": row_period[order],
+        "debit_cents": amount_cents(df, "debit")[order],
+        "credit_cents": amount_cents(df, "credit")[order],
+        "balance": pd.to_numeric(df["balance"], errors="coerce").to_numpy(dtype=np.float64)[order],
+    })
+
+    grouped = work.groupby("period", sort=True).agg(
+        transaction_count=("debit_cents", "size"),
+        debit_cents=("debit_cents", "sum"),
+        credit_cents=("credit_cents", "sum"),
+        ending_balance=("balance", "last"),
+        lowest_balance=("balance", "min"),
+        highest_balance=("balance", "max"),
+    )
+
+    if "source_file" in df.columns:
+        file_codes, file_values = factorize(df["source_file"])
+        # Distinct (period, file) pairs as one int64 key, hashed rather than sorted
+        pairs = pd.unique(row_period[keep] * (len(file_values) + 1) + file_codes[keep] + 1)
+        pair_periods, pair_files = np.divmod(pairs, len(file_values) + 1)
+        files = (pd.Series(np.append(file_values, "")[pair_files - 1], index=pair_periods)
+                 .groupby(level=0).agg(lambda names: ", ".join(sorted(names))))
+    else:
+        files = pd.Series(dtype=object)
+
+    monthly = pd.DataFrame({
+        "month": periods[grouped.index].to_numpy(),
+        "transaction_count": grouped["transaction_count"].to_numpy(),
+        "total_debit": grouped["debit_cents"].to_numpy() / 100,
+        "total_credit": grouped["credit_cents"].to_numpy() / 100,
+        "net_change": (grouped["credit_cents"] - grouped["debit_cents"]).to_numpy() / 100,
+        "ending_balance": grouped["ending_balance"].round(2).to_numpy(),
+        "lowest_balance": grouped["lowest_balance"].round(2).to_numpy(),
+        "highest_balance": grouped["highest_balance"].round(2).to_numpy(),
+        "source_files": files.reindex(grouped.index, fill_value="").to_numpy(),
+    }, columns=SUMMARY_COLUMNS)
+
+    debit_total = int(grouped["debit_cents"].sum())
+    credit_total = int(grouped["credit_cents"].sum())
+    dated = parsed[~np.isnat(parsed)] if len(parsed) else parsed
+
+    totals = {
+        "total_transactions": int(grouped["transaction_count"].sum()),
+        "total_debit": debit_total / 100,
+        "total_credit": credit_total / 100,
+        "net_change": (credit_total - debit_total) / 100,
+        "date_range": (f"{pd.Timestamp(dated.min()):%Y-%m-%d} to {pd.Timestamp(dated.max()):%Y-%m-%d}"
+                       if len(dated) else "N/A"),
+        "total_files_processed": int(df["source_file"].nunique()) if "source_file" in df.columns else 0,
+    }
+
+    return {"monthly": monthly, "totals": totals}
+
+
+# ---------------------------------------------------
+# Report
+# ---------------------------------------------------
+def records(df):
+    """DataFrame rows as JSON-ready dicts (NaN/NA -> None)."""
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def build_report(transactions, summary):
+    """Full JSON report from the transactions shown and their summarise() result."""
+    return {
+        "summary": summary["totals"],
+        "monthly_summary": records(summary["monthly"]),
+        "transactions": records(transactions),
+    }
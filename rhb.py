@@ -1,175 +1,128 @@
-import fitz  # PyMuPDF
 import re
-from datetime import datetime
+from bisect import bisect_right
 
-def parse_transactions_rhb(pdf_path_or_page, page_num, year=2024):
+from amounts import parse_amount
+from page_text import MAX_CONTINUATION_LINES, word_rows
+from table_grid import header_columns
+
+
+# ---------------------------------------------------
+# Configuration
+# ---------------------------------------------------
+MONTHS = {
+    "JAN": "01", "FEB": "02", "MAR": "03", "APR": "04", "MAY": "05", "JUN": "06",
+    "JUL": "07", "AUG": "08", "SEP": "09", "OCT": "10", "NOV": "11", "DEC": "12",
+}
+
+DAY = re.compile(r"\d{1,2}")
+
+# Header words that start each column read by position. A column runs from
+# the left edge of its header word to the next column's, and a word belongs
+# to the column its right edge falls in, so right-aligned amounts land in
+# the column they are printed under. Words left of every column are the
+# date and description.
+HEADER_WORDS = {
+    "serial": ("CHEQUE", "SERIAL"),     # "Cheque / Serial No"
+    "debit": ("DEBIT",),
+    "credit": ("CREDIT",),
+    "balance": ("BALANCE",),
+}
+
+# Columns a header row must name to be taken for the table header
+REQUIRED_COLUMNS = {"debit", "credit", "balance"}
+
+# Rows that carry balances or totals rather than a transaction; they also
+# end any description still being continued
+CONTROL_ROWS = ("B/F BALANCE", "C/F BALANCE", "TOTAL COUNT")
+
+
+# ---------------------------------------------------
+# Column Layout
+# ---------------------------------------------------
+def find_columns_rhb(words, rules=()):
     """
-    Parses RHB Bank transactions using PyMuPDF for better text extraction.
-    
-    Args:
-        pdf_path_or_page: Either a file path string or a fitz.Page object
-        page_num: Page number for reference
-        year: Year for the transactions
+    Column layout from a page's header row: {column: left edge x} for the
+    HEADER_WORDS columns, or None if the page has no row naming the debit,
+    credit and balance columns. RHB prints the same table on every page,
+    so a layout found once applies to the whole statement. The table is
+    not ruled, so rules (the page's ruling lines) are not used.
     """
+    for row in word_rows(words):
+        columns = header_columns(row, HEADER_WORDS)
+        if REQUIRED_COLUMNS <= columns.keys():
+            return {column: w[0] for column, w in columns.items()}
+
+    return None
+
+
+# ---------------------------------------------------
+# Main Logic
+# ---------------------------------------------------
+def parse_page_rhb(words, page_num, year=2024, columns=None):
+    """
+    Parse one page of RHB transactions from PyMuPDF words
+    (x0, y0, x1, y1, text, ...), using the column layout from
+    find_columns_rhb. Debit, credit and balance are read from the columns
+    their words sit in. Lines without a date continue the description above.
+    """
+    if columns is None:
+        columns = find_columns_rhb(words)
+        if columns is None:
+            return []
+
+    names = sorted(columns, key=columns.get)
+    edges = [columns[name] for name in names]
+
     transactions = []
-    
-    # Month mapping
-    month_map = {
-        'Jan': '01', 'Feb': '02', 'Mar': '03', 'Apr': '04',
-        'May': '05', 'Jun': '06', 'Jul': '07', 'Aug': '08',
-        'Sep': '09', 'Oct': '10', 'Nov': '11', 'Dec': '12'
-    }
-    
-    # Get the page object
-    if isinstance(pdf_path_or_page, str):
-        doc = fitz.open(pdf_path_or_page)
-        page = doc[page_num - 1]
-    else:
-        page = pdf_path_or_page
-    
-    # Extract text with layout preservation
-    text = page.get_text("text")
-    lines = text.split('\n')
-    
-    # Also extract structured text for better parsing
-    blocks = page.get_text("dict")["blocks"]
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Match transaction line: DD Mon DESCRIPTION...
-        date_match = re.match(r'^(\d{1,2})\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(.+)', line, re.IGNORECASE)
-        
-        if not date_match:
-            i += 1
-            continue
-        
-        day = date_match.group(1).zfill(2)
-        month = date_match.group(2).capitalize()
-        month_num = month_map.get(month, '01')
-        rest = date_match.group(3).strip()
-        
-        # Skip control lines
-        if any(skip in rest for skip in ['B/F BALANCE', 'C/F BALANCE', 'Total Count']):
-            i += 1
-            continue
-        
-        # Parse the rest of the line
-        # RHB Format: DESCRIPTION SERIAL DEBIT CREDIT BALANCE
-        # OR: DESCRIPTION SERIAL AMOUNT BALANCE
-        
-        # Split into parts
-        parts = rest.split()
-        
-        # Find all numeric values (amounts with optional commas and decimals)
-        numbers = []
-        desc_parts = []
-        
-        for part in parts:
-            # Check if this is a number
-            clean = part.replace(',', '')
-            if re.match(r'^\d+(\.\d{2})?$', clean):
-                numbers.append(float(clean))
-            else:
-                desc_parts.append(part)
-        
-        if len(numbers) < 1:
-            i += 1
+    current = None      # last transaction started, while its description may continue
+    lines = 0
+
+    for row in word_rows(words):
+        cells = {"description": []}
+        for w in row:
+            i = bisect_right(edges, w[2]) - 1
+            cells.setdefault(names[i] if i >= 0 else "description", []).append(w[4])
+
+        desc = cells["description"]
+        dated = (len(desc) >= 2 and DAY.fullmatch(desc[0]) is not None
+                 and desc[1].upper() in MONTHS)
+        text = " ".join(desc[2:] if dated else desc)
+
+        if any(control in text.upper() for control in CONTROL_ROWS):
+            current = None
             continue
-        
-        # Get balance (always last number)
-        balance = numbers[-1]
-        
-        # Build description
-        description = ' '.join(desc_parts)
-        
-        # Look ahead for continuation lines
-        j = i + 1
-        continuation_lines = []
-        while j < len(lines) and j < i + 10:
-            next_line = lines[j].strip()
-            
-            # Stop if we hit another date line
-            if re.match(r'^\d{1,2}\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)', next_line, re.IGNORECASE):
-                break
-            
-            # Stop on empty lines
-            if not next_line:
-                j += 1
-                continue
-            
-            # Stop on table headers
-            if any(h in next_line for h in ['Date', 'Tarikh', 'Description', 'Debit', 'Credit', 'Balance', '---']):
-                break
-            
-            # Stop if this line is all numbers (shouldn't happen but safety check)
-            if re.match(r'^[\d,.\s]+$', next_line):
-                j += 1
-                continue
-            
-            # Add as continuation
-            continuation_lines.append(next_line)
-            j += 1
-        
-        # Combine description with continuations
-        if continuation_lines:
-            full_desc = description + ' ' + ' '.join(continuation_lines)
-        else:
-            full_desc = description
-        
-        full_desc = ' '.join(full_desc.split()).strip()
-        
-        # Determine debit/credit
-        debit = 0.0
-        credit = 0.0
-        
-        # Analyze based on number of amounts found
-        if len(numbers) >= 4:
-            # Format: serial, debit, credit, balance
-            debit = numbers[-3]
-            credit = numbers[-2]
-        elif len(numbers) >= 3:
-            # Format: serial, amount, balance
-            amount = numbers[-2]
-            
-            # Determine type based on keywords
-            upper_desc = full_desc.upper()
-            if any(kw in upper_desc for kw in ['CR', 'CREDIT', 'DEPOSIT', 'INWARD', 'CDT', 'P2P CR']):
-                credit = amount
-            elif any(kw in upper_desc for kw in ['DR', 'DEBIT', 'WITHDRAWAL', 'FEES', 'TRF DR']):
-                debit = amount
-            else:
-                # Default logic
-                if 'TRF DR' in upper_desc or upper_desc.endswith(' DR'):
-                    debit = amount
-                else:
-                    credit = amount
-        elif len(numbers) == 2:
-            # Format: amount, balance
-            amount = numbers[-2]
-            upper_desc = full_desc.upper()
-            
-            if any(kw in upper_desc for kw in ['CR', 'CREDIT', 'DEPOSIT', 'INWARD']):
-                credit = amount
-            else:
-                debit = amount
-        
-        # Format date
-        iso_date = f"{year}-{month_num}-{day}"
-        
-        # Add transaction
-        if full_desc:
-            transactions.append({
-                "date": iso_date,
-                "description": full_desc,
-                "debit": debit,
-                "credit": credit,
+
+        balance = parse_amount(" ".join(cells.get("balance", []))) if "balance" in cells else None
+
+        if dated:
+            current = {
+                "date": f"{year}-{MONTHS[desc[1].upper()]}-{desc[0].zfill(2)}",
+                "description": text,
+                "ref_no": " ".join(cells.get("serial", [])),
+                "debit": parse_amount(" ".join(cells.get("debit", []))) or 0.0,
+                "credit": parse_amount(" ".join(cells.get("credit", []))) or 0.0,
                 "balance": balance,
-                "page": page_num
-            })
-        
-        # Move to next transaction
-        i = j if j > i else i + 1
-    
+                "page": page_num,
+            }
+            lines = 1
+            if balance is not None:
+                transactions.append(current)
+
+        elif current is not None:
+            if text and lines < MAX_CONTINUATION_LINES:
+                current["description"] = f"{current['description']} {text}"
+                lines += 1
+
+            # Amounts printed on the last line of a wrapped entry
+            if current["balance"] is None and balance is not None:
+                current["debit"] = parse_amount(" ".join(cells.get("debit", []))) or 0.0
+                current["credit"] = parse_amount(" ".join(cells.get("credit", []))) or 0.0
+                current["balance"] = balance
+                transactions.append(current)
+
     return transactions
+
+
+def parse_transactions_rhb(page, page_num, year=2024):
+    """One fitz.Page on its own, its column layout read from its own header row."""
+    return parse_page_rhb(page.get_text("words"), page_num, year)
@@ -0,0 +1,126 @@
+from bisect import bisect_right
+
+from page_text import word_rows
+
+
+# ---------------------------------------------------
+# Configuration
+# ---------------------------------------------------
+# Vertical rules closer than this (points) are one column edge
+RULE_SNAP = 1.5
+
+
+# ---------------------------------------------------
+# Header Row
+# ---------------------------------------------------
+def header_columns(row, header_words):
+    """
+    {column: header word} for a row of words. header_words maps each
+    column to the labels that name it; a label names the first column
+    (left to right) not yet taken.
+    """
+    columns = {}
+    for w in row:
+        label = w[4].upper().strip("/:")
+        for column, labels in header_words.items():
+            if label in labels and column not in columns:
+                columns[column] = w
+                break
+    return columns
+
+
+def is_header(row, header_words, required):
+    return required <= header_columns(row, header_words).keys()
+
+
+def body_rows(words, header_words, required):
+    """The page's word rows below its header row (all of them if it has none)."""
+    rows = word_rows(words)
+    for i, row in enumerate(rows):
+        if is_header(row, header_words, required):
+            return rows[i + 1:]
+    return rows
+
+
+# ---------------------------------------------------
+# Column Grid
+# ---------------------------------------------------
+def find_grid(words, rules, header_words, required, date, anchors=None):
+    """
+    A ruled table's column grid from the page's header row:
+    {"edges": [x, ...], "names": [column, ...]}, where column i runs from
+    edges[i] to edges[i + 1]. Edges are the vertical rules (x0, y0, x1, y1)
+    crossing the header row, each column named after the header word
+    centred in it. Without ruling they are the header words' left edges,
+    the last column open to the right, and the grid keeps anchors
+    ({column: "left" or "right"}): the word edge that places a word in
+    that column, for text aligned to one side of it (see row_cells).
+
+    None unless a row names every `required` column and the grid puts a
+    `date` match in the "date" column of a row below it, so a notice page
+    that only quotes the column names does not set the grid.
+    """
+    rows = word_rows(words)
+    for i, row in enumerate(rows):
+        columns = header_columns(row, header_words)
+        if not required <= columns.keys():
+            continue
+
+        grid = grid_from_header(row, columns, rules, anchors)
+        if any(date.fullmatch(row_cells(r, grid).get("date", "")) for r in rows[i + 1:]):
+            return grid
+
+    return None
+
+
+def grid_from_header(row, columns, rules, anchors=None):
+    """Column grid for a header row: ruled if rules cross it, else from its words' positions."""
+    middle = (min(w[1] for w in row) + max(w[3] for w in row)) / 2
+    xs = sorted(x0 for x0, y0, x1, y1 in rules if x1 - x0 <= 1 and y0 <= middle <= y1)
+    edges = []
+    for x in xs:
+        if not edges or x - edges[-1] > RULE_SNAP:
+            edges.append(x)
+
+    if len(edges) > len(columns):
+        names = [None] * (len(edges) - 1)
+        for column, w in columns.items():
+            i = bisect_right(edges, (w[0] + w[2]) / 2) - 1
+            if 0 <= i < len(names):
+                names[i] = column
+        return {"edges": edges, "names": names}
+
+    ordered = sorted(columns, key=lambda c: columns[c][0])
+    return {"edges": [columns[c][0] for c in ordered] + [float("inf")], "names": ordered,
+            "anchors": dict(anchors or {})}
+
+
+def column_index(w, grid):
+    """
+    Index of the grid column a word falls in: a column anchored "right"
+    (or "left") takes the word if the word's right (or left) edge is in
+    it, so a right-aligned amount wider than its header stays in its
+    column; otherwise the column its centre falls in.
+    """
+    edges, names, anchors = grid["edges"], grid["names"], grid.get("anchors")
+    if anchors:
+        for anchor, x in (("right", w[2]), ("left", w[0])):
+            i = bisect_right(edges, x) - 1
+            if 0 <= i < len(names) and anchors.get(names[i]) == anchor:
+                return i
+    return bisect_right(edges, (w[0] + w[2]) / 2) - 1
+
+
+def row_cells(row, grid):
+    """
+    {column: "text"} for a row of words, each word in the column
+    column_index places it in. Words outside the grid (page furniture
+    beside the table) are dropped.
+    """
+    names = grid["names"]
+    cells = {}
+    for w in row:
+        i = column_index(w, grid)
+        if 0 <= i < len(names) and names[i]:
+            cells.setdefault(names[i], []).append(w[4])
+    return {column: " ".join(text) for column, text in cells.items()}
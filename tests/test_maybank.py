@@ -0,0 +1,47 @@
+import random
+
+from maybank import parse_page_maybank, parse_transactions_maybank, stitch_maybank
+
+
+STATEMENT = "\n".join([
+    "01/08 TRANSFER FR A/C 320.00+ 43,906.52",
+    "JOHN DOE",
+    "02/08 DUITNOW TO A/C 120.00- 43,786.52",
+    "03/08 DUITNOW7",
+    "ENDING BALANCE 3.00+ 43,789.52",
+    "REF 1234",
+    "TOTAL DEBIT 120.00",
+    "TOTAL CREDIT 320.00",
+])
+
+
+def stitched(pages):
+    carry = None
+    found = []
+    for page_num, text in enumerate(pages, 1):
+        tx, carry = stitch_maybank(carry, parse_page_maybank(text, page_num, "2025"))
+        found.extend(tx)
+    return found
+
+
+def fields(transactions):
+    return [(t["date"], t["description"], t["debit"], t["credit"], t["balance"]) for t in transactions]
+
+
+def test_page_opening_with_section_end_continues_nothing():
+    top, bottom = STATEMENT.split("\nENDING BALANCE")
+    pages = [top, "ENDING BALANCE" + bottom]
+
+    assert parse_page_maybank(pages[1], 2, "2025")["leading"] is None
+    assert fields(stitched(pages)) == fields(parse_transactions_maybank(STATEMENT, 1, "2025"))
+
+
+def test_random_page_breaks_match_single_page_parse():
+    lines = STATEMENT.split("\n")
+    expected = fields(parse_transactions_maybank(STATEMENT, 1, "2025"))
+    rng = random.Random(0)
+
+    for _ in range(200):
+        cuts = sorted(rng.sample(range(1, len(lines)), rng.randint(1, 4)))
+        pages = ["\n".join(lines[a:b]) for a, b in zip([0] + cuts, cuts + [len(lines)])]
+        assert fields(stitched(pages)) == expected, pages
@@ -0,0 +1,40 @@
+from cimb import find_grid_cimb, parse_page_cimb
+from table_grid import row_cells
+
+
+def word(x0, x1, top, text):
+    return (x0, top, x1, top + 8, text)
+
+
+# A CIMB header and one deposit, with no ruling lines (as on an OCR page).
+# The deposit is right-aligned under its header and wider than it: its
+# right edge is under "Deposit", its centre left of the header's left edge.
+WORDS = [
+    word(40, 60, 100, "Date"),
+    word(120, 175, 100, "Description"),
+    word(260, 290, 100, "Cheque"),
+    word(330, 380, 100, "Withdrawal"),
+    word(430, 465, 100, "Deposit"),
+    word(520, 560, 100, "Balance"),
+    word(40, 90, 120, "03/08/2025"),
+    word(120, 170, 120, "TRANSFER"),
+    word(390, 465, 120, "1,234,567.89"),
+    word(500, 560, 120, "1,240,000.00"),
+]
+
+
+def test_unruled_grid_places_right_aligned_amount_by_right_edge():
+    grid = find_grid_cimb(WORDS)
+    cells = row_cells(WORDS[6:], grid)
+
+    assert cells["credit"] == "1,234,567.89"
+    assert "debit" not in cells
+    assert cells["balance"] == "1,240,000.00"
+
+
+def test_unruled_page_parses_deposit_as_credit():
+    [tx] = parse_page_cimb(WORDS, 1)
+
+    assert tx["credit"] == 1234567.89
+    assert tx["debit"] == 0.0
+    assert tx["balance"] == 1240000.0
@@ -2,26 +2,32 @@
 
 import regex as re
 
+from amounts import parse_amount
+from page_text import MAX_DESCRIPTION_CHARS
+
 # ---------------------------
 # Compiled regex patterns
 # ---------------------------
 
+# The description is bounded (MAX_DESCRIPTION_CHARS) and the amounts
+# possessive, so a search over a long line stays linear
+
 # Pattern for MTASB:
 # Example: "01/05 TRANSFER TO A/C 320.00+ 43,906.52"
 PATTERN_MTASB = re.compile(
-    r"(\d{2}/\d{2})\s+"             # date: 01/05
-    r"(.+?)\s+"                     # description
-    r"([0-9,]+\.\d{2})([+-])\s+"    # amount + sign: 320.00+
-    r"([0-9,]+\.\d{2})"             # balance
+    r"(\d{2}/\d{2})\s++"                        # date: 01/05
+    rf"(.{{1,{MAX_DESCRIPTION_CHARS}}}?)\s++"     # description
+    r"([0-9,]++\.\d{2})([+-])\s++"               # amount + sign: 320.00+
+    r"([0-9,]++\.\d{2})"                         # balance
 )
 
 # Pattern for MBB:
 # Example: "01 Apr 2025 CMS - DR CORP CHG 78.00 - 71,229.76"
 PATTERN_MBB = re.compile(
-    r"(\d{2})\s+([A-Za-z]{3})\s+(\d{4})\s+"  # 01 Apr 2025
-    r"(.+?)\s+"                              # description
-    r"([0-9,]+\.\d{2})\s+([+-])\s+"          # 78.00 -
-    r"([0-9,]+\.\d{2})"                      # 71,229.76
+    r"(\d{2})\s++([A-Za-z]{3})\s++(\d{4})\s++"  # 01 Apr 2025
+    rf"(.{{1,{MAX_DESCRIPTION_CHARS}}}?)\s++"     # description
+    r"([0-9,]++\.\d{2})\s++([+-])\s++"           # 78.00 -
+    r"([0-9,]++\.\d{2})"                         # 71,229.76
 )
 
 MONTH_MAP = {
@@ -49,8 +55,8 @@ def parse_line_mtasb(line: str, page_num: int, default_year: str = "2025"):
 
     year = default_year  # could be extended later
 
-    amount = float(amount_raw.replace(",", ""))
-    balance = float(balance_raw.replace(",", ""))
+    amount = parse_amount(amount_raw)
+    balance = parse_amount(balance_raw)
 
     if sign == "+":
         credit = amount
@@ -83,8 +89,8 @@ def parse_line_mbb(line: str, page_num: int):
     day, mon_abbr, year, desc, amount_raw, sign, balance_raw = m.groups()
 
     month = MONTH_MAP.get(mon_abbr.title(), "01")
-    amount = float(amount_raw.replace(",", ""))
-    balance = float(balance_raw.replace(",", ""))
+    amount = parse_amount(amount_raw)
+    balance = parse_amount(balance_raw)
 
     if sign == "+":
         credit = amount
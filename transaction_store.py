@@ -0,0 +1,190 @@
+import uuid
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from amounts import to_cents
+
+
+# ---------------------------------------------------
+# Configuration
+# ---------------------------------------------------
+# Columns in the order to_pandas returns them, matching the dicts the
+# parsers and attach_metadata produce
+COLUMNS = [
+    "date", "description", "ref_no", "debit", "credit", "balance", "page",
+    "source_file", "bank", "statement_year", "statement_month", "statement_period",
+    "debit_cents", "credit_cents",
+]
+
+# balance_cents value for rows without a balance
+NO_BALANCE = -(2 ** 63)
+
+
+class StringPool:
+    """Interned strings: each distinct value is stored once and rows keep an int code."""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+# ---------------------------------------------------
+# Columnar Store
+# ---------------------------------------------------
+class TransactionStore:
+    """
+    Transactions held column by column instead of one dict per row.
+
+    Amounts are exact int64 cents and page numbers live in typed arrays;
+    dates and per-file
+    metadata (source file, bank, statement period) are interned, so each
+    row only keeps small integer codes. Rows are added a file at a time
+    with add_file(), which replaces attach_metadata's per-row keys.
+    """
+
+    def __init__(self):
+        self.token = uuid.uuid4().hex    # tells this store apart from a reset one
+        self.version = 0                 # bumped by every add_file
+        self.dates = StringPool()
+        self.date_codes = array("i")
+        self.descriptions = []
+        self.ref_nos = []               # None for banks without a reference column
+        self.debits = array("q")        # cents
+        self.credits = array("q")
+        self.balances = array("q")      # NO_BALANCE where a parser gave no balance
+        self.pages = array("i")
+
+        # Per-file metadata, stored once; rows point at it through file_codes
+        self.file_names = StringPool()
+        self.banks = StringPool()
+        self.periods = StringPool()
+        self.files = []                 # (name_code, bank_code, period_code, year, month)
+        self.file_codes = array("i")
+
+    def __len__(self):
+        return len(self.file_codes)
+
+    def fingerprint(self):
+        """
+        Identifies the current contents, for caches of anything derived
+        from them. Rows are only ever appended, so the version is enough.
+        """
+        return f"{self.token}:{self.version}"
+
+    def add_file(self, transactions, source_file, bank, statement_month=None):
+        """
+        Append one file's parsed transactions (dicts from the bank parsers).
+        Metadata keys already on the dicts are ignored; the file's metadata
+        is stored once.
+        """
+        if statement_month:
+            year, month = statement_month[0], statement_month[1]
+            period_code = self.periods.code(f"{year}-{month:02d}")
+        else:
+            year, month, period_code = 0, 0, -1
+
+        file_code = len(self.files)
+        self.files.append((self.file_names.code(source_file), self.banks.code(bank), period_code, year, month))
+
+        for t in transactions:
+            self.date_codes.append(self.dates.code(t.get("date") or ""))
+            self.descriptions.append(t.get("description") or "")
+            self.ref_nos.append(t.get("ref_no"))
+            self.debits.append(to_cents(t.get("debit") or 0.0))
+            self.credits.append(to_cents(t.get("credit") or 0.0))
+            balance = t.get("balance")
+            self.balances.append(NO_BALANCE if balance is None else to_cents(balance))
+            self.pages.append(t.get("page") or 0)
+            self.file_codes.append(file_code)
+
+        self.version += 1
+        return self
+
+    def row(self, i):
+        """Row i as a transaction dict, with the same keys attach_metadata adds."""
+        name_code, bank_code, period_code, year, month = self.files[self.file_codes[i]]
+        t = {
+            "date": self.dates.values[self.date_codes[i]],
+            "description": self.descriptions[i],
+            "debit": self.debits[i] / 100,
+            "credit": self.credits[i] / 100,
+            "balance": None if self.balances[i] == NO_BALANCE else self.balances[i] / 100,
+            "page": self.pages[i],
+        }
+        if self.ref_nos[i] is not None:
+            t["ref_no"] = self.ref_nos[i]
+        t["source_file"] = self.file_names.values[name_code]
+        t["bank"] = self.banks.values[bank_code]
+        if period_code >= 0:
+            t["statement_year"] = year
+            t["statement_month"] = month
+            t["statement_period"] = self.periods.values[period_code]
+        return t
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def nbytes(self):
+        """Bytes held by the row columns: typed arrays plus one pointer per description/ref_no."""
+        typed = sum(a.itemsize * len(a) for a in (self.date_codes, self.debits, self.credits,
+                                                  self.balances, self.pages, self.file_codes))
+        return typed + 8 * (len(self.descriptions) + len(self.ref_nos))
+
+    def to_pandas(self):
+        """
+        DataFrame with the columns pd.DataFrame(list_of_dicts) would have.
+        Amount columns are computed from the cents arrays in one vectorised
+        step, and debit_cents/credit_cents are kept alongside them for exact
+        totals. Dates and per-file columns are looked up from their codes,
+        so no Python code runs per row.
+        """
+        files = np.array(self.files, dtype=np.int64).reshape(-1, 5)
+        rows = files[np.frombuffer(self.file_codes, dtype=np.int32)]
+        has_period = rows[:, 2] >= 0
+
+        def period_column(values, present):
+            # int64 when every file has a period, float64 with NaN otherwise - as from a list of dicts
+            return values if present.all() else np.where(present, values, np.nan)
+
+        def amounts(cents):
+            return np.frombuffer(cents, dtype=np.int64) / 100
+
+        balances = np.frombuffer(self.balances, dtype=np.int64)
+
+        def categorical(codes, pool):
+            return pd.Categorical.from_codes(codes, categories=pd.Index(pool.values, dtype=object))
+
+        df = pd.DataFrame({
+            "date": np.array(self.dates.values, dtype=object)[np.frombuffer(self.date_codes, dtype=np.int32)],
+            "description": self.descriptions,
+            "ref_no": self.ref_nos,
+            "debit": amounts(self.debits),
+            "credit": amounts(self.credits),
+            "balance": np.where(balances == NO_BALANCE, np.nan, balances / 100),
+            "page": np.frombuffer(self.pages, dtype=np.int32),
+            "source_file": categorical(rows[:, 0], self.file_names),
+            "bank": categorical(rows[:, 1], self.banks),
+            "statement_year": period_column(rows[:, 3], has_period),
+            "statement_month": period_column(rows[:, 4], has_period),
+            "statement_period": categorical(rows[:, 2], self.periods),
+            "debit_cents": np.frombuffer(self.debits, dtype=np.int64),
+            "credit_cents": np.frombuffer(self.credits, dtype=np.int64),
+        }, columns=COLUMNS)
+
+        # Columns no row has are left out, as they would be from a list of dicts
+        if all(r is None for r in self.ref_nos):
+            df = df.drop(columns="ref_no")
+        if not has_period.any():
+            df = df.drop(columns=["statement_year", "statement_month", "statement_period"])
+
+        return df
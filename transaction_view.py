@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+from report import summarise, row_dates, amount_cents
+
+
+# ---------------------------------------------------
+# Configuration
+# ---------------------------------------------------
+# Columns shown and exported, in order, where present
+DISPLAY_COLUMNS = [
+    "date", "description", "debit", "credit", "balance", "page", "bank", "source_file",
+    "statement_year", "statement_month", "statement_period",
+]
+
+# Sort choices in the UI -> column (None keeps page/line order)
+SORT_COLUMNS = {
+    "Original order": None,
+    "Date": "date",
+    "Description": "description",
+    "Debit": "debit",
+    "Credit": "credit",
+    "Balance": "balance",
+    "Source file": "source_file",
+}
+
+PAGE_SIZES = [50, 100, 250, 500]
+
+
+# ---------------------------------------------------
+# Derived Frames
+# ---------------------------------------------------
+class ResultFrames:
+    """
+    Everything the results section derives from one version of the
+    TransactionStore: the DataFrame, the displayed columns, the summary,
+    and per-row dates/amounts for filtering. Kept in session state and
+    rebuilt only when the store's fingerprint changes, so widget reruns
+    reuse it.
+
+    Sort orders are computed once per column over all rows; a query is
+    then a boolean mask applied to that order, and the last query's rows
+    are kept so paging through them is a slice.
+    """
+
+    def __init__(self, store):
+        self.fingerprint = store.fingerprint()
+        self.df = store.to_pandas()
+        self.display = self.df[[c for c in DISPLAY_COLUMNS if c in self.df.columns]]
+        self.summary = summarise(self.df)
+
+        self.dates = row_dates(self.df)
+        # A row's amount regardless of direction; one side is 0 on every parser's rows
+        self.amounts = amount_cents(self.df, "debit") + amount_cents(self.df, "credit")
+        self.descriptions = None        # upper-cased on the first text filter
+
+        self.orders = {}
+        self.last_query = (None, None)
+
+    def date_bounds(self):
+        """(first, last) transaction date as datetime.date, or (None, None)."""
+        dated = self.dates[~np.isnat(self.dates)]
+        if not len(dated):
+            return None, None
+        return pd.Timestamp(dated.min()).date(), pd.Timestamp(dated.max()).date()
+
+    def mask(self, date_from=None, date_to=None, min_amount=None, max_amount=None, text=""):
+        """Rows matching every filter given. Dates are inclusive; rows without a date fail a date filter."""
+        keep = np.ones(len(self.df), dtype=bool)
+        if date_from is not None:
+            keep &= self.dates >= np.datetime64(date_from, "ns")
+        if date_to is not None:
+            keep &= self.dates <= np.datetime64(date_to, "ns")
+        if min_amount is not None:
+            keep &= self.amounts >= round(min_amount * 100)
+        if max_amount is not None:
+            keep &= self.amounts <= round(max_amount * 100)
+        if text:
+            if self.descriptions is None:
+                self.descriptions = self.df["description"].astype(str).str.upper()
+            keep &= self.descriptions.str.contains(text.upper(), regex=False).to_numpy(dtype=bool)
+        return keep
+
+    def order(self, column=None, descending=False):
+        """All row positions sorted by column, ties in page/line order."""
+        key = (column, descending)
+        if key not in self.orders:
+            if column is None:
+                positions = np.arange(len(self.df))
+                self.orders[key] = positions[::-1] if descending else positions
+            else:
+                self.orders[key] = np.argsort(self.sort_key(column, descending), kind="stable")
+        return self.orders[key]
+
+    def sort_key(self, column, descending):
+        """Numeric key for a column, negated for descending; missing values sort last either way."""
+        if column == "date":
+            values = np.where(np.isnat(self.dates), np.nan, self.dates.view(np.int64).astype(np.float64))
+        elif pd.api.types.is_numeric_dtype(self.df[column]):
+            values = self.df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            codes, _ = pd.factorize(self.df[column].astype(object), sort=True)
+            values = np.where(codes < 0, np.nan, codes.astype(np.float64))
+        return -values if descending else values
+
+    def query(self, filters, column=None, descending=False):
+        """
+        Positions of the rows matching `filters` (mask() keyword arguments)
+        in display order. The last result is kept, so paging is free.
+        """
+        key = (tuple(sorted(filters.items())), column, descending)
+        if self.last_query[0] != key:
+            order = self.order(column, descending)
+            active = {k: v for k, v in filters.items() if v not in (None, "")}
+            rows = order[self.mask(**active)[order]] if active else order
+            self.last_query = (key, rows)
+        return self.last_query[1]
+
+    def page(self, rows, number, size):
+        """Displayed columns for page `number` (1-based) of `rows`."""
+        start = (number - 1) * size
+        return self.display.iloc[rows[start:start + size]]
+
+
+def current_frames(frames, store):
+    """`frames` if it was built from the store's current contents, else a fresh ResultFrames."""
+    if frames is not None and frames.fingerprint == store.fingerprint():
+        return frames
+    return ResultFrames(store)